@@ -1,19 +1,58 @@
 from flask import Flask, request, jsonify, send_from_directory
 try:
     # When run as a module: python -m backend.app
-    from .models import db, User, Animal, HealthRecord, Booking, PricingRule, TicketType, TicketSale, Event, NewsItem, PageContent, Feedback, AuditLog, AnimalAssignment, Appointment, TreatmentPlan, MedicineRequest, Alert, FavoriteAnimal, FavoriteEvent
+    from .models import db, ensure_indexes, User, Animal, HealthRecord, Booking, PricingRule, TicketType, TicketSale, Event, NewsItem, PageContent, Feedback, AuditLog, AnimalAssignment, Appointment, TreatmentPlan, MedicineRequest, Alert, FavoriteAnimal, FavoriteEvent
+    from .pricing import PricingIndex, DEFAULT_SLOTS, DEFAULT_ADULT_CENTS, DEFAULT_CHILD_CENTS
+    from .qr import QRRenderer, qr_etag
+    from .pagination import paginate, InvalidCursor
+    from .search import SearchIndex
+    from .suggest import SuggestIndex, load_entries as load_suggest_entries
+    from . import changes
+    from .sqlite_tuning import settings_from_env as sqlite_settings_from_env, apply_profile as apply_sqlite_profile, effective_pragmas
+    from .engine_config import engine_options_from_env, install_sqlite_statement_timeout, describe_options, pool_stats
+    from .response_cache import ResponseCache
+    from .conditional import conditional
+    from .static_files import StaticManifest
+    from . import static_files
+    from .media import VideoRenditions
+    from . import images
+    from . import image_catalog
+    from .relink import PhotoRelinker, MODES as RELINK_MODES
+    from . import bootstrap
+    from . import passwords
+    from . import rollups
+    from .audit import AuditWriter, archive_before as archive_audit_log, archive_dir as audit_archive_dir, retention_days as audit_retention_days
 except ImportError:  # When run directly: python app.py from backend folder
-    from models import db, User, Animal, HealthRecord, Booking, PricingRule, TicketType, TicketSale, Event, NewsItem, PageContent, Feedback, AuditLog, AnimalAssignment, Appointment, TreatmentPlan, MedicineRequest, Alert, FavoriteAnimal, FavoriteEvent
-from flask_jwt_extended import JWTManager, create_access_token, jwt_required, get_jwt_identity, get_jwt
+    from models import db, ensure_indexes, User, Animal, HealthRecord, Booking, PricingRule, TicketType, TicketSale, Event, NewsItem, PageContent, Feedback, AuditLog, AnimalAssignment, Appointment, TreatmentPlan, MedicineRequest, Alert, FavoriteAnimal, FavoriteEvent
+    from pricing import PricingIndex, DEFAULT_SLOTS, DEFAULT_ADULT_CENTS, DEFAULT_CHILD_CENTS
+    from qr import QRRenderer, qr_etag
+    from pagination import paginate, InvalidCursor
+    from search import SearchIndex
+    from suggest import SuggestIndex, load_entries as load_suggest_entries
+    import changes
+    from sqlite_tuning import settings_from_env as sqlite_settings_from_env, apply_profile as apply_sqlite_profile, effective_pragmas
+    from engine_config import engine_options_from_env, install_sqlite_statement_timeout, describe_options, pool_stats
+    from response_cache import ResponseCache
+    from conditional import conditional
+    from static_files import StaticManifest
+    import static_files
+    from media import VideoRenditions
+    import images
+    import image_catalog
+    from relink import PhotoRelinker, MODES as RELINK_MODES
+    import bootstrap
+    import passwords
+    import rollups
+    from audit import AuditWriter, archive_before as archive_audit_log, archive_dir as audit_archive_dir, retention_days as audit_retention_days
+from flask_jwt_extended import JWTManager, create_access_token, jwt_required, get_jwt_identity, get_jwt, verify_jwt_in_request
 from flask_cors import CORS
 import os
-from datetime import datetime
-import base64
-import io
-import qrcode
+import json
+from datetime import date, datetime, timedelta
 
 
 def create_app():
+    profile = bootstrap.StartupProfile()
     app = Flask(__name__)
     # Use SQLite DB by default for quick start; change to POSTGRES URI in production
     # Force a single canonical SQLite DB inside backend/instance to avoid duplicate DB confusion
@@ -28,6 +67,9 @@ def create_app():
         app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{abs_db_path}'
         chosen_db = abs_db_path
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    # Pool sizing / pre-ping / recycle / statement timeout from DB_POOL_* env vars
+    engine_options, statement_timeout_ms = engine_options_from_env(app.config['SQLALCHEMY_DATABASE_URI'])
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options
     app.config['JWT_SECRET_KEY'] = os.environ.get('JWT_SECRET_KEY', 'super-secret-change-me')
     # Limit upload size (default 8MB). Override via MAX_CONTENT_LENGTH env var.
     try:
@@ -36,6 +78,10 @@ def create_app():
         app.config['MAX_CONTENT_LENGTH'] = 8 * 1024 * 1024
 
     db.init_app(app)
+    # per-table write versions that drive in-process caches
+    changes.install(db.session)
+    # daily revenue/attendance rollups follow every sale, booking and payment in its own transaction
+    rollups.install(db.session)
     # Configure CORS: restrict to known front-end origins. In production, set CORS_ORIGINS env (comma-separated)
     cors_env = os.environ.get('CORS_ORIGINS')
     if cors_env:
@@ -45,202 +91,96 @@ def create_app():
         origins = ['http://localhost:5173', 'http://127.0.0.1:5173']
     CORS(app, resources={r"/api/*": {"origins": origins}})
     jwt = JWTManager(app)
+    search_index = SearchIndex()
+    app.extensions['search_index'] = search_index
+    suggest_index = SuggestIndex(loader=load_suggest_entries)
+    app.extensions['suggest_index'] = suggest_index
+    # public read endpoints; entries drop when their source tables change
+    response_cache = ResponseCache(app)
+    app.extensions['response_cache'] = response_cache
+    # password hashing in a bounded thread pool (PASSWORD_HASH_* env); used by User.set/check_password
+    password_hasher = passwords.PasswordHasher()
+    passwords.install(password_hasher)
+    app.extensions['password_hasher'] = password_hasher
+
+    @app.errorhandler(passwords.HashingBusy)
+    def _hashing_busy(e):
+        resp = jsonify({'msg': 'server busy, please retry'})
+        resp.status_code = 503
+        resp.headers['Retry-After'] = '1'
+        return resp
+    profile.mark('config')
     # uploads folder
     upload_dir = os.path.join(os.getcwd(), 'uploads')
     os.makedirs(upload_dir, exist_ok=True)
-
+    # Path to built frontend (Vite build output)
+    FRONTEND_DIST = static_files.FRONTEND_DIST
+    # the directory answering /images/... (the build, or frontend/public under the Vite dev server)
+    site_root = static_files.site_root(FRONTEND_DIST)
+    # resized JPEG/WebP derivatives (uploads/derived) behind Animal.photo_srcset and the gallery
+    image_index = images.DerivativeIndex(upload_dir, images.default_roots(site_root)).scan()
+    images.install(image_index)
+    app.extensions['image_index'] = image_index
+    # /api/animals/gallery payload; rebuilt when the directory changes or derivatives land
+    gallery_manifest = images.GalleryManifest(
+        os.path.join(site_root, 'images', 'animals'), '/images/animals', image_index)
+    app.extensions['gallery_manifest'] = gallery_manifest
+
+    def _derivatives_changed():
+        changes.bump('image_derivative')
+        gallery_manifest.invalidate()
+    image_index.on_change = _derivatives_changed
+    # verified image URL per animal/event/news (image_url in to_dict); folders re-listed on mtime change
+    catalog = image_catalog.ImageCatalog(image_catalog.default_folders(upload_dir, site_root),
+                                         on_change=lambda: changes.bump('image_catalog'))
+    image_catalog.install(catalog.ensure())
+    app.extensions['image_catalog'] = catalog
+    # file-backed versions for the HTTP validators (conditional.py): derived from what is on disk
+    changes.register_source('image_catalog', catalog.fingerprint)
+    changes.register_source('image_derivative', lambda: (image_index.fingerprint(), None))
+    photo_relinker = PhotoRelinker(app, db, catalog)
+    app.extensions['photo_relinker'] = photo_relinker
+
+    @app.before_request
+    def _refresh_image_catalog():
+        # throttled mtime checks, so validators/caches see new files (from any process) before the view runs
+        if request.path.startswith('/api/'):
+            catalog.ensure()
+            image_index.ensure()
+
+    profile.mark('images')
     with app.app_context():
         print(f"[startup] Using database: {app.config['SQLALCHEMY_DATABASE_URI']}", flush=True)
-        db.create_all()
-        # --- Lightweight SQLite in-place migration for newly added User columns (dev only) ---
-        # If the database was created before fields like full_name, specialization, etc. existed,
-        # login/registration will 500 with "no such column" errors. We inspect table_info and issue
-        # ALTER TABLE statements for any missing columns. For production use Alembic instead.
-        try:
-            from sqlalchemy import text
-            result = db.session.execute(text("PRAGMA table_info('user')"))
-            existing_cols = {row[1] for row in result.fetchall()}
-            alter_stmts = []
-            if 'full_name' not in existing_cols:
-                alter_stmts.append("ALTER TABLE user ADD COLUMN full_name VARCHAR(120)")
-            if 'specialization' not in existing_cols:
-                alter_stmts.append("ALTER TABLE user ADD COLUMN specialization VARCHAR(120)")
-            if 'bio' not in existing_cols:
-                alter_stmts.append("ALTER TABLE user ADD COLUMN bio TEXT")
-            if 'email' not in existing_cols:
-                # uniqueness cannot be retroactively enforced here without table rebuild
-                alter_stmts.append("ALTER TABLE user ADD COLUMN email VARCHAR(160)")
-            if 'membership_level' not in existing_cols:
-                alter_stmts.append("ALTER TABLE user ADD COLUMN membership_level VARCHAR(40)")
-            if 'membership_points' not in existing_cols:
-                alter_stmts.append("ALTER TABLE user ADD COLUMN membership_points INTEGER NOT NULL DEFAULT 0")
-            for stmt in alter_stmts:
-                try:
-                    db.session.execute(text(stmt))
-                except Exception:
-                    db.session.rollback()
-            if alter_stmts:
-                db.session.commit()
-        except Exception:
-            db.session.rollback()
-        # Seed default admin if missing (DEV ONLY)
-        if os.environ.get('ENV', 'development') != 'production':
-            try:
-                if not User.query.filter_by(username='Admin123').first():
-                    admin = User(username='Admin123', role='admin')
-                    admin.set_password('zoosys')
-                    db.session.add(admin)
-                    db.session.commit()
-            except Exception:
-                db.session.rollback()
-        # Seed default ticket types if none
-        try:
-            if TicketType.query.count() == 0:
-                base_types = [
-                    TicketType(name='Adult', description='Standard adult admission', adult_price_cents=20000, child_price_cents=0),
-                    TicketType(name='Child', description='Child admission (under 12)', adult_price_cents=0, child_price_cents=10000),
-                    TicketType(name='Family', description='Family bundle (2 adults + 2 children)', adult_price_cents=36000, child_price_cents=0, group_size=4)
-                ]
-                db.session.add_all(base_types)
-                db.session.commit()
-        except Exception:
-            db.session.rollback()
-        # Seed sample vet user (DEV ONLY)
-        if os.environ.get('ENV', 'development') != 'production':
-            try:
-                if not User.query.filter_by(username='Doctor1').first():
-                    vet = User(username='Doctor1', role='vet')
-                    vet.set_password('doctorpass')
-                    db.session.add(vet)
-                    db.session.commit()
-            except Exception:
-                db.session.rollback()
-        # Seed sample animals if none exist
-        try:
-            if Animal.query.count() == 0:
-                samples = [
-                    Animal(name='Giraffe', species='Giraffa camelopardalis', description='Tall and graceful herbivore with long necks.'),
-                    Animal(name='Crocodile', species='Crocodylus', description='Large aquatic reptile, powerful jaws and armored skin.'),
-                    Animal(name='Tiger', species='Panthera tigris', description='Majestic big cat with orange coat and black stripes.')
-                ]
-                db.session.add_all(samples)
-                db.session.commit()
-        except Exception:
-            db.session.rollback()
-
-        # Ensure extended animal list (idempotent). Adds any missing by name.
-        try:
-            from sqlalchemy import func
-            extended = [
-                ("Asiatic Lion", "Panthera leo persica", "Endangered Asiatic lion subspecies found only in the Gir Forest.", "Asiatic Lion.jpeg"),
-                ("Indian Elephant", "Elephas maximus indicus", "Large herbivore playing a key role as a keystone species.", "Indian Elephant.jpeg"),
-                ("Sloth Bear", "Melursus ursinus", "Insect-eating bear with shaggy coat and long snout.", "Sloth Bear.jpeg"),
-                ("Leopard", "Panthera pardus", "Agile spotted big cat known for its climbing ability.", "Leopard.jpeg"),
-                ("Indian Peafowl", "Pavo cristatus", "National bird of India famous for its colorful train.", "Indian Peafowl (Peacock).jpeg"),
-                ("Great Hornbill", "Buceros bicornis", "Large hornbill with impressive casque used in resonant calls.", "Great Hornbill.jpeg"),
-                ("Gaur", "Bos gaurus", "Massive wild bovid also called the Indian bison.", "Gaur (Indian Bison).jpeg"),
-                ("Nilgai", "Boselaphus tragocamelus", "Largest Asian antelope, also known as the blue bull.", "Nilgai (Blue Bull).jpeg"),
-                ("Indian Rock Python", "Python molurus", "Non-venomous constrictor inhabiting rocky outcrops and forests.", "Indian Rock Python.jpeg"),
-                ("Spotted Deer", "Axis axis", "Also called chital; distinctive white spots on reddish coat.", "Spotted Deer (Chital).jpeg"),
-                ("Indian Wolf", "Canis lupus pallipes", "An adaptable subspecies living in grasslands and scrub.", "Indian Wolf.jpeg"),
-                ("Indian Rhinoceros", "Rhinoceros unicornis", "Single-horned rhino with armor-like skin folds.", "Indian Rhinoceros.jpeg"),
-                ("Blackbuck", "Antilope cervicapra", "Graceful antelope with spiraled horns and striking coloration.", "Blackbuck.jpeg"),
-                ("King Cobra", "Ophiophagus hannah", "World's longest venomous snake; feeds mainly on other snakes.", "King Cobra.jpeg"),
-                ("Gharial", "Gavialis gangeticus", "Fish-eating crocodilian with long narrow snout.", "Gharial.jpeg"),
-                ("Rhesus Macaque", "Macaca mulatta", "Highly adaptable Old World monkey.", "Rhesus Macaque.jpeg"),
-                ("Sarus Crane", "Antigone antigone", "Tall wetland bird known for lifelong pair bonds.", "Sarus Crane.jpeg"),
-            ]
-            added_any = False
-            for name, species, desc, filename in extended:
-                exists = Animal.query.filter(func.lower(Animal.name) == name.lower()).first()
-                if not exists:
-                    a = Animal(name=name, species=species, description=desc, photo_url=f"/images/animals/{filename}")
-                    db.session.add(a)
-                    added_any = True
-            if added_any:
-                db.session.commit()
-        except Exception:
-            db.session.rollback()
-
-        # Auto-assign or fix photo_url entries referencing files that exist. Also supports .png.
-        def _relink_photos(commit=True):
-            """Attempt to (re)link Animal.photo_url values to an existing image file.
-
-            Previous implementation constructed a path using the Animal.name's exact
-            casing (e.g. 'Crocodile.jpg'). On some dev setups (notably Vite's static
-            serving behaviour or when running through a case‑sensitive layer) a URL
-            whose filename case does not exactly match the on-disk filename (e.g.
-            'crocodile.jpg') can 404 even on a case‑insensitive underlying FS
-            (Windows/macOS). This led to repeated fallback attempts in the frontend.
-
-            Strategy now:
-              1. Build a lookup of available files keyed by (lower_basename, ext).
-              2. For each animal, if current photo_url is already a valid existing
-                 file (exact match), keep it.
-              3. Otherwise, look up a file whose lowercased basename matches the
-                 animal name lowercased, preferring extensions in priority order.
-              4. Store the URL using the actual filename (preserving on-disk case).
-            """
-            public_img_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'frontend', 'public', 'images', 'animals'))
-            if not os.path.isdir(public_img_dir):
-                return 0
-            exts = ('jpeg','jpg','png')
-            # Build catalog of existing files (case-insensitive by basename, ext)
-            catalog = {}
-            try:
-                for fn in os.listdir(public_img_dir):
-                    full = os.path.join(public_img_dir, fn)
-                    if not os.path.isfile(full):
-                        continue
-                    base, dot, ext = fn.rpartition('.')
-                    if not dot:
-                        continue
-                    e = ext.lower()
-                    if e not in exts:
-                        continue
-                    catalog[(base.lower(), e)] = fn  # preserve actual filename case
-            except Exception as e:
-                print(f"[startup_warning] relink catalog build failed: {e}", flush=True)
-            updated = 0
-            for a in Animal.query.all():
-                # If current photo_url already points to an existing file, keep it.
-                if a.photo_url:
-                    candidate_fs = os.path.join(public_img_dir, os.path.basename(a.photo_url))
-                    if os.path.isfile(candidate_fs):
-                        continue
-                animal_key = a.name.lower() if a.name else None
-                if not animal_key:
-                    continue
-                # Try each extension in priority order using actual filename casing.
-                chosen = None
-                for ext in exts:
-                    fn = catalog.get((animal_key, ext))
-                    if fn:
-                        chosen = fn
-                        break
-                if chosen:
-                    new_url = f"/images/animals/{chosen}"
-                    if a.photo_url != new_url:
-                        a.photo_url = new_url
-                        updated += 1
-            if updated and commit:
-                try:
-                    db.session.commit()
-                    print(f"[startup] Linked/updated photo_url for {updated} animals", flush=True)
-                except Exception as e:
-                    db.session.rollback()
-                    print(f"[startup_warning] commit failed during relink: {e}", flush=True)
-            return updated
-        try:
-            _relink_photos(commit=True)
-        except Exception as e:
-            db.session.rollback()
-            print(f"[startup_warning] failed photo relink: {e}", flush=True)
-
-    # Path to built frontend (Vite build output)
-    FRONTEND_DIST = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'frontend', 'dist'))
-    ASSETS_DIR = os.path.join(FRONTEND_DIST, 'assets')
-    IMAGES_DIR = os.path.join(FRONTEND_DIST, 'images')
+        install_sqlite_statement_timeout(db.engine, statement_timeout_ms)
+        print(f"[startup] Engine options: {describe_options(engine_options, statement_timeout_ms)}", flush=True)
+        # SQLite connection pragmas (WAL, synchronous, mmap, cache, busy timeout); SQLITE_PROFILE=off disables
+        if apply_sqlite_profile(db.engine, sqlite_settings_from_env()):
+            pragmas = effective_pragmas(db.engine)
+            print("[startup] SQLite pragmas: " + ', '.join(f"{k}={v}" for k, v in pragmas.items()), flush=True)
+        profile.mark('engine')
+        # schema + seed only when the app_state version stamps differ from this code (FAST_BOOT=0 forces)
+        boot_result = bootstrap.boot(search_index, profile)
+        app.extensions['boot'] = boot_result
+        if boot_result['seeded']:
+            print(f"[startup] Seeded {boot_result['seeded']} rows", flush=True)
+
+        # Link photo_url to existing image files; skipped when the folders and the animal table are unchanged
+        relink_mode = os.environ.get('PHOTO_RELINK', 'background').strip().lower()
+        if relink_mode not in RELINK_MODES:
+            relink_mode = 'background'
+        if relink_mode == 'background' and ':memory:' in app.config['SQLALCHEMY_DATABASE_URI']:
+            relink_mode = 'sync'  # per-thread connections would not see the in-memory database
+        photo_relinker.start(relink_mode)
+        profile.mark('relink')
+
+    # file index of the build (sizes, ETags, .br/.gz variants, cached index.html); rebuilt on restart
+    static_manifest = StaticManifest(FRONTEND_DIST).build()
+    app.extensions['static_manifest'] = static_manifest
+    # ffmpeg renditions + poster frames of dist/Videos, written to uploads/renditions
+    renditions_dir = os.path.join(upload_dir, 'renditions')
+    video_renditions = VideoRenditions(os.path.join(FRONTEND_DIST, 'Videos'), renditions_dir)
+    app.extensions['video_renditions'] = video_renditions
+    profile.mark('static')
 
     @app.route('/api/register', methods=['POST'])
     def register():
@@ -261,6 +201,8 @@ def create_app():
             db.session.add(u)
             db.session.commit()
             return jsonify(u.to_dict()), 201
+        except passwords.HashingBusy:
+            raise
         except Exception as e:
             return jsonify({'error':'register_failed','detail':str(e)}), 500
 
@@ -276,7 +218,19 @@ def create_app():
             if not u or not u.check_password(password):
                 return jsonify({'msg': 'bad credentials'}), 401
             token = create_access_token(identity=str(u.id), additional_claims={'role': u.role})
+            if u.password_needs_rehash():
+                # stored with an older method/cost: upgrade while we know the password.
+                # Best effort: a busy hasher or failed write retries on the next login.
+                try:
+                    u.set_password(password)
+                    db.session.commit()
+                    password_hasher.rehashed += 1
+                except Exception as e:
+                    db.session.rollback()
+                    print(f"[login_warning] rehash skipped for {username}: {e}", flush=True)
             return jsonify({'access_token': token})
+        except passwords.HashingBusy:
+            raise
         except Exception as e:
             import traceback, uuid
             trace_id = uuid.uuid4().hex[:8]
@@ -367,37 +321,27 @@ def create_app():
         return jsonify(animal.to_dict()), 201
 
     @app.route('/api/animals', methods=['GET'])
+    @conditional('animal', 'image_derivative', 'image_catalog')
+    @response_cache.cached('animal', 'image_derivative', 'image_catalog', anonymous_only=True)
     def list_animals():
         try:
             q = request.args.get('q')
-            # Safe int parsing with defaults
-            def to_int(val, default):
-                try:
-                    return int(val)
-                except Exception:
-                    return default
-            page = max(to_int(request.args.get('page', 1), 1), 1)
-            per_page = to_int(request.args.get('per_page', 20), 20)
-            per_page = min(max(per_page, 1), 100)
             query = Animal.query
             if q:
-                like = f"%{q.lower()}%"
-                from sqlalchemy import or_, func
-                query = query.filter(or_(func.lower(Animal.name).like(like), func.lower(Animal.species).like(like)))
-            total = query.count()
-            items = (query.order_by(Animal.id.desc())
-                          .offset((page - 1) * per_page)
-                          .limit(per_page)
-                          .all())
-            pages = (total + per_page - 1) // per_page if per_page else 1
+                fts_filter = search_index.animal_id_filter(q) if search_index.available else None
+                if fts_filter is not None:
+                    query = query.filter(fts_filter)
+                else:
+                    like = f"%{q.lower()}%"
+                    from sqlalchemy import or_, func
+                    query = query.filter(or_(func.lower(Animal.name).like(like), func.lower(Animal.species).like(like)))
+            try:
+                items, meta = paginate(query, Animal.id, request.args)
+            except InvalidCursor:
+                return jsonify({'msg': 'invalid cursor'}), 400
             return jsonify({
                 'data': [a.to_dict() for a in items],
-                'meta': {
-                    'page': page,
-                    'per_page': per_page,
-                    'total': total,
-                    'pages': pages
-                }
+                'meta': meta
             })
         except Exception as e:
             # Enhanced temporary debugging: log traceback with a short trace_id so user can correlate.
@@ -414,6 +358,8 @@ def create_app():
             return jsonify(payload), 500
 
     @app.route('/api/animals/<int:animal_id>', methods=['GET'])
+    @conditional('animal', 'image_derivative', 'image_catalog')
+    @response_cache.cached('animal', 'image_derivative', 'image_catalog')
     def get_animal(animal_id):
         a = Animal.query.get_or_404(animal_id)
         return jsonify(a.to_dict())
@@ -454,6 +400,20 @@ def create_app():
         db.session.commit()
         return jsonify({'msg': 'deleted'})
 
+    @app.route('/api/images/resolve', methods=['GET'])
+    @conditional('image_catalog', 'image_derivative')
+    def resolve_images():
+        """One verified image URL per title: ?kind=animal|event|news|campaign&name=A&name=B."""
+        kind = request.args.get('kind', 'animal')
+        if kind not in catalog.folders:
+            return jsonify({'msg': 'unknown kind'}), 400
+        names = request.args.getlist('name')[:100]
+        out = {}
+        for name in names:
+            url, fallback = catalog.resolve(kind, name)
+            out[name] = {'url': url, 'fallback': fallback, 'srcset': image_index.srcset_for(url)}
+        return jsonify({'kind': kind, 'images': out})
+
     @app.route('/api/animals/gallery', methods=['GET'])
     def animal_gallery():
         """Return a list of available animal image filenames in the public images directory.
@@ -462,59 +422,24 @@ def create_app():
         not all have corresponding Animal DB rows.
         """
         try:
-            public_img_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'frontend', 'public', 'images', 'animals'))
-            if not os.path.isdir(public_img_dir):
-                return jsonify({'images': []})
-            exts = {'.jpg', '.jpeg', '.png'}
-            files = []
-            for fn in os.listdir(public_img_dir):
-                lower = fn.lower()
-                for e in exts:
-                    if lower.endswith(e):
-                        files.append({
-                            'file': fn,
-                            'url': f"/images/animals/{fn}"
-                        })
-                        break
-            files.sort(key=lambda x: x['file'].lower())
-            return jsonify({'images': files, 'count': len(files)})
+            body, etag = gallery_manifest.ensure()
+            resp = app.response_class(body, mimetype='application/json')
+            resp.set_etag(etag)
+            resp.headers['Cache-Control'] = 'no-cache'
+            return resp.make_conditional(request)
         except Exception as e:
             return jsonify({'error': 'gallery_failed', 'detail': str(e)}), 500
 
     @app.route('/api/admin/animals/relink', methods=['POST'])
     @jwt_required()
     def relink_animal_photos():
-        """Admin endpoint to rescan local images directory and update animal photo_url values."""
+        """Admin endpoint to rescan the image folders and update animal photo_url values."""
         claims = get_jwt()
         if claims.get('role') != 'admin':
             return jsonify({'msg':'forbidden'}), 403
         try:
-            # reuse internal helper if present
-            updated = 0
-            public_img_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'frontend', 'public', 'images', 'animals'))
-            if not os.path.isdir(public_img_dir):
-                return jsonify({'updated':0,'detail':'images directory missing'}), 400
-            exts = ('jpeg','jpg','png')
-            for a in Animal.query.all():
-                candidate_ok = False
-                if a.photo_url:
-                    fs = os.path.join(public_img_dir, os.path.basename(a.photo_url))
-                    if os.path.isfile(fs):
-                        candidate_ok = True
-                if candidate_ok:
-                    continue
-                base = a.name
-                for ext in exts:
-                    fp = os.path.join(public_img_dir, f"{base}.{ext}")
-                    if os.path.isfile(fp):
-                        new_url = f"/images/animals/{base}.{ext}"
-                        if a.photo_url != new_url:
-                            a.photo_url = new_url
-                            updated += 1
-                        break
-            if updated:
-                db.session.commit()
-            return jsonify({'updated': updated})
+            catalog.invalidate()
+            return jsonify(photo_relinker.run(force=True))
         except Exception as e:
             db.session.rollback()
             return jsonify({'error':'relink_failed','detail':str(e)}), 500
@@ -872,56 +797,17 @@ def create_app():
 
     # Booking endpoints (customers create, admin can view/manage)
 
-    def generate_qr_base64(text: str) -> str:
-        img = qrcode.make(text)
-        buf = io.BytesIO()
-        # PIL accepts a positional format argument; use positional to avoid static analyzer issues
-        img.save(buf, 'PNG')
-        b = buf.getvalue()
-        return base64.b64encode(b).decode('ascii')
+    # QR PNGs are rendered by a background pool after the booking commit (QR_WORKERS=0 renders inline).
+    qr_renderer = QRRenderer(app)
+    app.extensions['qr_renderer'] = qr_renderer
+
+    # Compiled pricing rules; rebuilt lazily after the pricing CRUD endpoints invalidate it.
+    pricing_index = PricingIndex(loader=lambda: PricingRule.query.order_by(PricingRule.priority.desc()).all())
+    app.extensions['pricing_index'] = pricing_index
 
     def compute_price_for(date_obj, time_slot, num_adults, num_children):
-        # find applicable pricing rule by priority
-        rules = PricingRule.query.order_by(PricingRule.priority.desc()).all()
-        from datetime import datetime, time as dt_time
-        applicable = None
-        for r in rules:
-            ok = True
-            if r.start_date and date_obj < r.start_date:
-                ok = False
-            if r.end_date and date_obj > r.end_date:
-                ok = False
-            # days: CSV of 0-6 where Monday=0
-            if r.days:
-                days = [int(x) for x in r.days.split(',') if x.strip().isdigit()]
-                if date_obj.weekday() not in days:
-                    ok = False
-            # time window check
-            if r.start_time or r.end_time:
-                try:
-                    ts_parts = time_slot.split('-')
-                    start_ts = datetime.strptime(ts_parts[0].strip(), '%H:%M').time()
-                    # check overlap with rule window
-                    if r.start_time:
-                        rule_start = datetime.strptime(r.start_time, '%H:%M').time()
-                        if start_ts < rule_start:
-                            ok = False
-                    if r.end_time:
-                        rule_end = datetime.strptime(r.end_time, '%H:%M').time()
-                        if start_ts > rule_end:
-                            ok = False
-                except Exception:
-                    pass
-            if ok:
-                applicable = r
-                break
-        if applicable:
-            total = num_adults * applicable.adult_cents + num_children * applicable.child_cents
-            return total, applicable.currency
-        # fallback default pricing
-        default_adult = 20000  # INR paise (200.00 INR)
-        default_child = 10000  # 100.00 INR
-        return num_adults * default_adult + num_children * default_child, 'INR'
+        # highest-priority applicable rule, else default pricing
+        return pricing_index.ensure().price(date_obj, time_slot, num_adults, num_children)
 
     @app.route('/api/bookings', methods=['POST'])
     @jwt_required()
@@ -943,6 +829,11 @@ def create_app():
         # allow client to pass price_cents/currency, else compute using pricing rules
         price_cents = data.get('price_cents')
         currency = data.get('currency', 'INR')
+        if price_cents is not None:
+            try:
+                price_cents = int(price_cents)
+            except (TypeError, ValueError):
+                return jsonify({'msg': 'price_cents must be an integer'}), 400
         if price_cents is None:
             price_cents, currency = compute_price_for(bdate, time_slot, num_adults, num_children)
         paid = data.get('paid', False)
@@ -959,44 +850,27 @@ def create_app():
         )
         db.session.add(booking)
         db.session.commit()
-
-        # generate QR with booking id
-        qr_text = f"booking:{booking.id}"
-        booking.qr_code_b64 = generate_qr_base64(qr_text)
-        db.session.commit()
+        # QR (encodes booking id) is filled in asynchronously; qr.png renders it on demand if still pending
+        qr_renderer.submit(booking.id)
         return jsonify(booking.to_dict()), 201
 
     @app.route('/api/bookings', methods=['GET'])
     @jwt_required()
+    @conditional('booking', per_user=True, admin_sees_all=True)
     def list_bookings():
         try:
             claims = get_jwt()
             uid = get_jwt_identity()
-            def to_int(val, default):
-                try:
-                    return int(val)
-                except Exception:
-                    return default
-            page = max(to_int(request.args.get('page', 1), 1), 1)
-            per_page = to_int(request.args.get('per_page', 20), 20)
-            per_page = min(max(per_page, 1), 100)
             query = Booking.query
             if claims.get('role') != 'admin':
                 query = query.filter_by(user_id=int(uid))
-            total = query.count()
-            items = (query.order_by(Booking.id.desc())
-                          .offset((page - 1) * per_page)
-                          .limit(per_page)
-                          .all())
-            pages = (total + per_page - 1) // per_page if per_page else 1
+            try:
+                items, meta = paginate(query, Booking.id, request.args)
+            except InvalidCursor:
+                return jsonify({'msg': 'invalid cursor'}), 400
             return jsonify({
                 'data': [b.to_dict() for b in items],
-                'meta': {
-                    'page': page,
-                    'per_page': per_page,
-                    'total': total,
-                    'pages': pages
-                }
+                'meta': meta
             })
         except Exception as e:
             return jsonify({'error': 'bookings_list_failed', 'detail': str(e)}), 500
@@ -1039,6 +913,68 @@ def create_app():
         rules = PricingRule.query.order_by(PricingRule.priority.desc()).all()
         return jsonify([r.to_dict() for r in rules])
 
+    @app.route('/api/pricing/quote', methods=['GET'])
+    def pricing_quote():
+        """Public read-only price calendar.
+
+        Query params:
+          - start_date (ISO, default today), end_date (ISO, default start + 29 days, max 366 days)
+          - slots: comma separated HH:MM-HH:MM list (default: standard visiting slots)
+          - adults / children: party mix (default 1 / 0)
+        Returns one row per date with a price per slot, evaluated in a single pass
+        over the compiled pricing index (no per-cell DB queries).
+        """
+        try:
+            sd_raw = request.args.get('start_date')
+            start = datetime.fromisoformat(sd_raw).date() if sd_raw else datetime.utcnow().date()
+            ed_raw = request.args.get('end_date')
+            end = datetime.fromisoformat(ed_raw).date() if ed_raw else start + timedelta(days=29)
+        except Exception:
+            return jsonify({'msg': 'invalid date format, use ISO YYYY-MM-DD'}), 400
+        num_days = (end - start).days + 1
+        if num_days < 1 or num_days > 366:
+            return jsonify({'msg': 'date range must cover 1-366 days'}), 400
+        slots_raw = request.args.get('slots')
+        slots = [s.strip() for s in slots_raw.split(',') if s.strip()] if slots_raw else list(DEFAULT_SLOTS)
+        if not slots or len(slots) > 24:
+            return jsonify({'msg': 'provide 1-24 slots'}), 400
+        try:
+            adults = max(int(request.args.get('adults', 1)), 0)
+            children = max(int(request.args.get('children', 0)), 0)
+        except Exception:
+            return jsonify({'msg': 'adults and children must be integers'}), 400
+        # one snapshot for the matrix and the rule cells: a concurrent rebuild cannot mix rule sets
+        snapshot = pricing_index.ensure()
+        matrix = snapshot.quote_matrix(start, num_days, slots)
+        default_cell = {
+            'price_cents': adults * DEFAULT_ADULT_CENTS + children * DEFAULT_CHILD_CENTS,
+            'currency': 'INR',
+            'rule_id': None
+        }
+        # Cells priced by the same rule share one dict; jsonify serializes them independently.
+        rule_cells = {}
+        for c in snapshot.rules:
+            rule_cells[c.order] = {
+                'price_cents': adults * c.adult_cents + children * c.child_cents,
+                'currency': c.currency,
+                'rule_id': c.id
+            }
+        rows = []
+        for off in range(num_days):
+            cells = []
+            for row in matrix:
+                c = row[off]
+                cells.append(rule_cells[c.order] if c is not None else default_cell)
+            rows.append({'date': (start + timedelta(days=off)).isoformat(), 'prices': cells})
+        return jsonify({
+            'start_date': start.isoformat(),
+            'end_date': end.isoformat(),
+            'slots': slots,
+            'adults': adults,
+            'children': children,
+            'dates': rows
+        })
+
     # ---------- TicketType CRUD (admin) ----------
     @app.route('/api/ticket-types', methods=['GET'])
     @jwt_required()
@@ -1126,19 +1062,22 @@ def create_app():
         claims = get_jwt()
         if claims.get('role') != 'admin':
             return jsonify({'msg': 'forbidden'}), 403
-        # aggregate simple stats
-        total_revenue = db.session.query(db.func.coalesce(db.func.sum(TicketSale.total_cents),0)).scalar() or 0
-        total_tickets = db.session.query(db.func.count(TicketSale.id)).scalar() or 0
+        # one row per day/channel/ticket type instead of every sale (see rollups.py)
+        total_revenue, total_tickets = rollups.sales_totals(db.session)
         return jsonify({'total_revenue_cents': total_revenue, 'sales_count': total_tickets})
 
     # ---------- Events CRUD ----------
     @app.route('/api/events', methods=['GET'])
+    @conditional('event', 'image_catalog', vary=lambda: datetime.utcnow().date().isoformat())
+    @response_cache.cached('event', 'image_catalog')
     def public_events():
         today = datetime.utcnow().date()
         events = Event.query.filter(Event.active == True, Event.start_date >= today).order_by(Event.start_date.asc()).limit(50).all()
         return jsonify([e.to_dict() for e in events])
 
     @app.route('/api/events/<int:eid>', methods=['GET'])
+    @conditional('event', 'image_catalog')
+    @response_cache.cached('event', 'image_catalog')
     def get_event_public(eid):
         ev = Event.query.get_or_404(eid)
         # Only expose active events publicly
@@ -1211,11 +1150,15 @@ def create_app():
 
     # ---------- News CRUD ----------
     @app.route('/api/news', methods=['GET'])
+    @conditional('news_item', 'image_catalog')
+    @response_cache.cached('news_item', 'image_catalog')
     def public_news():
         items = NewsItem.query.filter(NewsItem.published == True).order_by(NewsItem.publish_date.desc().nullslast(), NewsItem.created_at.desc()).limit(50).all()
         return jsonify([n.to_dict() for n in items])
 
     @app.route('/api/news/<int:nid>', methods=['GET'])
+    @conditional('news_item', 'image_catalog')
+    @response_cache.cached('news_item', 'image_catalog')
     def get_news_public(nid):
         item = NewsItem.query.get_or_404(nid)
         # Only expose published items publicly
@@ -1296,6 +1239,8 @@ def create_app():
 
     # ---------- Page Content CRUD (About / Contact) ----------
     @app.route('/api/pages/<string:key>', methods=['GET'])
+    @conditional('page_content')
+    @response_cache.cached('page_content')
     def get_page(key):
         pc = PageContent.query.filter_by(page_key=key).first()
         return jsonify(pc.to_dict() if pc else {'page_key': key, 'title': key.title(), 'body': ''})
@@ -1357,24 +1302,81 @@ def create_app():
         return jsonify(fb.to_dict())
 
     # ---------- Audit Log & helper ----------
+    # audit entries are queued and inserted in batches by a background writer (AUDIT_MODE=sync commits inline)
+    audit_writer = AuditWriter(app)
+    app.extensions['audit_writer'] = audit_writer
+
     def log_action(action, entity=None, entity_id=None, metadata=None):
         try:
             uid = get_jwt_identity()
         except Exception:
             uid = None
         # kept parameter name 'metadata' for backward compatibility; store in 'meta' field
-        al = AuditLog(user_id=int(uid) if uid else None, action=action, entity=entity, entity_id=entity_id, meta=metadata)
-        db.session.add(al)
-        db.session.commit()
+        audit_writer.log(int(uid) if uid else None, action, entity, entity_id, metadata)
 
     @app.route('/api/audit', methods=['GET'])
     @jwt_required()
     def list_audit():
+        """Audit entries, newest first, as ``{data, meta}`` (see pagination.py).
+
+        Filters: user_id, action, entity, entity_id, since / until (ISO
+        date or datetime, UTC, ``until`` exclusive). Each filter has an index
+        ending in ``id``; walk further with ``after=<meta.next_cursor>``.
+        Entries older than the retention window are in the archive files
+        (POST /api/admin/audit/archive).
+        """
+        claims = get_jwt()
+        if claims.get('role') != 'admin':
+            return jsonify({'msg':'forbidden'}), 403
+        audit_writer.flush()
+        args = request.args
+        query = AuditLog.query
+        try:
+            if args.get('user_id'):
+                query = query.filter(AuditLog.user_id == int(args['user_id']))
+            if args.get('entity_id'):
+                query = query.filter(AuditLog.entity_id == int(args['entity_id']))
+        except ValueError:
+            return jsonify({'msg': 'user_id and entity_id must be integers'}), 400
+        if args.get('action'):
+            query = query.filter(AuditLog.action == args['action'])
+        if args.get('entity'):
+            query = query.filter(AuditLog.entity == args['entity'])
+        for key in ('since', 'until'):
+            if args.get(key):
+                try:
+                    bound = datetime.fromisoformat(args[key].replace('Z', '+00:00')).replace(tzinfo=None)
+                except ValueError:
+                    return jsonify({'msg': f'invalid {key}'}), 400
+                query = query.filter(AuditLog.created_at >= bound if key == 'since' else AuditLog.created_at < bound)
+        try:
+            params = args.to_dict()
+            params.setdefault('include_total', 'false')
+            items, meta = paginate(query, AuditLog.id, params, default_per_page=100, max_per_page=500)
+        except InvalidCursor:
+            return jsonify({'msg': 'invalid cursor'}), 400
+        return jsonify({'data': [l.to_dict() for l in items], 'meta': meta})
+
+    @app.route('/api/admin/audit/archive', methods=['POST'])
+    @jwt_required()
+    def archive_audit():
+        """Move audit entries older than ``days`` (default AUDIT_RETENTION_DAYS) into gzip archive files."""
         claims = get_jwt()
         if claims.get('role') != 'admin':
             return jsonify({'msg':'forbidden'}), 403
-        logs = AuditLog.query.order_by(AuditLog.created_at.desc()).limit(500).all()
-        return jsonify([l.to_dict() for l in logs])
+        data = request.get_json(silent=True) or {}
+        try:
+            days = int(data.get('days', audit_retention_days()))
+        except (TypeError, ValueError):
+            return jsonify({'msg': 'days must be an integer'}), 400
+        if days < 1:
+            return jsonify({'msg': 'days must be at least 1'}), 400
+        audit_writer.flush()
+        try:
+            return jsonify(archive_audit_log(days, audit_archive_dir()))
+        except Exception as e:
+            db.session.rollback()
+            return jsonify({'error': 'archive_failed', 'detail': str(e)}), 500
 
     # ---------- Assignments (animals to staff/vets) ----------
     @app.route('/api/assignments', methods=['POST'])
@@ -1426,9 +1428,9 @@ def create_app():
         total_animals = Animal.query.count()
         total_doctors = User.query.filter_by(role='vet').count()
         total_users = User.query.count()
-        # revenue from TicketSale + Booking (paid)
-        ticket_sale_revenue = db.session.query(db.func.coalesce(db.func.sum(TicketSale.total_cents),0)).scalar() or 0
-        booking_revenue = db.session.query(db.func.coalesce(db.func.sum(Booking.price_cents),0)).filter(Booking.paid == True).scalar() or 0
+        # revenue from TicketSale + Booking (paid), read from the daily rollups
+        ticket_sale_revenue, _ = rollups.sales_totals(db.session)
+        booking_revenue = rollups.paid_booking_revenue(db.session)
         return jsonify({
             'animals': total_animals,
             'doctors': total_doctors,
@@ -1436,18 +1438,104 @@ def create_app():
             'revenue_cents': ticket_sale_revenue + booking_revenue
         })
 
+    @app.route('/api/analytics/timeseries', methods=['GET'])
+    @jwt_required()
+    def analytics_timeseries():
+        """One metric over a date range, bucketed by day, week or month.
+
+        Query: metric (revenue | bookings | visitors | ticket_sales),
+        from / to (ISO dates, inclusive; default the last 30 days) and
+        granularity (day | week | month). Computed from the daily rollups and
+        cached per (metric, range, bucket) until the next sale or booking.
+        """
+        claims = get_jwt()
+        if claims.get('role') != 'admin':
+            return jsonify({'msg':'forbidden'}), 403
+        args = request.args
+        metric = args.get('metric', 'revenue')
+        granularity = args.get('granularity', 'day')
+        if metric not in rollups.METRICS:
+            return jsonify({'msg': f"metric must be one of {', '.join(rollups.METRICS)}"}), 400
+        if granularity not in rollups.GRANULARITIES:
+            return jsonify({'msg': f"granularity must be one of {', '.join(rollups.GRANULARITIES)}"}), 400
+        try:
+            end = date.fromisoformat(args['to']) if args.get('to') else datetime.utcnow().date()
+            start = date.fromisoformat(args['from']) if args.get('from') else end - timedelta(days=29)
+        except ValueError:
+            return jsonify({'msg': 'from and to must be ISO dates'}), 400
+        if start > end:
+            return jsonify({'msg': 'from must not be after to'}), 400
+        if len(rollups.buckets(start, end, granularity)) > rollups.MAX_BUCKETS:
+            return jsonify({'msg': f'at most {rollups.MAX_BUCKETS} buckets; use a coarser granularity'}), 400
+        # keyed on the parsed range so equivalent queries share an entry; writes to the rollups invalidate it
+        key = f"timeseries:{metric}:{start.isoformat()}:{end.isoformat()}:{granularity}"
+        versions = changes.version('ticket_sale_daily', 'booking_daily')
+        body = response_cache.get(key, versions)
+        hit = body is not None
+        if not hit:
+            body = json.dumps(rollups.timeseries(db.session, metric, start, end, granularity))
+            response_cache.put(key, versions, body)
+        resp = app.response_class(body, mimetype='application/json')
+        resp.headers['X-Cache'] = 'HIT' if hit else 'MISS'
+        return resp
+
     # ---------- Global Search Endpoint ----------
     @app.route('/api/search', methods=['GET'])
     def global_search():
+        """Search animals, vets, events, news and pages.
+
+        With the FTS5 index available, results are ranked (bm25), prefix
+        matched per word and carry a ``snippet``; ``results`` lists every hit in
+        rank order. Without it the original LIKE queries are used.
+        """
         q = (request.args.get('q') or '').strip()
         if not q:
-            return jsonify({'animals': [], 'doctors': [], 'events': [], 'news': []})
+            return jsonify({'animals': [], 'doctors': [], 'events': [], 'news': [], 'pages': [], 'results': []})
         like = f"%{q}%"
-        animals = [a.to_dict() for a in Animal.query.filter(Animal.name.ilike(like)).limit(10).all()]
         doctors = [u.to_dict() for u in User.query.filter(User.role=='vet', User.username.ilike(like)).limit(10).all()]
-        events = [e.to_dict() for e in Event.query.filter(Event.title.ilike(like)).limit(10).all()]
-        news = [n.to_dict() for n in NewsItem.query.filter(NewsItem.title.ilike(like)).limit(10).all()]
-        return jsonify({'animals': animals, 'doctors': doctors, 'events': events, 'news': news})
+        if not search_index.available:
+            animals = [a.to_dict() for a in Animal.query.filter(Animal.name.ilike(like)).limit(10).all()]
+            events = [e.to_dict() for e in Event.query.filter(Event.title.ilike(like)).limit(10).all()]
+            news = [n.to_dict() for n in NewsItem.query.filter(NewsItem.title.ilike(like)).limit(10).all()]
+            return jsonify({'animals': animals, 'doctors': doctors, 'events': events, 'news': news, 'pages': [], 'results': []})
+        per_kind = search_index.search_by_kind(db.session, q, limit=10)
+        models = {'animal': Animal, 'event': Event, 'news': NewsItem, 'page': PageContent}
+        grouped = {}
+        for kind, bucket in per_kind.items():
+            model = models[kind]
+            rows = {r.id: r for r in model.query.filter(model.id.in_([h['id'] for h in bucket])).all()}
+            out = []
+            for h in bucket:
+                r = rows.get(h['id'])
+                if r is None:
+                    continue
+                d = r.to_dict()
+                d['snippet'] = h['snippet']
+                out.append(d)
+            grouped[kind] = out
+        shown = {(kind, d['id']) for kind, items in grouped.items() for d in items}
+        hits = sorted((h for bucket in per_kind.values() for h in bucket), key=lambda h: h['rank'])
+        results = [h for h in hits if (h['kind'], h['id']) in shown]
+        return jsonify({
+            'animals': grouped.get('animal', []),
+            'doctors': doctors,
+            'events': grouped.get('event', []),
+            'news': grouped.get('news', []),
+            'pages': grouped.get('page', []),
+            'results': results
+        })
+
+    @app.route('/api/search/suggest', methods=['GET'])
+    def search_suggest():
+        """Typeahead suggestions from the in-process prefix/trigram index (no DB work once warm)."""
+        q = (request.args.get('q') or '').strip()
+        try:
+            limit = min(max(int(request.args.get('limit', 8)), 1), 20)
+        except Exception:
+            limit = 8
+        if not q:
+            return jsonify({'q': q, 'suggestions': []})
+        return jsonify({'q': q, 'suggestions': suggest_index.ensure().suggest(q, limit=limit)})
 
     @app.route('/api/pricing/<int:rule_id>', methods=['PUT'])
     @jwt_required()
@@ -1536,7 +1624,11 @@ def create_app():
         full_path = os.path.join(upload_dir, safe_target)
         f.save(full_path)
         url = "/uploads/" + safe_target.replace("\\", "/")
-        return jsonify({'msg':'uploaded', 'url': url})
+        # thumbnails/WebP are produced in the image worker pool; srcset fills in when done
+        image_index.submit(url)
+        gallery_manifest.invalidate()
+        catalog.invalidate()
+        return jsonify({'msg':'uploaded', 'url': url, 'srcset': image_index.srcset_for(url)})
 
     @app.route('/uploads/<path:filename>')
     def serve_upload(filename):
@@ -1579,6 +1671,7 @@ def create_app():
     # ---------- Favorites (Animals / Events) ----------
     @app.route('/api/favorites/animals', methods=['GET'])
     @jwt_required()
+    @conditional('favorite_animal', per_user=True)
     def fav_animals():
         uid = get_jwt_identity()
         favs = FavoriteAnimal.query.filter_by(user_id=int(uid)).all()
@@ -1611,6 +1704,7 @@ def create_app():
 
     @app.route('/api/favorites/events', methods=['GET'])
     @jwt_required()
+    @conditional('favorite_event', per_user=True)
     def fav_events():
         uid = get_jwt_identity()
         favs = FavoriteEvent.query.filter_by(user_id=int(uid)).all()
@@ -1652,6 +1746,31 @@ def create_app():
         # For now return JSON; frontend can render PDF client-side.
         return jsonify({'booking': b.to_dict(), 'generated_at': datetime.utcnow().isoformat()})
 
+    @app.route('/api/bookings/<int:booking_id>/qr.png', methods=['GET'])
+    @jwt_required()
+    def booking_qr_png(booking_id):
+        """Booking QR as a cacheable PNG (owner or admin).
+
+        The image never changes for a given id, so once the caller is allowed
+        to see the booking, revalidation is answered from the ETag alone.
+        """
+        row = (db.session.query(Booking.user_id, Booking.qr_png, Booking.qr_code_b64)
+               .filter(Booking.id == booking_id).first())
+        if row is None:
+            return jsonify({'msg': 'not found'}), 404
+        owner, png, legacy_b64 = row
+        claims = get_jwt()
+        if claims.get('role') != 'admin' and owner != int(get_jwt_identity()):
+            return jsonify({'msg': 'forbidden'}), 403
+        etag = qr_etag(booking_id)
+        if request.if_none_match.contains(etag):
+            resp = app.response_class(status=304)
+        else:
+            resp = app.response_class(qr_renderer.png_for(booking_id, png, legacy_b64), mimetype='image/png')
+        resp.set_etag(etag)
+        resp.headers['Cache-Control'] = 'private, max-age=31536000, immutable'
+        return resp
+
     # ---------- Payment Intent Stub ----------
     @app.route('/api/payments/intent', methods=['POST'])
     @jwt_required()
@@ -1703,14 +1822,26 @@ def create_app():
             animal_count = Animal.query.count()
             user_count = User.query.count()
             booking_count = Booking.query.count()
-            return jsonify({
+            payload = {
                 'status': 'ok',
                 'service': 'Smart Zoo API',
                 'animals': animal_count,
                 'users': user_count,
                 'bookings': booking_count,
+                'response_cache': response_cache.stats(),
+                'password_hashing': password_hasher.stats(),
+                'audit_writer': audit_writer.stats(),
                 'time': datetime.utcnow().isoformat() + 'Z'
-            })
+            }
+            # pool sizing and load are only shown to admins; a bad token just gets the public view
+            try:
+                verify_jwt_in_request(optional=True)
+                is_admin = (get_jwt() or {}).get('role') == 'admin'
+            except Exception:
+                is_admin = False
+            if is_admin:
+                payload['db_pool'] = pool_stats(db.engine, engine_options.get('max_overflow'))
+            return jsonify(payload)
         except Exception as e:
             return jsonify({'status': 'error', 'error': str(e)}), 500
 
@@ -1724,21 +1855,69 @@ def create_app():
 </svg>"""
         return svg, 200, {'Content-Type': 'image/svg+xml', 'Cache-Control': 'public, max-age=86400'}
 
+    # --- Video renditions ---
+    @app.route('/api/media/videos', methods=['GET'])
+    def media_videos():
+        return jsonify({'videos': list(video_renditions.listing('/api/media/renditions'))})
+
+    @app.route('/api/media/renditions/<path:filename>', methods=['GET'])
+    def media_rendition(filename):
+        # names carry a hash of the source, so they never change in place
+        resp = send_from_directory(renditions_dir, filename, max_age=31536000)
+        resp.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+        return resp
+
+    @app.route('/api/admin/media/renditions', methods=['GET'])
+    @jwt_required()
+    def list_rendition_jobs():
+        claims = get_jwt()
+        if claims.get('role') != 'admin':
+            return jsonify({'msg': 'forbidden'}), 403
+        return jsonify({'ffmpeg': video_renditions.available, 'jobs': list(video_renditions.jobs.values())})
+
+    @app.route('/api/admin/media/renditions', methods=['POST'])
+    @jwt_required()
+    def create_renditions():
+        claims = get_jwt()
+        if claims.get('role') != 'admin':
+            return jsonify({'msg': 'forbidden'}), 403
+        if not video_renditions.available:
+            return jsonify({'msg': 'ffmpeg not available on this server'}), 503
+        data = request.get_json() or {}
+        names = [data['video']] if data.get('video') else video_renditions.sources()
+        try:
+            jobs = [dict(video_renditions.submit(n)) for n in names]
+        except FileNotFoundError:
+            return jsonify({'msg': 'video not found'}), 404
+        log_action('renditions', 'Video', None, json.dumps({'videos': names}))
+        return jsonify({'jobs': jobs}), 202
+
     # --- Frontend static file serving (production/dev fallback) ---
     # Serve Vite build outputs so the app works without running the Vite dev server.
+    def _static(rel):
+        entry = static_manifest.get(rel)
+        if entry is None:
+            return jsonify({'msg': 'Not Found'}), 404
+        return static_manifest.response(app, entry)
+
     @app.route('/assets/<path:filename>')
     def serve_assets(filename):
         # hashed JS/CSS and other compiled assets live here after build
-        return send_from_directory(ASSETS_DIR, filename)
+        return _static(f'assets/{filename}')
 
     @app.route('/images/<path:filename>')
     def serve_images(filename):
         # public images (copied by Vite) are under dist/images
-        return send_from_directory(IMAGES_DIR, filename)
+        return _static(f'images/{filename}')
 
     @app.route('/favicon.svg')
     def serve_favicon():
-        return send_from_directory(FRONTEND_DIST, 'favicon.svg')
+        return _static('favicon.svg')
+
+    @app.route('/Videos/<path:filename>')
+    def serve_videos(filename):
+        # byte-range (206) capable, so playback starts before the whole file arrives
+        return _static(f'Videos/{filename}')
 
     @app.route('/', defaults={'path': ''})
     @app.route('/<path:path>')
@@ -1747,23 +1926,30 @@ def create_app():
         if path.startswith('api/') or path.startswith('uploads/'):
             return jsonify({'msg': 'Not Found'}), 404
         # If a direct file exists in dist, serve it (e.g., index.html, manifest, etc.)
-        requested = os.path.join(FRONTEND_DIST, path)
-        if path and os.path.isfile(requested):
-            # serve the exact file
-            directory = os.path.dirname(requested)
-            filename = os.path.basename(requested)
-            return send_from_directory(directory, filename)
-        # Otherwise, fall back to SPA index.html
-        index_path = os.path.join(FRONTEND_DIST, 'index.html')
-        if os.path.isfile(index_path):
-            return send_from_directory(FRONTEND_DIST, 'index.html')
+        entry = static_manifest.get(path) if path else None
+        if entry is not None and path != 'index.html':
+            return static_manifest.response(app, entry)
+        # Otherwise, fall back to SPA index.html (kept in memory)
+        if static_manifest.index_html is not None:
+            return static_manifest.index_response(app)
         # If the build is missing, show an informative error
         return jsonify({'msg': 'Frontend build not found. Please run npm run build in frontend.'}), 500
 
+    profile.mark('routes')
+    app.extensions['startup_profile'] = profile
     return app
 
 
 if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description='Zooverse API server')
+    parser.add_argument('--profile-startup', action='store_true', help='print boot time per phase and exit')
+    args = parser.parse_args()
+    if args.profile_startup:
+        profiled = create_app()
+        print(profiled.extensions['startup_profile'].report())
+        print(f"warm boot: {profiled.extensions['boot']['warm']}")
+        raise SystemExit(0)
     # Respect ENV for debug; default to False
     debug_mode = os.environ.get('ENV', 'development') != 'production' and os.environ.get('FLASK_DEBUG') == '1'
     create_app().run(debug=debug_mode)
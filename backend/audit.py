@@ -0,0 +1,312 @@
+"""Buffered audit log writer.
+
+``log_action`` used to add an ``AuditLog`` row and commit it right after the
+caller's own commit: two fsyncs per admin write, and one more writer queued
+on SQLite's write lock next to bookings. ``AuditWriter`` queues entries in
+memory instead; a background thread, started when the first entry is queued
+and ended once the queue is empty, inserts them with one multi-row INSERT
+per flush, when ``AUDIT_FLUSH_SIZE`` entries are waiting or
+``AUDIT_FLUSH_INTERVAL`` seconds after the oldest one arrived.
+
+``created_at`` is taken when the action happens, not when it is written.
+``flush()`` writes everything queued so far. It runs before ``/api/audit``
+reads (so an admin sees their own actions), from ``atexit`` and on
+``shutdown()``, so a clean stop loses nothing. Failed inserts stay queued
+and are retried; after ``AUDIT_FLUSH_ATTEMPTS`` failures the batch is written
+row by row and rows that still fail go to a dead-letter JSON-lines file.
+
+Retention: ``archive_before`` moves entries older than N days out of the hot
+table into gzip JSON-lines files (one file per id-ordered batch, written and
+fsynced before the batch is deleted), so ``/api/audit`` queries and indexes
+stay small. Run it from cron or the admin endpoint:
+
+  python -m backend.audit archive [--days 365]
+  POST /api/admin/audit/archive {"days": 365}
+
+Environment:
+  AUDIT_MODE            buffered (default) | sync - sync commits every entry on the request thread
+  AUDIT_FLUSH_SIZE      entries per batch (default 200)
+  AUDIT_FLUSH_INTERVAL  max seconds an entry waits (default 1.0)
+  AUDIT_FLUSH_ATTEMPTS  failed batch flushes before writing row by row (default 3)
+  AUDIT_DEAD_LETTER     file for entries that cannot be written (default <archive dir>/dead-letter.jsonl)
+  AUDIT_RETENTION_DAYS  age after which entries are archived (default 365)
+  AUDIT_ARCHIVE_DIR     archive directory (default backend/instance/audit-archive)
+"""
+from __future__ import annotations
+import atexit
+import gzip
+import json
+import os
+import threading
+import weakref
+from datetime import datetime, timedelta
+
+try:
+    from .models import db, AuditLog
+    from . import changes
+except ImportError:  # python app.py from backend folder
+    from models import db, AuditLog
+    import changes
+
+
+class AuditWriter:
+
+    def __init__(self, app, mode=None, flush_size=None, interval=None, max_attempts=None):
+        self.app = app
+        mode = (mode or os.environ.get('AUDIT_MODE', 'buffered')).strip().lower()
+        self.mode = mode if mode in ('buffered', 'sync') else 'buffered'
+        if flush_size is None:
+            try:
+                flush_size = int(os.environ.get('AUDIT_FLUSH_SIZE', 200))
+            except Exception:
+                flush_size = 200
+        self.flush_size = max(flush_size, 1)
+        if interval is None:
+            try:
+                interval = float(os.environ.get('AUDIT_FLUSH_INTERVAL', 1.0))
+            except Exception:
+                interval = 1.0
+        self.interval = max(interval, 0.01)
+        if max_attempts is None:
+            try:
+                max_attempts = int(os.environ.get('AUDIT_FLUSH_ATTEMPTS', 3))
+            except Exception:
+                max_attempts = 3
+        self.max_attempts = max(max_attempts, 1)
+        self._buffer = []
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._stopped = False
+        self._attempts = 0
+        self.written = 0
+        self.flushes = 0
+        self.failures = 0
+        self.dead_lettered = 0
+        self._thread = None
+        if self.mode == 'buffered':
+            _writers.add(self)
+
+    def log(self, user_id, action, entity=None, entity_id=None, meta=None):
+        row = {'user_id': user_id, 'action': action, 'entity': entity, 'entity_id': entity_id,
+               'meta': meta, 'created_at': datetime.utcnow()}
+        if self.mode == 'sync' or self._stopped:
+            db.session.add(AuditLog(**row))
+            db.session.commit()
+            self.written += 1
+            return
+        with self._cond:
+            self._buffer.append(row)
+            if self._thread is None:
+                # the writer thread only lives while entries are queued
+                self._thread = threading.Thread(target=self._loop, name='audit-writer', daemon=True)
+                self._thread.start()
+            elif len(self._buffer) >= self.flush_size:
+                self._cond.notify()
+
+    def pending(self):
+        return len(self._buffer)
+
+    def _loop(self):
+        while True:
+            with self._cond:
+                if self._stopped or not self._buffer:
+                    self._thread = None
+                    return
+                # give the batch until the interval runs out to fill up
+                if len(self._buffer) < self.flush_size:
+                    self._cond.wait(self.interval)
+            try:
+                self.flush()
+            except Exception:
+                # flush() already counted and logged it; back off one interval before retrying
+                with self._cond:
+                    self._cond.wait(self.interval)
+
+    def _insert(self, rows):
+        with self.app.app_context():
+            try:
+                for start in range(0, len(rows), self.flush_size):
+                    db.session.execute(AuditLog.__table__.insert().values(rows[start:start + self.flush_size]))
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                raise
+
+    def _insert_each(self, rows):
+        """Write ``rows`` one per transaction; rows that still fail go to the dead-letter file."""
+        written = 0
+        dead = []
+        for row in rows:
+            try:
+                self._insert([row])
+                written += 1
+            except Exception as e:
+                dead.append(dict(row, error=str(e)))
+        if dead:
+            path = dead_letter_path()
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'a', encoding='utf-8') as fh:
+                for row in dead:
+                    fh.write(json.dumps(row, default=str, separators=(',', ':')) + '\n')
+            self.dead_lettered += len(dead)
+            print(f"[audit_warning] {len(dead)} entries could not be written; saved to {path}", flush=True)
+        return written
+
+    def flush(self):
+        """Insert every queued entry; returns the number written.
+
+        A failed batch goes back to the queue. After ``AUDIT_FLUSH_ATTEMPTS``
+        failures in a row it is written one entry per transaction instead, and
+        entries that still fail are appended to the dead-letter file, so one
+        bad row cannot block the queue forever.
+        """
+        with self._flush_lock:
+            with self._cond:
+                rows, self._buffer = self._buffer, []
+            if not rows:
+                return 0
+            try:
+                self._insert(rows)
+                written = len(rows)
+            except Exception as e:
+                self.failures += 1
+                self._attempts += 1
+                print(f"[audit_warning] flush of {len(rows)} entries failed "
+                      f"({self._attempts}/{self.max_attempts}): {e}", flush=True)
+                if self._attempts < self.max_attempts:
+                    with self._cond:
+                        self._buffer[:0] = rows
+                    raise
+                written = self._insert_each(rows)
+            self._attempts = 0
+            self.written += written
+            self.flushes += 1
+            # Core inserts bypass the ORM flush hooks
+            changes.bump('audit_log')
+            return written
+
+    def shutdown(self):
+        """Stop the writer thread and write whatever is still queued."""
+        with self._cond:
+            if self._stopped:
+                return
+            self._stopped = True
+            thread = self._thread
+            self._cond.notify_all()
+        if thread is not None:
+            thread.join(timeout=10)
+        try:
+            self.flush()
+        except Exception:
+            pass
+        _writers.discard(self)
+
+    def stats(self):
+        return {'mode': self.mode, 'pending': self.pending(), 'written': self.written,
+                'flushes': self.flushes, 'failures': self.failures, 'dead_lettered': self.dead_lettered}
+
+
+# buffered writers of live apps; one exit hook flushes them all, and a writer
+# is dropped with its app instead of being pinned by a per-instance atexit entry
+_writers = weakref.WeakSet()
+
+
+def _shutdown_all():
+    for writer in list(_writers):
+        writer.shutdown()
+
+
+atexit.register(_shutdown_all)
+
+
+# -- retention ---------------------------------------------------------------
+ARCHIVE_BATCH = 5000
+
+
+def retention_days():
+    try:
+        return max(int(os.environ.get('AUDIT_RETENTION_DAYS', 365)), 1)
+    except Exception:
+        return 365
+
+
+def archive_dir():
+    return os.environ.get('AUDIT_ARCHIVE_DIR') or os.path.abspath(
+        os.path.join(os.path.dirname(__file__), 'instance', 'audit-archive'))
+
+
+def dead_letter_path():
+    return os.environ.get('AUDIT_DEAD_LETTER') or os.path.join(archive_dir(), 'dead-letter.jsonl')
+
+
+def _write_archive(directory, rows):
+    os.makedirs(directory, exist_ok=True)
+    name = f"audit-{rows[0].id:010d}-{rows[-1].id:010d}.jsonl.gz"
+    path = os.path.join(directory, name)
+    tmp = path + '.part'
+    with open(tmp, 'wb') as raw:
+        with gzip.GzipFile(fileobj=raw, mode='wb') as gz:
+            for r in rows:
+                gz.write((json.dumps(r.to_dict(), separators=(',', ':')) + '\n').encode('utf-8'))
+        raw.flush()
+        os.fsync(raw.fileno())
+    os.replace(tmp, path)
+    return name
+
+
+def archive_before(days, directory, batch=ARCHIVE_BATCH, now=None):
+    """Move entries older than ``days`` into archive files; needs an app context.
+
+    Returns {'archived', 'files', 'cutoff'}. Each batch is written and fsynced
+    before its rows are deleted, so a crash can duplicate a batch in the
+    archive but never lose one.
+    """
+    cutoff = (now or datetime.utcnow()) - timedelta(days=days)
+    archived = 0
+    files = []
+    last_id = 0
+    while True:
+        rows = (AuditLog.query
+                .filter(AuditLog.created_at < cutoff, AuditLog.id > last_id)
+                .order_by(AuditLog.id)
+                .limit(batch)
+                .all())
+        if not rows:
+            break
+        files.append(_write_archive(directory, rows))
+        last_id = rows[-1].id
+        AuditLog.query.filter(AuditLog.id.in_([r.id for r in rows])).delete(synchronize_session=False)
+        db.session.commit()
+        archived += len(rows)
+    if archived:
+        changes.bump('audit_log')
+    return {'archived': archived, 'files': files, 'cutoff': cutoff.isoformat()}
+
+
+def read_archive(path):
+    """Entries of one archive file (for investigations reaching past the retention window)."""
+    with gzip.open(path, 'rt', encoding='utf-8') as fh:
+        return [json.loads(line) for line in fh if line.strip()]
+
+
+def main(argv=None):  # pragma: no cover
+    import argparse
+    parser = argparse.ArgumentParser(description='Zooverse audit log retention')
+    sub = parser.add_subparsers(dest='command', required=True)
+    p = sub.add_parser('archive', help='move old audit entries into gzip archive files')
+    p.add_argument('--days', type=int, default=retention_days())
+    p.add_argument('--dir', default=archive_dir())
+    args = parser.parse_args(argv)
+    try:
+        from .app import create_app
+    except ImportError:
+        from app import create_app
+    app = create_app()
+    app.extensions['audit_writer'].flush()
+    with app.app_context():
+        result = archive_before(args.days, args.dir)
+    print(f"Archived {result['archived']} entries older than {result['cutoff']} into {len(result['files'])} file(s) in {args.dir}")
+
+
+if __name__ == '__main__':  # pragma: no cover
+    main()
@@ -0,0 +1,381 @@
+"""Micro-benchmarks for hot backend paths.
+
+Run with:  python -m backend.bench <name> [options]  (from repo root)
+
+Each benchmark prints a short human readable report. Numbers are only
+comparable on the same machine; use them to spot regressions, not as SLAs.
+"""
+from __future__ import annotations
+import argparse
+import os
+import random
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+try:
+    from .models import PricingRule
+    from .pricing import PricingIndex, select_rule_linear, DEFAULT_SLOTS
+except ImportError:  # python bench.py from backend folder
+    from models import PricingRule
+    from pricing import PricingIndex, select_rule_linear, DEFAULT_SLOTS
+
+
+SLOTS = list(DEFAULT_SLOTS)
+
+
+def random_pricing_rules(n, seed=7, base=date(2025, 1, 1)):
+    """Build ``n`` unsaved PricingRule objects resembling festival-week rule sets."""
+    rnd = random.Random(seed)
+    rules = []
+    for i in range(n):
+        r = PricingRule(id=i + 1, name=f'rule {i}', currency='INR',
+                        adult_cents=rnd.randrange(10000, 50000, 500),
+                        child_cents=rnd.randrange(5000, 25000, 500),
+                        priority=rnd.randrange(0, 100))
+        if rnd.random() < 0.8:
+            r.start_date = base + timedelta(days=rnd.randrange(0, 365))
+            r.end_date = r.start_date + timedelta(days=rnd.randrange(0, 14))
+        if rnd.random() < 0.5:
+            r.days = ','.join(str(d) for d in sorted(rnd.sample(range(7), rnd.randrange(1, 7))))
+        if rnd.random() < 0.4:
+            r.start_time = f"{rnd.randrange(8, 14):02d}:00"
+        if rnd.random() < 0.4:
+            r.end_time = f"{rnd.randrange(14, 21):02d}:00"
+        rules.append(r)
+    rules.sort(key=lambda r: -r.priority)
+    return rules
+
+
+def bench_pricing(args):
+    rules = random_pricing_rules(args.rules)
+    rnd = random.Random(11)
+    probes = [(date(2025, 1, 1) + timedelta(days=rnd.randrange(0, 380)), rnd.choice(SLOTS))
+              for _ in range(args.lookups)]
+
+    t0 = time.perf_counter()
+    index = PricingIndex().build(rules)
+    build_ms = (time.perf_counter() - t0) * 1000
+
+    t0 = time.perf_counter()
+    linear = [select_rule_linear(rules, d, s) for d, s in probes]
+    linear_ms = (time.perf_counter() - t0) * 1000
+
+    t0 = time.perf_counter()
+    compiled = [index.select(d, s) for d, s in probes]
+    compiled_ms = (time.perf_counter() - t0) * 1000
+
+    mismatches = sum(1 for a, b in zip(linear, compiled) if (a.id if a else None) != (b.id if b else None))
+    per_lookup_linear = linear_ms / len(probes)
+    per_lookup_compiled = compiled_ms / len(probes)
+    print(f"rules={len(rules)} lookups={len(probes)} index_build={build_ms:.1f}ms mismatches={mismatches}")
+    print(f"linear:   {per_lookup_linear * 1000:8.1f}us/lookup  {len(rules) / per_lookup_linear:10.0f} rules/ms")
+    print(f"compiled: {per_lookup_compiled * 1000:8.1f}us/lookup  {len(rules) / per_lookup_compiled:10.0f} rules/ms")
+
+
+def bench_quote(args):
+    rules = random_pricing_rules(args.rules)
+    index = PricingIndex().build(rules)
+    start = date(2025, 3, 1)
+    slots = SLOTS
+
+    t0 = time.perf_counter()
+    for _ in range(args.repeat):
+        index.quote_matrix(start, args.days, slots)
+    matrix_ms = (time.perf_counter() - t0) * 1000 / args.repeat
+
+    t0 = time.perf_counter()
+    for _ in range(args.repeat):
+        for off in range(args.days):
+            d = start + timedelta(days=off)
+            for s in slots:
+                index.select(d, s)
+    cells_ms = (time.perf_counter() - t0) * 1000 / args.repeat
+
+    print(f"rules={len(rules)} calendar={args.days}x{len(slots)} cells={args.days * len(slots)}")
+    print(f"single-pass matrix: {matrix_ms:8.2f}ms")
+    print(f"per-cell lookups:   {cells_ms:8.2f}ms")
+
+
+def _admin_client(app):
+    c = app.test_client()
+    rv = c.post('/api/login', json={'username': 'Admin123', 'password': 'zoosys'})
+    return c, {'Authorization': f"Bearer {rv.get_json()['access_token']}"}
+
+
+def bench_bookings(args):
+    try:
+        from .app import create_app
+    except ImportError:
+        from app import create_app
+    for label, workers in (('inline QR', '0'), ('background QR', str(args.qr_workers))):
+        with tempfile.TemporaryDirectory() as tmp:
+            os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+            os.environ['QR_WORKERS'] = workers
+            app = create_app()
+            _, headers = _admin_client(app)
+            body = {'date': '2025-12-20', 'time_slot': '09:00-11:00', 'num_adults': 2, 'num_children': 1}
+
+            def one(_):
+                t = time.perf_counter()
+                rv = app.test_client().post('/api/bookings', json=body, headers=headers)
+                assert rv.status_code == 201, rv.data
+                return time.perf_counter() - t
+
+            t0 = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=args.clients) as ex:
+                latencies = sorted(ex.map(one, range(args.bookings)))
+            elapsed = time.perf_counter() - t0
+            app.extensions['qr_renderer'].shutdown(wait=True)
+            drained = time.perf_counter() - t0
+            p50 = latencies[len(latencies) // 2] * 1000
+            p95 = latencies[int(len(latencies) * 0.95)] * 1000
+            print(f"{label:14s} bookings={args.bookings} clients={args.clients} "
+                  f"{args.bookings / elapsed:7.1f} bookings/s  p50={p50:.1f}ms p95={p95:.1f}ms  "
+                  f"(QR backlog drained after {drained:.2f}s)")
+    os.environ.pop('QR_WORKERS', None)
+
+
+def bench_login(args):
+    try:
+        from .app import create_app
+    except ImportError:
+        from app import create_app
+    settings = [m.strip() for m in args.methods.split(',') if m.strip()]
+    for method in settings:
+        for workers in (0, args.workers):
+            with tempfile.TemporaryDirectory() as tmp:
+                os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+                os.environ['PASSWORD_HASH_METHOD'] = method
+                os.environ['PASSWORD_HASH_WORKERS'] = str(workers)
+                os.environ['PHOTO_RELINK'] = 'off'
+                app = create_app()
+                body = {'username': 'Admin123', 'password': 'zoosys'}
+                stop = False
+                other = []
+
+                def one(_):
+                    t = time.perf_counter()
+                    rv = app.test_client().post('/api/login', json=body)
+                    assert rv.status_code in (200, 503), rv.data
+                    return time.perf_counter() - t, rv.status_code
+
+                def cheap_requests():
+                    # latency of a request that never hashes, measured during the login burst
+                    c = app.test_client()
+                    while not stop:
+                        t = time.perf_counter()
+                        c.get('/api/pricing')
+                        other.append(time.perf_counter() - t)
+
+                probe = ThreadPoolExecutor(max_workers=1)
+                probe.submit(cheap_requests)
+                t0 = time.perf_counter()
+                with ThreadPoolExecutor(max_workers=args.clients) as ex:
+                    results = list(ex.map(one, range(args.logins)))
+                elapsed = time.perf_counter() - t0
+                stop = True
+                probe.shutdown(wait=True)
+                app.extensions['password_hasher'].shutdown()
+                other.sort()
+                latencies = sorted(t for t, status in results if status == 200) or [0]
+                shed = sum(1 for _, status in results if status == 503)
+                p50 = latencies[len(latencies) // 2] * 1000
+                p95 = latencies[int(len(latencies) * 0.95)] * 1000
+                o95 = other[int(len(other) * 0.95)] * 1000 if other else 0
+                print(f"{method:22s} {'inline' if not workers else f'{workers} workers':10s} logins={args.logins} "
+                      f"clients={args.clients} {(args.logins - shed) / elapsed:7.1f} logins/s  shed={shed}  "
+                      f"p50={p50:.1f}ms p95={p95:.1f}ms  "
+                      f"other requests p95={o95:.1f}ms")
+    for name in ('PASSWORD_HASH_METHOD', 'PASSWORD_HASH_WORKERS', 'PHOTO_RELINK'):
+        os.environ.pop(name, None)
+
+
+WORDS = ('river', 'forest', 'tiger', 'heron', 'monsoon', 'safari', 'keeper', 'grass', 'stripe', 'feather',
+         'wetland', 'canopy', 'hoof', 'tusk', 'talon', 'burrow', 'dusk', 'pollen', 'reed', 'boulder')
+
+
+def _text(rnd, n):
+    return ' '.join(rnd.choice(WORDS) + str(rnd.randrange(500)) for _ in range(n))
+
+
+def bench_search(args):
+    try:
+        from .app import create_app
+        from .models import db, Animal, Event, NewsItem
+    except ImportError:
+        from app import create_app
+        from models import db, Animal, Event, NewsItem
+    rnd = random.Random(3)
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        app = create_app()
+        index = app.extensions['search_index']
+        with app.app_context():
+            t0 = time.perf_counter()
+            for _ in range(args.rows):
+                db.session.add(Animal(name=_text(rnd, 2), species=_text(rnd, 2), description=_text(rnd, 40)))
+                db.session.add(Event(title=_text(rnd, 4), description=_text(rnd, 40), start_date=date(2030, 1, 1)))
+                db.session.add(NewsItem(title=_text(rnd, 5), summary=_text(rnd, 12), body=_text(rnd, 80)))
+            db.session.commit()
+            load_s = time.perf_counter() - t0
+            terms = [rnd.choice(WORDS) + str(rnd.randrange(500)) for _ in range(args.queries)]
+
+            def like_path(q):
+                like = f"%{q}%"
+                Animal.query.filter(Animal.name.ilike(like)).limit(10).all()
+                Event.query.filter(Event.title.ilike(like)).limit(10).all()
+                NewsItem.query.filter(NewsItem.title.ilike(like)).limit(10).all()
+
+            def like_full_path(q):
+                # LIKE over the same columns the FTS index covers
+                like = f"%{q}%"
+                from sqlalchemy import or_
+                Animal.query.filter(or_(Animal.name.ilike(like), Animal.species.ilike(like), Animal.description.ilike(like))).limit(10).all()
+                Event.query.filter(or_(Event.title.ilike(like), Event.description.ilike(like))).limit(10).all()
+                NewsItem.query.filter(or_(NewsItem.title.ilike(like), NewsItem.summary.ilike(like), NewsItem.body.ilike(like))).limit(10).all()
+
+            def fts_path(q):
+                index.search(db.session, q, limit=100)
+
+            print(f"rows={args.rows} per kind (load incl. index triggers {load_s:.2f}s) queries={len(terms)}")
+            for label, fn in (('LIKE titles', like_path), ('LIKE all text', like_full_path), ('FTS5 ranked', fts_path)):
+                t0 = time.perf_counter()
+                for q in terms:
+                    fn(q)
+                ms = (time.perf_counter() - t0) * 1000 / len(terms)
+                print(f"{label:14s} {ms:8.2f}ms/query")
+
+
+def bench_suggest(args):
+    try:
+        from .suggest import SuggestIndex
+    except ImportError:
+        from suggest import SuggestIndex
+    rnd = random.Random(5)
+    kinds = ('animal', 'species', 'event', 'news', 'doctor')
+    entries = [{'label': _text(rnd, rnd.randrange(1, 5)), 'kind': rnd.choice(kinds), 'id': i} for i in range(args.labels)]
+    t0 = time.perf_counter()
+    index = SuggestIndex().build(entries)
+    build_ms = (time.perf_counter() - t0) * 1000
+    prefixes = [rnd.choice(entries)['label'][:rnd.randrange(2, 8)] for _ in range(args.queries)]
+    typos = []
+    for _ in range(args.queries):
+        word = rnd.choice(WORDS)
+        i = rnd.randrange(1, len(word) - 1)
+        typos.append(word[:i] + word[i + 1] + word[i] + word[i + 2:])
+    print(f"labels={len(entries)} build={build_ms:.1f}ms")
+    for label, qs in (('prefix', prefixes), ('typo', typos)):
+        t0 = time.perf_counter()
+        for q in qs:
+            index.suggest(q)
+        us = (time.perf_counter() - t0) * 1e6 / len(qs)
+        print(f"{label:7s} {us:8.1f}us/query")
+
+
+def bench_sqlite_concurrency(args):
+    import threading
+    from sqlalchemy import create_engine
+    try:
+        from .sqlite_tuning import PROFILES, apply_profile, effective_pragmas
+    except ImportError:
+        from sqlite_tuning import PROFILES, apply_profile, effective_pragmas
+    for profile in ('off', 'performance'):
+        with tempfile.TemporaryDirectory() as tmp:
+            engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}", pool_size=args.readers + 2)
+            apply_profile(engine, PROFILES[profile])
+            with engine.begin() as conn:
+                conn.exec_driver_sql('CREATE TABLE t (id INTEGER PRIMARY KEY, payload TEXT)')
+                conn.exec_driver_sql('INSERT INTO t(payload) VALUES (?)', [('x' * 200,)] * 5000)
+            stop = threading.Event()
+            latencies = []
+            errors = []
+            lock = threading.Lock()
+
+            def writer():
+                while not stop.is_set():
+                    with engine.begin() as conn:
+                        conn.exec_driver_sql('INSERT INTO t(payload) VALUES (?)', [('y' * 2000,)] * args.batch)
+
+            def reader():
+                local = []
+                while not stop.is_set():
+                    t = time.perf_counter()
+                    try:
+                        with engine.connect() as conn:
+                            conn.exec_driver_sql('SELECT count(*), max(id) FROM t').fetchall()
+                        local.append(time.perf_counter() - t)
+                    except Exception as e:
+                        errors.append(str(e))
+                with lock:
+                    latencies.extend(local)
+
+            threads = [threading.Thread(target=writer)] + [threading.Thread(target=reader) for _ in range(args.readers)]
+            for th in threads:
+                th.start()
+            time.sleep(args.seconds)
+            stop.set()
+            for th in threads:
+                th.join()
+            pragmas = effective_pragmas(engine)
+            engine.dispose()
+            latencies.sort()
+            n = len(latencies) or 1
+            p50 = latencies[n // 2] * 1000 if latencies else 0
+            p99 = latencies[min(int(n * 0.99), n - 1)] * 1000 if latencies else 0
+            worst = latencies[-1] * 1000 if latencies else 0
+            print(f"profile={profile:11s} journal={pragmas.get('journal_mode')} sync={pragmas.get('synchronous')} "
+                  f"reads/s={len(latencies) / args.seconds:8.0f} p50={p50:.2f}ms p99={p99:.2f}ms max={worst:.1f}ms errors={len(errors)}")
+
+
+def main(argv=None):  # pragma: no cover
+    parser = argparse.ArgumentParser(description='Zooverse backend micro-benchmarks')
+    sub = parser.add_subparsers(dest='name', required=True)
+
+    p = sub.add_parser('pricing', help='compiled pricing index vs linear rule scan')
+    p.add_argument('--rules', type=int, default=500)
+    p.add_argument('--lookups', type=int, default=2000)
+    p.set_defaults(func=bench_pricing)
+
+    p = sub.add_parser('quote', help='price calendar matrix vs per-cell lookups')
+    p.add_argument('--rules', type=int, default=500)
+    p.add_argument('--days', type=int, default=90)
+    p.add_argument('--repeat', type=int, default=20)
+    p.set_defaults(func=bench_quote)
+
+    p = sub.add_parser('bookings', help='POST /api/bookings throughput on a temp SQLite DB')
+    p.add_argument('--bookings', type=int, default=300)
+    p.add_argument('--clients', type=int, default=8)
+    p.add_argument('--qr-workers', type=int, default=2)
+    p.set_defaults(func=bench_bookings)
+
+    p = sub.add_parser('login', help='POST /api/login throughput per password hash method/cost')
+    p.add_argument('--methods', default='pbkdf2:sha256:100000,pbkdf2:sha256:600000,scrypt:16384:8:1,scrypt:32768:8:1')
+    p.add_argument('--logins', type=int, default=100)
+    p.add_argument('--clients', type=int, default=16)
+    p.add_argument('--workers', type=int, default=4)
+    p.set_defaults(func=bench_login)
+
+    p = sub.add_parser('search', help='FTS5 index vs LIKE scans on a temp SQLite DB')
+    p.add_argument('--rows', type=int, default=5000)
+    p.add_argument('--queries', type=int, default=50)
+    p.set_defaults(func=bench_search)
+
+    p = sub.add_parser('suggest', help='in-process typeahead index lookups')
+    p.add_argument('--labels', type=int, default=2000)
+    p.add_argument('--queries', type=int, default=2000)
+    p.set_defaults(func=bench_suggest)
+
+    p = sub.add_parser('sqlite-concurrency', help='reader latency behind a busy writer, default vs tuned pragmas')
+    p.add_argument('--readers', type=int, default=4)
+    p.add_argument('--seconds', type=float, default=3.0)
+    p.add_argument('--batch', type=int, default=500)
+    p.set_defaults(func=bench_sqlite_concurrency)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == '__main__':  # pragma: no cover
+    main()
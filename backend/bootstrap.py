@@ -0,0 +1,252 @@
+"""Database bootstrap for create_app: schema, seed data and version stamps.
+
+A cold database gets its schema (created at head, or migrated by
+``backend/migrations.py`` when ``AUTO_MIGRATE`` allows), the FTS index and the
+dev seed data. Afterwards two fingerprints are stamped into ``app_state``:
+
+  schema_version  hash of every table / column / index declared in models.py
+  seed_version    hash of the seed rows below (and whether dev users apply)
+
+A warm database whose stamps match the running code boots with a single
+``app_state`` read and none of the introspection. Changing a model or the
+seed data changes its hash, so the next boot does the full pass once.
+
+Seeding is batched: one ``IN (...)`` query finds which seed users / animals
+already exist, and only the missing rows are inserted.
+
+Environment:
+  FAST_BOOT     1 (default) trust matching stamps | 0 always run the full checks
+  AUTO_MIGRATE  1 apply pending migrations at boot (default outside ENV=production)
+
+Startup timing per phase:  python -m backend.app --profile-startup
+"""
+from __future__ import annotations
+import hashlib
+import os
+import time
+
+from sqlalchemy import bindparam, func, text
+
+try:
+    from .models import db, User, Animal, TicketType
+    from . import migrations, changes
+except ImportError:  # python app.py from backend folder
+    from models import db, User, Animal, TicketType
+    import migrations
+    import changes
+
+
+SCHEMA_KEY = 'schema_version'
+SEED_KEY = 'seed_version'
+SEARCH_KEY = 'search_index'
+
+# (username, password, role) - development databases only
+DEV_USERS = (
+    ('Admin123', 'zoosys', 'admin'),
+    ('Doctor1', 'doctorpass', 'vet'),
+)
+
+# (name, description, adult_price_cents, child_price_cents, group_size) - only into an empty table
+TICKET_TYPES = (
+    ('Adult', 'Standard adult admission', 20000, 0, None),
+    ('Child', 'Child admission (under 12)', 0, 10000, None),
+    ('Family', 'Family bundle (2 adults + 2 children)', 36000, 0, 4),
+)
+
+# (name, species, description) - only into an empty table
+SAMPLE_ANIMALS = (
+    ('Giraffe', 'Giraffa camelopardalis', 'Tall and graceful herbivore with long necks.'),
+    ('Crocodile', 'Crocodylus', 'Large aquatic reptile, powerful jaws and armored skin.'),
+    ('Tiger', 'Panthera tigris', 'Majestic big cat with orange coat and black stripes.'),
+)
+
+# (name, species, description, image file) - added when missing by (case-insensitive) name
+EXTENDED_ANIMALS = (
+    ("Asiatic Lion", "Panthera leo persica", "Endangered Asiatic lion subspecies found only in the Gir Forest.", "Asiatic Lion.jpeg"),
+    ("Indian Elephant", "Elephas maximus indicus", "Large herbivore playing a key role as a keystone species.", "Indian Elephant.jpeg"),
+    ("Sloth Bear", "Melursus ursinus", "Insect-eating bear with shaggy coat and long snout.", "Sloth Bear.jpeg"),
+    ("Leopard", "Panthera pardus", "Agile spotted big cat known for its climbing ability.", "Leopard.jpeg"),
+    ("Indian Peafowl", "Pavo cristatus", "National bird of India famous for its colorful train.", "Indian Peafowl (Peacock).jpeg"),
+    ("Great Hornbill", "Buceros bicornis", "Large hornbill with impressive casque used in resonant calls.", "Great Hornbill.jpeg"),
+    ("Gaur", "Bos gaurus", "Massive wild bovid also called the Indian bison.", "Gaur (Indian Bison).jpeg"),
+    ("Nilgai", "Boselaphus tragocamelus", "Largest Asian antelope, also known as the blue bull.", "Nilgai (Blue Bull).jpeg"),
+    ("Indian Rock Python", "Python molurus", "Non-venomous constrictor inhabiting rocky outcrops and forests.", "Indian Rock Python.jpeg"),
+    ("Spotted Deer", "Axis axis", "Also called chital; distinctive white spots on reddish coat.", "Spotted Deer (Chital).jpeg"),
+    ("Indian Wolf", "Canis lupus pallipes", "An adaptable subspecies living in grasslands and scrub.", "Indian Wolf.jpeg"),
+    ("Indian Rhinoceros", "Rhinoceros unicornis", "Single-horned rhino with armor-like skin folds.", "Indian Rhinoceros.jpeg"),
+    ("Blackbuck", "Antilope cervicapra", "Graceful antelope with spiraled horns and striking coloration.", "Blackbuck.jpeg"),
+    ("King Cobra", "Ophiophagus hannah", "World's longest venomous snake; feeds mainly on other snakes.", "King Cobra.jpeg"),
+    ("Gharial", "Gavialis gangeticus", "Fish-eating crocodilian with long narrow snout.", "Gharial.jpeg"),
+    ("Rhesus Macaque", "Macaca mulatta", "Highly adaptable Old World monkey.", "Rhesus Macaque.jpeg"),
+    ("Sarus Crane", "Antigone antigone", "Tall wetland bird known for lifelong pair bonds.", "Sarus Crane.jpeg"),
+)
+
+
+class StartupProfile:
+    """Wall time of consecutive create_app phases; ``mark(name)`` closes the running phase."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self._last = self.started
+        self.phases = []
+
+    def mark(self, name):
+        now = time.perf_counter()
+        self.phases.append((name, now - self._last))
+        self._last = now
+
+    @property
+    def total(self):
+        return self._last - self.started
+
+    def report(self):
+        width = max([len(n) for n, _ in self.phases] + [5])
+        lines = [f"{name.ljust(width)}  {secs * 1000:8.1f} ms" for name, secs in self.phases]
+        lines.append(f"{'total'.ljust(width)}  {self.total * 1000:8.1f} ms")
+        return '\n'.join(lines)
+
+
+# -- app_state -------------------------------------------------------------
+def read_state(session, names):
+    """{name: value} for the given app_state keys; {} when the table does not exist yet."""
+    try:
+        rows = session.execute(text("SELECT name, value FROM app_state WHERE name IN :names").bindparams(
+            bindparam('names', expanding=True)), {'names': list(names)}).fetchall()
+    except Exception:
+        session.rollback()
+        return {}
+    return {name: value for name, value in rows}
+
+
+def write_state(session, values):
+    """Upsert app_state keys and commit."""
+    for name, value in values.items():
+        params = {'k': name, 'v': value}
+        if session.execute(text("UPDATE app_state SET value = :v, updated_at = CURRENT_TIMESTAMP WHERE name = :k"), params).rowcount == 0:
+            session.execute(text("INSERT INTO app_state (name, value, updated_at) VALUES (:k, :v, CURRENT_TIMESTAMP)"), params)
+    session.commit()
+
+
+# -- fingerprints ----------------------------------------------------------
+def _digest(parts):
+    return hashlib.sha1('\n'.join(parts).encode('utf-8')).hexdigest()[:20]
+
+
+def schema_version(metadata=None):
+    metadata = metadata if metadata is not None else db.metadata
+    parts = []
+    for table in metadata.sorted_tables:
+        parts.append(table.name)
+        for col in table.columns:
+            parts.append(f"  {col.name} {col.type!r} {col.nullable} {col.primary_key}")
+        for index in sorted(table.indexes, key=lambda i: i.name or ''):
+            parts.append(f"  ix {index.name} {[c.name for c in index.columns]} {index.unique}")
+    return _digest(parts)
+
+
+def dev_seed_enabled():
+    return os.environ.get('ENV', 'development') != 'production'
+
+
+def seed_version():
+    return _digest([repr(TICKET_TYPES), repr(SAMPLE_ANIMALS), repr(EXTENDED_ANIMALS),
+                    repr([u[0] for u in DEV_USERS]) if dev_seed_enabled() else 'no-dev-users'])
+
+
+# -- schema ------------------------------------------------------------------
+def auto_migrate():
+    default = '0' if os.environ.get('ENV', 'development') == 'production' else '1'
+    return os.environ.get('AUTO_MIGRATE', default) == '1'
+
+
+def ensure_schema(search_index):
+    """Create or migrate the schema; returns (search index available, schema at head)."""
+    db.session.commit()
+    try:
+        if auto_migrate():
+            migrations.upgrade(db.engine, log=lambda msg: print(msg, flush=True))
+        elif migrations.init_if_empty(db.engine):
+            print(f"[startup] Created schema at migration {migrations.HEAD}", flush=True)
+        waiting = migrations.pending(db.engine)
+    except Exception as e:
+        print(f"[startup_warning] schema migration failed: {e}", flush=True)
+        waiting = None
+    if waiting:
+        print(f"[startup_warning] {len(waiting)} pending migration(s): run python -m backend.migrations upgrade", flush=True)
+    # every write from here on is versioned in the database (changes.py); needed before seeding
+    db.metadata.tables['table_versions'].create(db.engine, checkfirst=True)
+    with db.engine.begin() as conn:
+        changes.track(conn, [t.name for t in db.metadata.sorted_tables])
+    # Full-text index (FTS5 + sync triggers); falls back to LIKE search when unavailable
+    return search_index.install(db.session), waiting == []
+
+
+# -- seed --------------------------------------------------------------------
+def seed():
+    """Insert missing seed rows with one lookup per table; returns the number added."""
+    session = db.session
+    added = []
+    if dev_seed_enabled():
+        names = [u[0] for u in DEV_USERS]
+        have = {u for (u,) in session.query(User.username).filter(User.username.in_(names))}
+        for username, password, role in DEV_USERS:
+            if username not in have:
+                user = User(username=username, role=role)
+                user.set_password(password)
+                added.append(user)
+    if session.query(TicketType.id).first() is None:
+        added += [TicketType(name=n, description=d, adult_price_cents=a, child_price_cents=c, group_size=g)
+                  for n, d, a, c, g in TICKET_TYPES]
+    if session.query(Animal.id).first() is None:
+        added += [Animal(name=n, species=s, description=d) for n, s, d in SAMPLE_ANIMALS]
+    wanted = [row[0].lower() for row in EXTENDED_ANIMALS]
+    have = {n for (n,) in session.query(func.lower(Animal.name)).filter(func.lower(Animal.name).in_(wanted))}
+    added += [Animal(name=n, species=s, description=d, photo_url=f"/images/animals/{fn}")
+              for n, s, d, fn in EXTENDED_ANIMALS if n.lower() not in have]
+    if added:
+        try:
+            session.add_all(added)
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+    return len(added)
+
+
+# -- entry point -----------------------------------------------------------
+def boot(search_index, profile=None):
+    """Bring the database up to date for this code version; returns what ran.
+
+    {'warm': True} when the stored stamps matched and nothing else was done.
+    """
+    fast = os.environ.get('FAST_BOOT', '1') != '0'
+    want = {SCHEMA_KEY: schema_version(), SEED_KEY: seed_version()}
+    state = read_state(db.session, (SCHEMA_KEY, SEED_KEY, SEARCH_KEY))
+    if profile:
+        profile.mark('version check')
+    schema_ok = fast and state.get(SCHEMA_KEY) == want[SCHEMA_KEY]
+    seed_ok = fast and state.get(SEED_KEY) == want[SEED_KEY]
+    if schema_ok:
+        search_index.available = db.engine.dialect.name == 'sqlite' and state.get(SEARCH_KEY) == '1'
+    if schema_ok and seed_ok:
+        return {'warm': True, 'seeded': 0}
+    stamps = {}
+    if not schema_ok:
+        search_ok, at_head = ensure_schema(search_index)
+        stamps[SEARCH_KEY] = '1' if search_ok else '0'
+        if at_head:
+            stamps[SCHEMA_KEY] = want[SCHEMA_KEY]
+        if profile:
+            profile.mark('schema')
+    seeded = 0
+    if not seed_ok:
+        try:
+            seeded = seed()
+            stamps[SEED_KEY] = want[SEED_KEY]
+        except Exception as e:
+            print(f"[startup_warning] seeding failed: {e}", flush=True)
+        if profile:
+            profile.mark('seed')
+    db.metadata.tables['app_state'].create(db.engine, checkfirst=True)
+    write_state(db.session, stamps)
+    return {'warm': False, 'seeded': seeded}
@@ -0,0 +1,213 @@
+"""Per-table write versions for caches and HTTP validators.
+
+Every flush records the tables it touched, at two levels:
+
+* ``table_versions`` rows (``stored``): incremented on the flush's own
+  connection, so they commit or roll back with the write and every worker
+  process, and every restart, sees the same value. ETag / Last-Modified
+  validators (conditional.py) are built from these.
+* process-local counters (``version``): bumped after commit. In-process
+  caches (response cache, search suggestions) compare them for free and
+  bound what they miss from other processes with a TTL.
+
+ORM flushes, ``Query.update``/``delete`` and Core ``insert``/``update``/
+``delete`` statements run through the session are tracked automatically.
+Raw SQL (``text()``) is not: call ``mark(session, table)`` in the same
+transaction.
+
+Rows with a ``user_id`` additionally bump ``"<table>@<user_id>"`` so per-user
+endpoints can be versioned without being invalidated by other users' writes.
+
+State that is not in the database (image folders, derivative files) is
+registered with ``register_source(name, fn)``; ``fn`` returns a token
+derived from that state, identical in every process that sees the same
+files.
+
+``install(db.session)`` is called once per process by create_app.
+"""
+from __future__ import annotations
+from collections import defaultdict
+from datetime import datetime
+import threading
+import time
+
+from sqlalchemy import DateTime, Integer, String, bindparam, column, event, select, table, text
+from sqlalchemy.sql.dml import UpdateBase
+
+
+VERSIONS_TABLE = 'table_versions'
+_versions_table = table(VERSIONS_TABLE, column('name', String), column('version', Integer),
+                        column('updated_at', DateTime))
+
+_lock = threading.Lock()
+_versions = defaultdict(int)
+_stamps = {}
+_started = time.time()
+_installed = set()
+_sources = {}
+_session = None
+
+
+def _table_of(obj):
+    table_ = getattr(obj, '__table__', None)
+    return table_.name if table_ is not None else None
+
+
+# -- recording -----------------------------------------------------------------
+_UPSERT = {
+    'sqlite': "INSERT INTO table_versions (name, version, updated_at) VALUES (:name, 1, :now) "
+              "ON CONFLICT (name) DO UPDATE SET version = table_versions.version + 1, updated_at = excluded.updated_at",
+    'postgresql': "INSERT INTO table_versions (name, version, updated_at) VALUES (:name, 1, :now) "
+                  "ON CONFLICT (name) DO UPDATE SET version = table_versions.version + 1, updated_at = excluded.updated_at",
+    'mysql': "INSERT INTO table_versions (name, version, updated_at) VALUES (:name, 1, :now) "
+             "ON DUPLICATE KEY UPDATE version = version + 1, updated_at = VALUES(updated_at)",
+}
+
+
+def _persist(conn, names):
+    # sorted so concurrent writers take the version rows in the same order
+    now = datetime.utcnow()
+    sql = _UPSERT.get(conn.dialect.name)
+    for name in sorted(names):
+        params = {'name': name, 'now': now}
+        if sql:
+            conn.execute(text(sql).bindparams(bindparam('now', type_=DateTime())), params)
+            continue
+        stmt = _versions_table.update().where(_versions_table.c.name == name).values(
+            version=_versions_table.c.version + 1, updated_at=now)
+        if not conn.execute(stmt).rowcount:
+            conn.execute(_versions_table.insert().values(name=name, version=1, updated_at=now))
+
+
+def track(conn, tables):
+    """Start versioning ``tables``: add missing rows at version 0, stamped now.
+
+    Writes made before tracking started are older than that stamp, so it is
+    a safe Last-Modified for tables not written since. Returns the names added.
+    """
+    t = _versions_table
+    have = {name for (name,) in conn.execute(select(t.c.name).where(t.c.name.in_(list(tables))))}
+    missing = [name for name in tables if name not in have and name != VERSIONS_TABLE]
+    now = datetime.utcnow()
+    for name in missing:
+        conn.execute(t.insert().values(name=name, version=0, updated_at=now))
+    return missing
+
+
+def mark(session, *tables):
+    """Record writes to ``tables`` in ``session``'s transaction (raw SQL, Core writes inside a flush)."""
+    names = {t for t in tables if t and t != VERSIONS_TABLE}
+    if not names:
+        return
+    _persist(session.connection(), names)
+    session.info.setdefault('changed_tables', set()).update(names)
+
+
+def _after_flush(session, flush_context):
+    changed = set()
+    for collection in (session.new, session.dirty, session.deleted):
+        for obj in collection:
+            name = _table_of(obj)
+            if name:
+                changed.add(name)
+                owner = getattr(obj, 'user_id', None)
+                if isinstance(owner, int):
+                    changed.add(user_key(name, owner))
+    mark(session, *changed)
+
+
+def _on_execute(state):
+    # Query.update/delete and Core DML run through the session skip the flush hooks
+    stmt = state.statement
+    if isinstance(stmt, UpdateBase):
+        name = getattr(getattr(stmt, 'table', None), 'name', None)
+        if name:
+            mark(state.session, name)
+
+
+def _after_commit(session):
+    changed = session.info.pop('changed_tables', None)
+    if changed:
+        bump(*changed)
+
+
+def _after_rollback(session):
+    session.info.pop('changed_tables', None)
+
+
+def install(session_target):
+    """Attach the flush/execute/commit listeners to a (scoped) session once."""
+    global _session
+    _session = session_target
+    key = id(session_target)
+    if key in _installed:
+        return
+    event.listen(session_target, 'after_flush', _after_flush)
+    event.listen(session_target, 'do_orm_execute', _on_execute)
+    event.listen(session_target, 'after_commit', _after_commit)
+    event.listen(session_target, 'after_soft_rollback', lambda session, previous_transaction: _after_rollback(session))
+    _installed.add(key)
+
+
+def bump(*tables):
+    """Advance the process-local versions (after commit, or for state outside the database)."""
+    now = time.time()
+    with _lock:
+        for t in tables:
+            _versions[t] += 1
+            _stamps[t] = now
+
+
+def register_source(name, fn):
+    """Version ``name`` by ``fn()``: a token (and optional mtime) derived from non-database state.
+
+    ``fn`` returns ``(token, mtime_or_None)``.
+    """
+    _sources[name] = fn
+
+
+# -- reading -------------------------------------------------------------------
+def version(*tables):
+    """Current process-local version tuple for the given tables."""
+    return tuple(_versions[t] for t in tables)
+
+
+def stored(*keys, session=None):
+    """``(tokens, last_modified)`` for ``keys`` from ``table_versions`` and registered sources.
+
+    ``tokens`` is the same in every process for the same database and files.
+    ``last_modified`` (UTC datetime) is None when any key has no known
+    modification time.
+    """
+    tokens = {}
+    times = []
+    db_keys = [k for k in keys if k not in _sources]
+    for k in keys:
+        if k in _sources:
+            token, mtime = _sources[k]()
+            tokens[k] = token
+            times.append(datetime.utcfromtimestamp(mtime) if mtime is not None else None)
+    if db_keys:
+        session = session if session is not None else _session
+        t = _versions_table
+        # a user with no row yet has not written since tracking started; every write of
+        # theirs also bumps the table row, so its time is a safe upper bound
+        names = set(db_keys) | {k.partition('@')[0] for k in db_keys}
+        rows = {name: (ver, updated) for name, ver, updated in session.execute(
+            select(t.c.name, t.c.version, t.c.updated_at).where(t.c.name.in_(names)))}
+        for k in db_keys:
+            ver, updated = rows.get(k, (0, rows.get(k.partition('@')[0], (0, None))[1]))
+            tokens[k] = ver
+            times.append(updated)
+    modified = max(times) if times and None not in times else None
+    return tuple(tokens[k] for k in keys), modified
+
+
+def user_key(table_name, user_id):
+    """Version key for one user's rows of ``table_name``."""
+    return f"{table_name}@{user_id}"
+
+
+def last_modified(*tables):
+    """Wall-clock time of the latest write seen by this process (process start if none)."""
+    return max([_stamps.get(t, _started) for t in tables] or [_started])
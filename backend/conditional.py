@@ -0,0 +1,81 @@
+"""ETag / Last-Modified validators for JSON GET endpoints.
+
+``conditional(*tables)`` derives a strong ETag from the request path + query
+string and the stored versions of the tables the response is built from
+(``changes.stored``: the ``table_versions`` rows each write transaction
+updates, plus file-derived tokens for the image folders). The validators are
+therefore the same in every worker process and across restarts. They are
+checked *before* the view runs, so an ``If-None-Match`` (or
+``If-Modified-Since``) hit costs one primary-key read instead of the view's
+queries and serialization. Last-Modified is the newest ``updated_at`` of
+those versions and is left out when it is unknown (a table never written
+since ``table_versions`` was created, or a source without an mtime).
+
+Per-user endpoints pass ``per_user=True``: the ETag then includes the caller's
+id and role and uses the per-user version keys (``booking@<uid>``), so one
+user's writes never invalidate another user's validators. With
+``admin_sees_all=True`` admins, who get every row, fall back to the
+table-wide version.
+"""
+from __future__ import annotations
+from functools import wraps
+from datetime import timezone
+import hashlib
+
+from flask import current_app, request
+from flask_jwt_extended import get_jwt, get_jwt_identity
+
+try:
+    from . import changes
+except ImportError:  # python app.py from backend folder
+    import changes
+
+
+def _scope(tables, per_user, admin_sees_all):
+    if not per_user:
+        return '', tables
+    uid = get_jwt_identity()
+    role = get_jwt().get('role')
+    if admin_sees_all and role == 'admin':
+        return f"{uid}:{role}", tables
+    return f"{uid}:{role}", tuple(changes.user_key(t, uid) for t in tables)
+
+
+def conditional(*tables, per_user=False, admin_sees_all=False, vary=None):
+    """Decorate a GET view with version-derived ETag / Last-Modified handling.
+
+    ``vary`` is an optional callable whose result is folded into the ETag
+    (e.g. today's date for "upcoming" lists); such responses skip
+    Last-Modified because they can change without a write.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            scope, keys = _scope(tables, per_user, admin_sees_all)
+            extra = vary() if vary else ''
+            tokens, stored_at = changes.stored(*keys)
+            raw = f"{request.full_path}|{scope}|{tokens}|{extra}"
+            etag = hashlib.sha1(raw.encode('utf-8')).hexdigest()[:20]
+            modified = None
+            if vary is None and stored_at is not None:
+                modified = stored_at.replace(microsecond=0, tzinfo=timezone.utc)
+            cache_control = 'private, no-cache' if per_user else 'no-cache'
+
+            not_modified = False
+            if request.if_none_match:
+                not_modified = request.if_none_match.contains(etag)
+            elif modified is not None and request.if_modified_since is not None:
+                not_modified = modified <= request.if_modified_since
+            if not_modified:
+                resp = current_app.response_class(status=304)
+            else:
+                resp = current_app.make_response(view(*args, **kwargs))
+                if resp.status_code != 200:
+                    return resp
+            resp.set_etag(etag)
+            if modified is not None:
+                resp.last_modified = modified
+            resp.headers['Cache-Control'] = cache_control
+            return resp
+        return wrapper
+    return decorator
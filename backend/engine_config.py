@@ -0,0 +1,154 @@
+"""SQLAlchemy engine/pool options from the environment.
+
+create_app feeds ``engine_options_from_env`` into ``SQLALCHEMY_ENGINE_OPTIONS``
+so pool sizing can be tuned per deployment without code changes:
+
+  DB_POOL_CLASS            queue | static | null | singleton; default queue
+                           (in-memory SQLite keeps SQLAlchemy's own default)
+  DB_POOL_SIZE             default 10   (queue pool only)
+  DB_MAX_OVERFLOW          default 20   (queue pool only)
+  DB_POOL_TIMEOUT          seconds to wait for a connection, default 30 (queue pool only)
+  DB_POOL_RECYCLE          seconds before a connection is replaced, default 1800
+  DB_POOL_PRE_PING         1/0, default 1 (validate connections on checkout)
+  DB_STATEMENT_TIMEOUT_MS  per-statement timeout, default 0 (off)
+
+Statement timeouts use ``statement_timeout`` on PostgreSQL and
+``max_execution_time`` on MySQL. SQLite has no server-side setting, so a
+progress handler aborts any statement running past its deadline.
+"""
+from __future__ import annotations
+import os
+import time
+
+from sqlalchemy import event
+from sqlalchemy.pool import QueuePool, StaticPool, NullPool, SingletonThreadPool
+
+
+POOL_CLASSES = {
+    'queue': QueuePool,
+    'static': StaticPool,
+    'null': NullPool,
+    'singleton': SingletonThreadPool,
+}
+
+
+def _int(env, key, default):
+    try:
+        return int(env.get(key, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def _flag(env, key, default):
+    raw = env.get(key)
+    if raw is None or raw == '':
+        return default
+    return raw.strip().lower() not in ('0', 'false', 'no', 'off')
+
+
+def engine_options_from_env(database_uri, environ=None):
+    """Return ``(engine_options, statement_timeout_ms)`` for a database URI."""
+    env = os.environ if environ is None else environ
+    uri = (database_uri or '').lower()
+    is_sqlite = uri.startswith('sqlite')
+    pool_name = (env.get('DB_POOL_CLASS') or '').strip().lower()
+    opts = {'pool_pre_ping': _flag(env, 'DB_POOL_PRE_PING', True)}
+    if pool_name in POOL_CLASSES:
+        poolclass = POOL_CLASSES[pool_name]
+        opts['poolclass'] = poolclass
+    elif is_sqlite and uri.rstrip('/').endswith((':memory:', 'sqlite:')):
+        # every pooled connection would open a fresh, empty in-memory database
+        poolclass = None
+    else:
+        poolclass = QueuePool
+        opts['poolclass'] = poolclass
+    if poolclass is QueuePool:
+        opts['pool_size'] = max(_int(env, 'DB_POOL_SIZE', 10), 1)
+        opts['max_overflow'] = max(_int(env, 'DB_MAX_OVERFLOW', 20), 0)
+        opts['pool_timeout'] = max(_int(env, 'DB_POOL_TIMEOUT', 30), 0)
+    if poolclass not in (StaticPool, None):
+        opts['pool_recycle'] = _int(env, 'DB_POOL_RECYCLE', 1800)
+    timeout_ms = max(_int(env, 'DB_STATEMENT_TIMEOUT_MS', 0), 0)
+    if timeout_ms:
+        if uri.startswith('postgres'):
+            opts['connect_args'] = {'options': f'-c statement_timeout={timeout_ms}'}
+        elif uri.startswith('mysql'):
+            opts['connect_args'] = {'init_command': f'SET SESSION max_execution_time={timeout_ms}'}
+    if is_sqlite and poolclass is StaticPool:
+        # one shared connection used from several request threads
+        opts['connect_args'] = {'check_same_thread': False}
+    return opts, timeout_ms
+
+
+def install_sqlite_statement_timeout(engine, timeout_ms, check_every=1000):
+    """Abort SQLite statements that run longer than ``timeout_ms``.
+
+    Each DB-API connection gets a progress handler (called every
+    ``check_every`` VM instructions) that interrupts the statement once the
+    deadline stamped by ``before_cursor_execute`` has passed; the caller sees
+    ``OperationalError: interrupted``.
+    """
+    if engine.dialect.name != 'sqlite' or not timeout_ms:
+        return False
+    deadlines = {}
+    limit = timeout_ms / 1000.0
+
+    @event.listens_for(engine, 'connect')
+    def _on_connect(dbapi_conn, connection_record):
+        key = id(dbapi_conn)
+        deadlines[key] = None
+
+        def _check():
+            deadline = deadlines.get(key)
+            return 1 if deadline is not None and time.monotonic() > deadline else 0
+
+        dbapi_conn.set_progress_handler(_check, check_every)
+
+    @event.listens_for(engine, 'close')
+    def _on_close(dbapi_conn, connection_record):
+        deadlines.pop(id(dbapi_conn), None)
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def _start(conn, cursor, statement, parameters, context, executemany):
+        deadlines[id(conn.connection.dbapi_connection)] = time.monotonic() + limit
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def _done(conn, cursor, statement, parameters, context, executemany):
+        deadlines[id(conn.connection.dbapi_connection)] = None
+
+    return True
+
+
+def describe_options(opts, timeout_ms):
+    poolclass = opts.get('poolclass')
+    parts = [f"pool={poolclass.__name__ if poolclass else 'default'}"]
+    for key in ('pool_size', 'max_overflow', 'pool_timeout', 'pool_recycle', 'pool_pre_ping'):
+        if key in opts:
+            parts.append(f"{key}={opts[key]}")
+    parts.append(f"statement_timeout_ms={timeout_ms or 'off'}")
+    return ', '.join(parts)
+
+
+def pool_stats(engine, max_overflow=None):
+    """Pool usage gauge: checked-out vs capacity for the current engine.
+
+    Uses only the pool's public counters. ``max_overflow`` is the configured
+    value (``engine_options['max_overflow']``); without it capacity is omitted.
+    """
+    pool = engine.pool
+    stats = {'pool': type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        size = pool.size()
+        stats.update({
+            'size': size,
+            'checked_out': pool.checkedout(),
+            'checked_in': pool.checkedin(),
+            'overflow': pool.overflow(),
+        })
+        if max_overflow is not None:
+            stats['max_overflow'] = max_overflow
+            stats['capacity'] = size + max(max_overflow, 0)
+            stats['utilization'] = round(stats['checked_out'] / stats['capacity'], 3) if stats['capacity'] else None
+    else:
+        stats['status'] = pool.status()
+    return stats
@@ -8,12 +8,20 @@ Override via environment variables:
 
 It scans likely SQLite DB paths used in this project and applies the change
 to each existing DB so you don't have to guess which one the app is using.
+Older schemas are brought up to date with the migration runner first.
 """
 from __future__ import annotations
 import os
 import sqlite3
 from dataclasses import dataclass
 
+from sqlalchemy import create_engine
+
+try:
+    from .migrations import upgrade
+except ImportError:  # python ensure_admin.py from backend folder
+    from migrations import upgrade
+
 try:
     # Use werkzeug if available for proper password hashing
     from werkzeug.security import generate_password_hash
@@ -43,54 +51,25 @@ def ensure_admin(path: str, username: str, password: str) -> Result:
         cur.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='user'")
         if not cur.fetchone():
             return Result(path, "skip (no user table)")
-        # Introspect columns so we can satisfy NOT NULL defaults dynamically
-        cur.execute("PRAGMA table_info('user')")
-        cols = {r[1]: r for r in cur.fetchall()}  # name -> tuple
-        has_membership_points = 'membership_points' in cols
-        has_membership_level = 'membership_level' in cols
-        has_role = 'role' in cols
-        # Some very old schemas might use 'password' instead of 'password_hash'
-        password_column = 'password_hash' if 'password_hash' in cols else ('password' if 'password' in cols else None)
-        if password_column is None:
-            return Result(path, "error", "no password or password_hash column in user table")
-        # If 'role' is missing, try to add it with a safe default, then continue
-        if not has_role:
-            try:
-                cur.execute("ALTER TABLE user ADD COLUMN role VARCHAR(20) NOT NULL DEFAULT 'customer'")
-                con.commit()
-                has_role = True
-            except Exception as e:
-                # Continue without role update; will at least set password
-                pass
+        con.close()
+        # bring older schemas (missing role/profile columns) up to date first
+        engine = create_engine(f"sqlite:///{os.path.abspath(path)}")
+        try:
+            upgrade(engine, log=lambda msg: None)
+        finally:
+            engine.dispose()
+        con = sqlite3.connect(path)
+        cur = con.cursor()
         cur.execute("SELECT id FROM user WHERE username=?", (username,))
         row = cur.fetchone()
         phash = generate_password_hash(password)
         if row:
-            user_id = row[0]
-            if has_role:
-                cur.execute(f"UPDATE user SET role='admin', {password_column}=? WHERE id=?", (phash, user_id))
-            else:
-                cur.execute(f"UPDATE user SET {password_column}=? WHERE id=?", (phash, user_id))
+            cur.execute("UPDATE user SET role='admin', password_hash=? WHERE id=?", (phash, row[0]))
             action = "updated existing user to admin"
         else:
-            # Build insert fields dynamically
-            from typing import Any
-            fields = ['username', password_column]
-            values: list[Any] = [username, 'admin', phash]
-            if has_role:
-                fields.insert(1, 'role')
-                values.insert(1, 'admin')
-            if has_membership_level:
-                fields.append('membership_level')
-                values.append('')  # blank level
-            if has_membership_points:
-                fields.append('membership_points')
-                # Ensure integer type acceptable for sqlite parameter binding
-                values.append(0)  # start at 0
-            placeholders = ','.join(['?'] * len(values))
             cur.execute(
-                f"INSERT INTO user({','.join(fields)}) VALUES ({placeholders})",
-                values,
+                "INSERT INTO user(username, role, password_hash, membership_points) VALUES (?, 'admin', ?, 0)",
+                (username, phash),
             )
             action = "created new admin user"
         con.commit()
@@ -0,0 +1,192 @@
+"""Case-insensitive catalog of the site's image files.
+
+The frontend used to guess several filename / extension / casing variants per
+card and let ``ImageWithFallback`` walk through the resulting 404s. Instead,
+the server indexes the image folders once and publishes one verified URL per
+animal, event and news item (``image_url`` in their ``to_dict()``), with a
+placeholder declared as ``image_fallback``.
+
+Names are matched by slug, the same rule as ``frontend/src/utils/sanitizeName``:
+lowercase, accents stripped, runs of other characters collapsed to ``-``
+("Vet Q&A Session" -> ``vet-q-a-session``). A file named "Gaur (Indian
+Bison).jpeg" also answers to ``gaur``.
+
+The catalog re-lists a folder only when its mtime changes, and checks the
+mtimes at most every ``CHECK_INTERVAL`` seconds; ``invalidate()`` forces the
+next check (after uploads).
+"""
+from __future__ import annotations
+import os
+import re
+import threading
+import time
+import unicodedata
+from urllib.parse import unquote
+
+
+IMAGE_EXTS = ('jpeg', 'jpg', 'png', 'webp')
+CHECK_INTERVAL = 2.0
+
+_SLUG_RE = re.compile(r'[^a-z0-9]+')
+_PAREN_RE = re.compile(r'\s*\([^)]*\)')
+
+
+def slugify(name):
+    s = unicodedata.normalize('NFKD', str(name or '').lower())
+    s = ''.join(ch for ch in s if not unicodedata.combining(ch))
+    return _SLUG_RE.sub('-', s).strip('-')
+
+
+def placeholder_for(kind, name):
+    if kind == 'animal':
+        safe = ''.join(ch for ch in str(name or '') if ch.isalnum())[:20] or 'animal'
+        return f"/api/placeholder/animal/{safe}.svg"
+    return '/images/placeholder-banner.svg'
+
+
+class ImageCatalog:
+    """``folders`` maps a kind ('animal', 'event', ...) to ordered (directory, url_prefix) pairs."""
+
+    def __init__(self, folders, on_change=None):
+        self.folders = {kind: list(pairs) for kind, pairs in folders.items()}
+        self.on_change = on_change
+        self._lock = threading.Lock()
+        self._listing = {}      # directory -> (mtime_ns, {slug: filename}, {filename, ...})
+        self._checked = 0.0
+        self._by_kind = {}
+        self._urls = {}
+        self.builds = 0
+
+    def _dirs(self):
+        seen = []
+        for pairs in self.folders.values():
+            for directory, _ in pairs:
+                if directory not in seen:
+                    seen.append(directory)
+        return seen
+
+    @staticmethod
+    def _list(directory):
+        by_slug = {}
+        aliases = {}
+        files = set()
+        try:
+            names = os.listdir(directory)
+        except OSError:
+            return {}, files
+        for fn in names:
+            base, dot, ext = fn.rpartition('.')
+            ext = ext.lower()
+            if not dot or ext not in IMAGE_EXTS:
+                continue
+            files.add(fn)
+            rank = IMAGE_EXTS.index(ext)
+            for table, key in ((by_slug, slugify(base)), (aliases, slugify(_PAREN_RE.sub('', base)))):
+                if key and (key not in table or rank < table[key][0]):
+                    table[key] = (rank, fn)
+        out = {k: fn for k, (_, fn) in aliases.items()}
+        out.update({k: fn for k, (_, fn) in by_slug.items()})
+        return out, files
+
+    def invalidate(self):
+        self._checked = 0.0
+
+    def ensure(self):
+        now = time.monotonic()
+        if now - self._checked < CHECK_INTERVAL:
+            return self
+        with self._lock:
+            if now - self._checked < CHECK_INTERVAL:
+                return self
+            changed = False
+            for directory in self._dirs():
+                try:
+                    stamp = os.stat(directory).st_mtime_ns
+                except OSError:
+                    stamp = -1
+                cached = self._listing.get(directory)
+                if cached is None or cached[0] != stamp:
+                    self._listing[directory] = (stamp, *(self._list(directory) if stamp != -1 else ({}, set())))
+                    changed = True
+            if changed:
+                self._rebuild()
+            self._checked = time.monotonic()
+        if changed and self.on_change:
+            self.on_change()
+        return self
+
+    def _rebuild(self):
+        by_kind = {}
+        urls = {}
+        for kind, pairs in self.folders.items():
+            merged = {}
+            known = set()
+            # earlier folders win
+            for directory, prefix in reversed(pairs):
+                _, slugs, files = self._listing.get(directory, (0, {}, set()))
+                prefix = prefix.rstrip('/')
+                for key, fn in slugs.items():
+                    merged[key] = f"{prefix}/{fn}"
+                known.update(f"{prefix}/{fn}" for fn in files)
+            by_kind[kind] = merged
+            urls[kind] = known
+        self._by_kind = by_kind
+        self._urls = urls
+        self.builds += 1
+
+    def stamps(self, kind):
+        """Directory mtimes (as last listed) behind ``kind``; -1 for a missing folder."""
+        return [self._listing.get(directory, (None,))[0] for directory, _ in self.folders.get(kind, ())]
+
+    def fingerprint(self):
+        """(folder mtimes, newest mtime in seconds or None) as last listed; the same in every process."""
+        stamps = tuple(self._listing.get(d, (-1,))[0] for d in self._dirs())
+        present = [st for st in stamps if st not in (-1, None)]
+        return stamps, (max(present) / 1e9 if present else None)
+
+    def lookup(self, kind, name):
+        """Verified URL of the image for ``name`` or None."""
+        key = slugify(name)
+        return self._by_kind.get(kind, {}).get(key) if key else None
+
+    def contains(self, kind, url):
+        """True when ``url`` points at a file the catalog knows for ``kind``."""
+        return bool(url) and unquote(url) in self._urls.get(kind, ())
+
+    def resolve(self, kind, name, preferred=None):
+        """(url, fallback): ``preferred`` if it exists, else the name match, else the placeholder."""
+        fallback = placeholder_for(kind, name)
+        if self.contains(kind, preferred):
+            return unquote(preferred), fallback
+        if preferred and preferred.startswith(('http://', 'https://')):
+            return preferred, fallback
+        return self.lookup(kind, name) or fallback, fallback
+
+
+# process-wide catalog consulted by model serializers (set by create_app)
+_catalog = None
+
+
+def install(catalog):
+    global _catalog
+    _catalog = catalog
+
+
+def resolve(kind, name, preferred=None):
+    if _catalog is None:
+        return preferred or placeholder_for(kind, name), placeholder_for(kind, name)
+    return _catalog.resolve(kind, name, preferred)
+
+
+def default_folders(upload_dir, site_root):
+    """Folders per kind; ``site_root`` is the directory serving ``/images/...`` (static_files.site_root)."""
+    public = site_root
+    images = os.path.join(public, 'images')
+    extra = (os.path.join(public, 'extra images'), '/extra images')
+    return {
+        'animal': [(os.path.join(images, 'animals'), '/images/animals'),
+                   (os.path.join(upload_dir, 'animals'), '/uploads/animals')],
+        'event': [(os.path.join(images, 'events'), '/images/events'), extra],
+        'news': [(os.path.join(images, 'news'), '/images/news'), extra],
+        'campaign': [(os.path.join(images, 'campaigns'), '/images/campaigns'), extra],
+    }
@@ -0,0 +1,374 @@
+"""Resized JPEG/WebP derivatives of animal photos and uploads.
+
+Card grids render photos a few hundred pixels wide, but the originals under
+``/images`` (the served frontend build) and ``uploads/`` are full-size JPEGs. For every
+source image we write, with the Pillow we already depend on,
+
+  uploads/derived/<source path without extension>-<width>w.jpg
+  uploads/derived/<source path without extension>-<width>w.webp
+
+for each width in ``WIDTHS`` smaller than the original. Encoding runs in a
+process pool (CPU bound, so threads would serialize on the GIL).
+``DerivativeIndex`` records what exists, so ``srcset_for(url)`` never
+touches the disk; ``Animal.to_dict()`` and ``/api/animals/gallery`` use it to
+publish ``srcset`` strings. It walks the derived directory at startup, when
+one of its own jobs finishes, and when ``ensure()`` (at most every
+``CHECK_INTERVAL`` seconds) finds a directory mtime changed, e.g. after
+another worker process wrote derivatives.
+
+Environment:
+  IMAGE_WORKERS  worker processes (default min(4, cpu count); 0 = inline)
+
+Backfill existing images with:  python -m backend.images --backfill
+"""
+from __future__ import annotations
+import atexit
+import hashlib
+import json
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import quote
+
+from PIL import Image, ImageOps
+
+try:
+    from . import static_files
+except ImportError:  # python app.py from backend folder
+    import static_files
+
+
+WIDTHS = (320, 640, 1024)
+FORMATS = (('webp', 'WEBP', {'quality': 78, 'method': 4}),
+           ('jpg', 'JPEG', {'quality': 82, 'optimize': True, 'progressive': True}))
+SOURCE_EXTS = ('.jpg', '.jpeg', '.png')
+DERIVED_DIR = 'derived'
+DERIVED_URL = '/uploads/derived'
+CHECK_INTERVAL = 2.0
+FORMAT_KEYS = {'webp': 'webp', 'jpg': 'jpeg'}
+
+
+def derived_base(source_url):
+    """'/images/animals/Tiger.jpeg' -> 'images/animals/Tiger'."""
+    return os.path.splitext(source_url.lstrip('/'))[0]
+
+
+def make_derivatives(src_path, out_base, widths=WIDTHS):
+    """Write every derivative of one image; returns [(width, ext), ...] present.
+
+    Runs in a worker process. Existing outputs newer than the source are kept;
+    an output that would not be smaller than the source file is dropped.
+    """
+    src_mtime = os.path.getmtime(src_path)
+    src_size = os.path.getsize(src_path)
+    with Image.open(src_path) as im:
+        im = ImageOps.exif_transpose(im)
+        if im.mode not in ('RGB', 'L'):
+            im = im.convert('RGB')
+        orig_w = im.width
+        out = []
+        for w in widths:
+            if w >= orig_w:
+                continue
+            h = max(1, round(im.height * w / orig_w))
+            resized = None
+            for ext, fmt, opts in FORMATS:
+                path = f"{out_base}-{w}w.{ext}"
+                if not (os.path.isfile(path) and os.path.getmtime(path) >= src_mtime):
+                    if resized is None:
+                        resized = im.resize((w, h), Image.LANCZOS)
+                    os.makedirs(os.path.dirname(path), exist_ok=True)
+                    tmp = path + '.part'
+                    resized.save(tmp, fmt, **opts)
+                    if os.path.getsize(tmp) >= src_size:
+                        os.remove(tmp)
+                        continue
+                    os.replace(tmp, path)
+                out.append((w, ext))
+    return out
+
+
+class DerivativeIndex:
+    """Which derivatives exist per source URL, plus the worker pool that makes them."""
+
+    def __init__(self, upload_dir, roots, workers=None):
+        """``roots`` maps a URL prefix ('/images/') to the directory serving it."""
+        self.upload_dir = upload_dir
+        self.out_root = os.path.join(upload_dir, DERIVED_DIR)
+        self.roots = dict(roots)
+        self.roots.setdefault('/uploads/', upload_dir)
+        if workers is None:
+            try:
+                workers = int(os.environ.get('IMAGE_WORKERS', min(4, os.cpu_count() or 1)))
+            except Exception:
+                workers = 1
+        self.workers = max(workers, 0)
+        self._pool = None
+        self._lock = threading.Lock()
+        # ((directory mtimes, file count), {base: {(width, ext), ...}}), replaced as a whole by a walk
+        self._state = (((), 0), {})
+        self._checked = 0.0
+        self.on_change = None
+
+    # -- lookups -----------------------------------------------------------
+    def _walk(self):
+        stamps = []
+        found = {}
+        if os.path.isdir(self.out_root):
+            for dirpath, _, filenames in os.walk(self.out_root):
+                try:
+                    stamps.append((os.path.relpath(dirpath, self.out_root), os.stat(dirpath).st_mtime_ns))
+                except OSError:
+                    continue
+                for fn in filenames:
+                    stem, dot, ext = fn.rpartition('.')
+                    base, dash, width = stem.rpartition('-')
+                    if not dot or not dash or ext not in FORMAT_KEYS or not width.endswith('w') or not width[:-1].isdigit():
+                        continue
+                    rel = os.path.relpath(os.path.join(dirpath, base), self.out_root).replace(os.sep, '/')
+                    found.setdefault(rel, set()).add((int(width[:-1]), ext))
+        return (tuple(sorted(stamps)), sum(len(v) for v in found.values())), found
+
+    def scan(self):
+        """Index the derived directory (startup)."""
+        with self._lock:
+            self._state = self._walk()
+            self._checked = time.monotonic()
+        return self
+
+    def invalidate(self):
+        self._checked = 0.0
+
+    def ensure(self):
+        """Re-walk the derived directory, at most every ``CHECK_INTERVAL`` s; ``on_change`` fires if it differs."""
+        now = time.monotonic()
+        if now - self._checked < CHECK_INTERVAL:
+            return self
+        changed = False
+        with self._lock:
+            if now - self._checked < CHECK_INTERVAL:
+                return self
+            walked = self._walk()
+            # the file count catches writes that land within one mtime tick
+            if walked != self._state:
+                self._state = walked
+                changed = True
+            self._checked = time.monotonic()
+        if changed and self.on_change:
+            self.on_change()
+        return self
+
+    def fingerprint(self):
+        """(directory mtimes, file count) as last walked: the same in every process that sees the same files."""
+        return self._state[0]
+
+    def srcset_for(self, source_url):
+        """{'webp': 'url 320w, ...', 'jpeg': ...} for a source URL, or None."""
+        if not source_url:
+            return None
+        have = self._state[1].get(derived_base(source_url))
+        if not have:
+            return None
+        out = {}
+        for ext, key in FORMAT_KEYS.items():
+            entries = sorted(w for w, e in have if e == ext)
+            if entries:
+                base = quote(f"{DERIVED_URL}/{derived_base(source_url)}")
+                out[key] = ', '.join(f"{base}-{w}w.{ext} {w}w" for w in entries)
+        return out or None
+
+    def source_path(self, source_url):
+        for prefix, root in self.roots.items():
+            if source_url.startswith(prefix):
+                rel = source_url[len(prefix):]
+                if '..' in rel.split('/'):
+                    return None
+                return os.path.join(root, rel)
+        return None
+
+    # -- generation --------------------------------------------------------
+    def _register(self, source_url, outputs):
+        # index what is on disk, so the srcsets and fingerprint() match other processes
+        if not outputs:
+            return
+        self.invalidate()
+        self.ensure()
+
+    def _executor(self):
+        with self._lock:
+            if self._pool is None:
+                # spawn: the web server is multi-threaded, forking it is unsafe
+                self._pool = ProcessPoolExecutor(max_workers=self.workers,
+                                                 mp_context=multiprocessing.get_context('spawn'))
+                atexit.register(self.shutdown)
+            return self._pool
+
+    def submit(self, source_url):
+        """Queue derivatives for a source image URL; returns a Future (None when inline)."""
+        src = self.source_path(source_url)
+        if src is None or not src.lower().endswith(SOURCE_EXTS) or not os.path.isfile(src):
+            return None
+        out_base = os.path.join(self.out_root, derived_base(source_url))
+        if not self.workers:
+            self._register(source_url, make_derivatives(src, out_base))
+            return None
+        fut = self._executor().submit(make_derivatives, src, out_base)
+
+        def _done(f):
+            try:
+                self._register(source_url, f.result())
+            except Exception as e:
+                print(f"[image_warning] derivatives failed for {source_url}: {e}", flush=True)
+        fut.add_done_callback(_done)
+        return fut
+
+    def sources(self):
+        """Every source image URL under the configured roots (derived files excluded)."""
+        urls = []
+        for prefix, root in self.roots.items():
+            if not os.path.isdir(root):
+                continue
+            for dirpath, dirnames, filenames in os.walk(root):
+                if os.path.abspath(dirpath) == os.path.abspath(self.upload_dir):
+                    dirnames[:] = [d for d in dirnames if d not in (DERIVED_DIR, 'renditions')]
+                for fn in filenames:
+                    if fn.lower().endswith(SOURCE_EXTS):
+                        rel = os.path.relpath(os.path.join(dirpath, fn), root).replace(os.sep, '/')
+                        urls.append(prefix + rel)
+        return sorted(urls)
+
+    def backfill(self):
+        """Generate derivatives for every source image; returns the number processed."""
+        futures = [self.submit(url) for url in self.sources()]
+        for f in futures:
+            if f is not None:
+                f.result()
+        return len(futures)
+
+    def shutdown(self, wait=True):
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait)
+
+
+class GalleryManifest:
+    """Pre-serialized /api/animals/gallery payload for one image directory.
+
+    Built once and rebuilt only when the directory's mtime changes (files
+    added, removed or renamed) or ``invalidate()`` is called after an upload
+    or when new derivatives land; a request costs one ``stat``. Entries carry
+    width/height (read from the image header only), byte size and srcset.
+    ``ensure()`` returns ``(body, etag)`` from one build.
+    """
+
+    def __init__(self, directory, url_prefix, index=None, exts=SOURCE_EXTS):
+        self.directory = directory
+        self.url_prefix = url_prefix.rstrip('/')
+        self.index = index
+        self.exts = exts
+        self._lock = threading.Lock()
+        self._generation = 0
+        # (directory mtime, generation, body, etag), replaced as a whole by _build
+        self._state = (None, -1, None, None)
+        self.builds = 0
+
+    @property
+    def body(self):
+        return self._state[2]
+
+    @property
+    def etag(self):
+        return self._state[3]
+
+    def invalidate(self):
+        self._generation += 1
+
+    def _dir_stamp(self):
+        try:
+            return os.stat(self.directory).st_mtime_ns
+        except OSError:
+            return -1
+
+    def _current(self, state, stamp):
+        return state[0] == stamp and state[1] == self._generation
+
+    def ensure(self):
+        """Return ``(body, etag)`` of an up-to-date manifest, from a single build."""
+        state = self._state
+        stamp = self._dir_stamp()
+        if not self._current(state, stamp):
+            with self._lock:
+                state = self._state
+                stamp = self._dir_stamp()
+                if not self._current(state, stamp):
+                    state = self._build(stamp, self._generation)
+        return state[2], state[3]
+
+    def _build(self, stamp, generation):
+        files = []
+        if os.path.isdir(self.directory):
+            for fn in os.listdir(self.directory):
+                if not fn.lower().endswith(self.exts):
+                    continue
+                path = os.path.join(self.directory, fn)
+                try:
+                    size = os.path.getsize(path)
+                    with Image.open(path) as im:
+                        width, height = im.size
+                except Exception:
+                    continue
+                url = f"{self.url_prefix}/{fn}"
+                files.append({
+                    'file': fn,
+                    'url': url,
+                    'width': width,
+                    'height': height,
+                    'bytes': size,
+                    'srcset': self.index.srcset_for(url) if self.index is not None else None,
+                })
+        files.sort(key=lambda x: x['file'].lower())
+        body = json.dumps({'images': files, 'count': len(files)}).encode('utf-8')
+        # body and etag are published together: a reader never pairs one build's body with another's etag
+        self._state = (stamp, generation, body, hashlib.sha1(body).hexdigest()[:20])
+        self.builds += 1
+        return self._state
+
+
+# process-wide index consulted by model serializers (set by create_app)
+_index = None
+
+
+def install(index):
+    global _index
+    _index = index
+
+
+def srcset_for(source_url):
+    return _index.srcset_for(source_url) if _index is not None else None
+
+
+def default_roots(site_root=None):
+    """URL prefix -> source directory; ``site_root`` defaults to static_files.site_root()."""
+    return {'/images/': os.path.join(site_root or static_files.site_root(), 'images')}
+
+
+def main(argv=None):  # pragma: no cover
+    import argparse
+    import time
+    parser = argparse.ArgumentParser(description='Zooverse image derivatives')
+    parser.add_argument('--backfill', action='store_true', help='generate derivatives for all existing images')
+    parser.add_argument('--uploads', default=os.path.join(os.getcwd(), 'uploads'))
+    args = parser.parse_args(argv)
+    if not args.backfill:
+        parser.print_help()
+        return
+    index = DerivativeIndex(args.uploads, default_roots()).scan()
+    t0 = time.perf_counter()
+    n = index.backfill()
+    index.shutdown()
+    print(f"Processed {n} images with {index.workers or 'inline'} workers in {time.perf_counter() - t0:.1f}s")
+
+
+if __name__ == '__main__':  # pragma: no cover
+    main()
@@ -0,0 +1,174 @@
+"""Lower-bitrate renditions and poster frames for site videos.
+
+Source videos live in ``frontend/dist/Videos`` (copied from
+``frontend/public/Videos`` by the build). An admin triggers
+``POST /api/admin/media/renditions`` and ``VideoRenditions`` runs ffmpeg in a
+single background worker, writing into ``uploads/renditions``:
+
+  <stem>-<hash>-<height>p.mp4   H.264, faststart, no audio (hero loops are muted)
+  <stem>-<hash>-poster.jpg      first-second frame for the <video poster>
+
+``<hash>`` comes from the source's size and mtime, so rendition URLs are
+immutable and a replaced source simply produces new files.
+``GET /api/media/videos`` lists each source with the renditions that exist so
+the home page can pick a lighter variant; the listing is built once and again
+only after a job finishes.
+
+Environment:
+  FFMPEG_BIN  ffmpeg executable (default: looked up on PATH)
+"""
+from __future__ import annotations
+import atexit
+import hashlib
+import os
+import shutil
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+# (height, video bitrate) from heaviest to lightest
+RENDITIONS = ((720, '1500k'), (480, '700k'), (360, '350k'))
+VIDEO_EXTS = ('.mp4', '.webm', '.mov')
+
+
+def source_tag(path):
+    st = os.stat(path)
+    return hashlib.sha1(f"{st.st_size}:{st.st_mtime_ns}".encode('utf-8')).hexdigest()[:8]
+
+
+def rendition_name(stem, tag, height):
+    return f"{stem}-{tag}-{height}p.mp4"
+
+
+def poster_name(stem, tag):
+    return f"{stem}-{tag}-poster.jpg"
+
+
+def ffmpeg_commands(ffmpeg, src, out_dir, stem, tag):
+    """(output path, argv) pairs for every rendition plus the poster frame."""
+    cmds = []
+    for height, bitrate in RENDITIONS:
+        out = os.path.join(out_dir, rendition_name(stem, tag, height))
+        cmds.append((out, [
+            ffmpeg, '-y', '-loglevel', 'error', '-i', src,
+            '-vf', f'scale=-2:{height}', '-c:v', 'libx264', '-preset', 'veryfast',
+            '-b:v', bitrate, '-maxrate', bitrate, '-bufsize', bitrate,
+            '-pix_fmt', 'yuv420p', '-movflags', '+faststart', '-an', '-f', 'mp4',
+        ]))
+    poster = os.path.join(out_dir, poster_name(stem, tag))
+    cmds.append((poster, [
+        ffmpeg, '-y', '-loglevel', 'error', '-ss', '1', '-i', src,
+        '-frames:v', '1', '-vf', f'scale=-2:{RENDITIONS[0][0]}', '-q:v', '4', '-f', 'image2',
+    ]))
+    return cmds
+
+
+class VideoRenditions:
+    """Tracks sources, existing renditions and background ffmpeg jobs."""
+
+    def __init__(self, source_dir, output_dir, ffmpeg=None):
+        self.source_dir = source_dir
+        self.output_dir = output_dir
+        self.ffmpeg = ffmpeg or os.environ.get('FFMPEG_BIN') or shutil.which('ffmpeg')
+        self.jobs = {}
+        self._lock = threading.Lock()
+        self._pool = None
+        # (generation, url_prefix, videos): the /api/media/videos listing, rebuilt after jobs finish
+        self._generation = 0
+        self._listing = None
+        self.listing_builds = 0
+
+    @property
+    def available(self):
+        return bool(self.ffmpeg)
+
+    def sources(self):
+        if not os.path.isdir(self.source_dir):
+            return []
+        return sorted(n for n in os.listdir(self.source_dir)
+                      if n.lower().endswith(VIDEO_EXTS) and os.path.isfile(os.path.join(self.source_dir, n)))
+
+    def source_path(self, name):
+        if name not in self.sources():
+            return None
+        return os.path.join(self.source_dir, name)
+
+    def describe(self, name, url_prefix):
+        """Source entry with the renditions/poster already on disk."""
+        path = os.path.join(self.source_dir, name)
+        stem, tag = os.path.splitext(name)[0], source_tag(path)
+        out = {'name': name, 'bytes': os.path.getsize(path), 'renditions': [], 'poster': None}
+        for height, bitrate in RENDITIONS:
+            fn = rendition_name(stem, tag, height)
+            full = os.path.join(self.output_dir, fn)
+            if os.path.isfile(full):
+                out['renditions'].append({'height': height, 'bitrate': bitrate,
+                                          'src': f"{url_prefix}/{fn}", 'bytes': os.path.getsize(full)})
+        poster = poster_name(stem, tag)
+        if os.path.isfile(os.path.join(self.output_dir, poster)):
+            out['poster'] = f"{url_prefix}/{poster}"
+        return out
+
+    def listing(self, url_prefix, video_prefix='/Videos'):
+        """Every source with its existing renditions, kept in memory.
+
+        Like the static manifest, the disk is read once and then only again
+        after a rendition job finishes (sources change with a rebuild and
+        restart), so a request costs no ``stat``.
+        """
+        cached = self._listing
+        generation = self._generation
+        if cached is None or cached[0] != generation or cached[1] != url_prefix:
+            videos = tuple(dict(self.describe(n, url_prefix), src=f"{video_prefix}/{n}") for n in self.sources())
+            cached = (generation, url_prefix, videos)
+            self._listing = cached
+            self.listing_builds += 1
+        return cached[2]
+
+    def submit(self, name):
+        """Queue rendition generation for one source; returns the job dict."""
+        src = self.source_path(name)
+        if src is None:
+            raise FileNotFoundError(name)
+        with self._lock:
+            job = self.jobs.get(name)
+            if job and job['status'] in ('queued', 'running'):
+                return job
+            job = {'video': name, 'status': 'queued', 'error': None, 'outputs': []}
+            self.jobs[name] = job
+            if self._pool is None:
+                # one encode at a time; ffmpeg already uses every core
+                self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix='renditions')
+                atexit.register(self.shutdown)
+        self._pool.submit(self._run, src, job)
+        return job
+
+    def _run(self, src, job):
+        job['status'] = 'running'
+        try:
+            os.makedirs(self.output_dir, exist_ok=True)
+            stem = os.path.splitext(os.path.basename(src))[0]
+            for out, argv in ffmpeg_commands(self.ffmpeg, src, self.output_dir, stem, source_tag(src)):
+                if os.path.isfile(out):
+                    job['outputs'].append(os.path.basename(out))
+                    continue
+                tmp = out + '.part'
+                subprocess.run(argv + [tmp], check=True, capture_output=True, timeout=1800)
+                os.replace(tmp, out)
+                job['outputs'].append(os.path.basename(out))
+            job['status'] = 'done'
+        except subprocess.CalledProcessError as e:
+            job['status'] = 'failed'
+            job['error'] = (e.stderr or b'').decode('utf-8', 'replace')[-500:] or str(e)
+        except Exception as e:
+            job['status'] = 'failed'
+            job['error'] = str(e)
+        if job['status'] == 'failed':
+            print(f"[media_warning] renditions failed for {job['video']}: {job['error']}", flush=True)
+        # outputs (or partial ones) changed on disk
+        self._generation += 1
+
+    def shutdown(self, wait=True):
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait)
@@ -0,0 +1,342 @@
+"""Ordered, versioned schema migrations for the models in models.py.
+
+Applied versions are recorded in ``schema_migrations``. A database with no
+application tables is created at head by ``create_all`` and every migration
+is marked applied; an existing database runs the migrations it is missing, in
+order, each in its own transaction, and then ``create_all`` / ``ensure_indexes``
+add any brand-new tables and declared indexes.
+
+Most migrations are ``ALTER TABLE ... ADD COLUMN`` (constant time on SQLite).
+Changes SQLite cannot alter in place go through ``rebuild_table``: the table
+is recreated from its current model definition and rows are copied in
+primary-key chunks of ``MIGRATION_BATCH`` rows, one short transaction per
+chunk, so writers keep working during the copy. Temporary triggers mirror
+writes made meanwhile into the new table; only the final swap (drop the old
+table, rename the new one, recreate indexes and triggers) holds the write
+lock, and it does not depend on the table size.
+
+Run from the repository root:
+
+  python -m backend.migrations status
+  python -m backend.migrations upgrade [--batch 5000]
+
+``DATABASE_URL`` selects the database (default backend/instance/zoo.db).
+create_app applies pending migrations itself only when ``AUTO_MIGRATE=1``,
+the default outside ``ENV=production``.
+"""
+from __future__ import annotations
+import os
+import time
+from dataclasses import dataclass
+from typing import Callable
+
+from sqlalchemy import MetaData, inspect, text
+from sqlalchemy.schema import CreateTable
+
+try:
+    from .models import db, ensure_indexes
+    from . import rollups
+except ImportError:  # python app.py from backend folder
+    from models import db, ensure_indexes
+    import rollups
+
+
+DEFAULT_BATCH = 5000
+
+
+class MigrationError(RuntimeError):
+    pass
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    name: str
+    upgrade: Callable
+
+
+# -- operations ------------------------------------------------------------
+def columns_of(conn, table):
+    insp = inspect(conn)
+    if not insp.has_table(table):
+        return None
+    return {c['name'] for c in insp.get_columns(table)}
+
+
+def add_columns(conn, table, columns):
+    """``columns``: [(name, DDL type/default clause)]; existing columns are skipped."""
+    existing = columns_of(conn, table)
+    if existing is None:
+        return []
+    added = []
+    for name, ddl in columns:
+        if name not in existing:
+            conn.execute(text(f'ALTER TABLE "{table}" ADD COLUMN {name} {ddl}'))
+            added.append(name)
+    return added
+
+
+def rebuild_table(engine, table, transforms=None, batch=None, progress=None):
+    """Recreate ``table`` from its model definition, copying rows in chunks (SQLite).
+
+    ``transforms`` maps a column to the SQL expression whose value is copied,
+    written against ``{row}.<column>`` of the old row. Model columns missing
+    from the old table must be nullable or have a server default. Returns the
+    number of rows copied.
+    """
+    batch = batch or DEFAULT_BATCH
+    model = db.metadata.tables[table]
+    pk = [c.name for c in model.primary_key.columns]
+    if pk != ['id']:
+        raise MigrationError(f"rebuild_table needs an integer 'id' primary key ({table})")
+    new = f"_mig_new_{table}"
+    transforms = dict(transforms or {})
+
+    def exprs(row):
+        # column values read from ``row`` ('new' in triggers, the old table itself when copying)
+        out = []
+        for c in cols:
+            if c in transforms:
+                out.append(transforms[c].replace('{row}.', f'{row}.' if row else ''))
+            else:
+                out.append(f'{row}.{c}' if row else c)
+        return ', '.join(out)
+
+    def drop_scratch():
+        for suffix in ('ai', 'au', 'ad'):
+            conn.execute(text(f'DROP TRIGGER IF EXISTS "_mig_{table}_{suffix}"'))
+        conn.execute(text(f'DROP TABLE IF EXISTS "{new}"'))
+
+    conn = engine.connect()
+    try:
+        with conn.begin():
+            old_cols = columns_of(conn, table)
+            if old_cols is None:
+                return 0
+            cols = [c.name for c in model.columns if c.name in old_cols]
+            names = ', '.join(cols)
+            drop_scratch()
+            conn.execute(CreateTable(model.to_metadata(MetaData(), name=new)))
+            # mirror writes made (by any connection) while the copy runs; plain INSERTs so a
+            # constraint violation fails loudly instead of replacing another row
+            conn.execute(text(f'CREATE TRIGGER "_mig_{table}_ai" AFTER INSERT ON "{table}" BEGIN '
+                              f'INSERT INTO "{new}" ({names}) VALUES ({exprs("new")}); END'))
+            conn.execute(text(f'CREATE TRIGGER "_mig_{table}_au" AFTER UPDATE ON "{table}" BEGIN '
+                              f'DELETE FROM "{new}" WHERE id = old.id; '
+                              f'INSERT INTO "{new}" ({names}) VALUES ({exprs("new")}); END'))
+            conn.execute(text(f'CREATE TRIGGER "_mig_{table}_ad" AFTER DELETE ON "{table}" BEGIN '
+                              f'DELETE FROM "{new}" WHERE id = old.id; END'))
+        copied = 0
+        last = 0
+        while True:
+            with conn.begin():
+                upper, count = conn.execute(text(
+                    f'SELECT MAX(id), COUNT(*) FROM (SELECT id FROM "{table}" WHERE id > :last ORDER BY id LIMIT :n)'),
+                    {'last': last, 'n': batch}).fetchone()
+                if not count:
+                    break
+                # rows the triggers already copied are newer: keep them (skipped by id only, so
+                # a constraint violation aborts the migration rather than dropping a row)
+                conn.execute(text(f'INSERT INTO "{new}" ({names}) SELECT {exprs(None)} FROM "{table}" '
+                                  f'WHERE id > :last AND id <= :upper AND id NOT IN (SELECT id FROM "{new}")'),
+                             {'last': last, 'upper': upper})
+            copied += count
+            last = upper
+            if progress:
+                progress(table, copied)
+        foreign_keys = conn.execute(text('PRAGMA foreign_keys')).scalar()
+        conn.execute(text('PRAGMA foreign_keys=OFF'))
+        conn.commit()
+        try:
+            with conn.begin():
+                for suffix in ('ai', 'au', 'ad'):
+                    conn.execute(text(f'DROP TRIGGER "_mig_{table}_{suffix}"'))
+                # other triggers (e.g. the search index sync) go away with the old table
+                triggers = [row[0] for row in conn.execute(text(
+                    "SELECT sql FROM sqlite_master WHERE type = 'trigger' AND tbl_name = :t AND sql IS NOT NULL"),
+                    {'t': table})]
+                conn.execute(text(f'DROP TABLE "{table}"'))
+                conn.execute(text(f'ALTER TABLE "{new}" RENAME TO "{table}"'))
+                for index in model.indexes:
+                    index.create(conn, checkfirst=True)
+                for sql in triggers:
+                    conn.execute(text(sql))
+        finally:
+            if foreign_keys:
+                conn.execute(text('PRAGMA foreign_keys=ON'))
+                conn.commit()
+    except Exception:
+        if conn.in_transaction():
+            conn.rollback()
+        with conn.begin():
+            drop_scratch()
+        raise
+    finally:
+        conn.close()
+    return copied
+
+
+# -- migrations --------------------------------------------------------------
+def _user_profile_columns(engine, batch):
+    # role and profile fields added to User after the first release
+    with engine.begin() as conn:
+        add_columns(conn, 'user', [
+            ('role', "VARCHAR(20) NOT NULL DEFAULT 'customer'"),
+            ('full_name', 'VARCHAR(120)'),
+            ('specialization', 'VARCHAR(120)'),
+            ('bio', 'TEXT'),
+            ('email', 'VARCHAR(160)'),
+            ('membership_level', 'VARCHAR(40)'),
+            ('membership_points', 'INTEGER NOT NULL DEFAULT 0'),
+        ])
+
+
+def _booking_qr_png(engine, batch):
+    # raw QR bytes served from /api/bookings/<id>/qr.png
+    with engine.begin() as conn:
+        add_columns(conn, 'booking', [('qr_png', 'BLOB')])
+
+
+def _user_email_unique(engine, batch):
+    # ADD COLUMN could not carry the UNIQUE constraint on User.email
+    sqlite = engine.dialect.name == 'sqlite'
+    # "user" is reserved on Postgres: let the dialect quote it
+    user = engine.dialect.identifier_preparer.quote('user')
+    # check the value that will be stored: the SQLite rebuild trims emails and blanks become NULL
+    email = "NULLIF(TRIM({row}.email), '')" if sqlite else "NULLIF({row}.email, '')"
+    with engine.connect() as conn:
+        dupes = conn.execute(text(
+            f"SELECT {email.format(row=user)} AS e FROM {user} WHERE {email.format(row=user)} IS NOT NULL "
+            "GROUP BY e HAVING COUNT(*) > 1 LIMIT 5")).fetchall()
+    if dupes:
+        raise MigrationError('duplicate user emails: ' + ', '.join(r[0] for r in dupes))
+    if sqlite:
+        rebuild_table(engine, 'user', transforms={'email': email}, batch=batch)
+    else:
+        with engine.begin() as conn:
+            conn.execute(text(f"ALTER TABLE {user} ADD CONSTRAINT uq_user_email UNIQUE (email)"))
+
+
+def _widen_password_hash(engine, batch):
+    # scrypt hashes are ~160 characters; SQLite does not enforce VARCHAR lengths
+    if engine.dialect.name == 'postgresql':
+        sql = 'ALTER TABLE "user" ALTER COLUMN password_hash TYPE VARCHAR(255)'
+    elif engine.dialect.name == 'mysql':
+        sql = 'ALTER TABLE user MODIFY password_hash VARCHAR(255) NOT NULL'
+    else:
+        return
+    with engine.begin() as conn:
+        conn.execute(text(sql))
+
+
+def _sales_rollups(engine, batch):
+    # daily rollups read by the analytics endpoints; backfilled from existing sales and bookings
+    rollups.SALE_ROLLUP.create(engine, checkfirst=True)
+    rollups.BOOKING_ROLLUP.create(engine, checkfirst=True)
+    with engine.begin() as conn:
+        rollups.rebuild(conn)
+
+
+def _audit_created_at_id(engine, batch):
+    # ix_audit_log_created_at gains a trailing id; ensure_indexes recreates it after the runner
+    with engine.begin() as conn:
+        insp = inspect(conn)
+        if not insp.has_table('audit_log'):
+            return
+        if 'ix_audit_log_created_at' in {ix['name'] for ix in insp.get_indexes('audit_log')}:
+            table = db.metadata.tables['audit_log']
+            next(ix for ix in table.indexes if ix.name == 'ix_audit_log_created_at').drop(conn)
+
+
+MIGRATIONS = (
+    Migration(1, 'user profile columns', _user_profile_columns),
+    Migration(2, 'booking qr_png', _booking_qr_png),
+    Migration(3, 'unique user email', _user_email_unique),
+    Migration(4, 'widen user.password_hash', _widen_password_hash),
+    Migration(5, 'daily sales and booking rollups', _sales_rollups),
+    Migration(6, 'audit_log created_at index with id', _audit_created_at_id),
+)
+HEAD = MIGRATIONS[-1].version
+
+
+# -- runner ------------------------------------------------------------------
+def applied_versions(engine):
+    with engine.connect() as conn:
+        if not inspect(conn).has_table('schema_migrations'):
+            return set()
+        return {row[0] for row in conn.execute(text("SELECT version FROM schema_migrations"))}
+
+
+def pending(engine):
+    done = applied_versions(engine)
+    return [m for m in MIGRATIONS if m.version not in done]
+
+
+def _record(engine, migration, seconds):
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO schema_migrations (version, name, applied_at, seconds) "
+                          "VALUES (:v, :n, CURRENT_TIMESTAMP, :s)"),
+                     {'v': migration.version, 'n': migration.name, 's': round(seconds, 3)})
+
+
+def _is_empty(engine):
+    app_tables = {t.name for t in db.metadata.sorted_tables} - {'schema_migrations', 'app_state', 'table_versions'}
+    with engine.connect() as conn:
+        return not (app_tables & set(inspect(conn).get_table_names()))
+
+
+def init_if_empty(engine):
+    """Create a database with no application tables at head; True when it did."""
+    if not _is_empty(engine):
+        return False
+    db.metadata.create_all(engine)
+    for m in MIGRATIONS:
+        _record(engine, m, 0.0)
+    return True
+
+
+def upgrade(engine, batch=None, log=print):
+    """Apply every pending migration in order; returns the versions applied."""
+    batch = batch or int(os.environ.get('MIGRATION_BATCH', DEFAULT_BATCH))
+    if init_if_empty(engine):
+        log(f"[migrate] created schema at version {HEAD}")
+        return []
+    db.metadata.tables['schema_migrations'].create(engine, checkfirst=True)
+    done = []
+    for m in pending(engine):
+        t0 = time.perf_counter()
+        log(f"[migrate] {m.version:04d} {m.name} ...")
+        m.upgrade(engine, batch)
+        seconds = time.perf_counter() - t0
+        _record(engine, m, seconds)
+        log(f"[migrate] {m.version:04d} done in {seconds:.2f}s")
+        done.append(m.version)
+    # new tables and declared indexes need no hand-written migration
+    db.metadata.create_all(engine)
+    created = ensure_indexes(engine)
+    if created:
+        log(f"[migrate] created indexes: {', '.join(created)}")
+    return done
+
+
+def main(argv=None):  # pragma: no cover
+    import argparse
+    from sqlalchemy import create_engine
+    parser = argparse.ArgumentParser(description='Zooverse schema migrations')
+    parser.add_argument('command', choices=('status', 'upgrade'))
+    parser.add_argument('--url', default=os.environ.get('DATABASE_URL'))
+    parser.add_argument('--batch', type=int, default=None, help=f'rows per copy chunk (default {DEFAULT_BATCH})')
+    args = parser.parse_args(argv)
+    url = args.url or 'sqlite:///' + os.path.abspath(os.path.join(os.path.dirname(__file__), 'instance', 'zoo.db'))
+    engine = create_engine(url)
+    if args.command == 'status':
+        done = applied_versions(engine)
+        for m in MIGRATIONS:
+            print(f"{'applied' if m.version in done else 'pending'}  {m.version:04d}  {m.name}")
+        return
+    applied = upgrade(engine, batch=args.batch)
+    print(f"Applied {len(applied)} migration(s); database at version {HEAD}")
+
+
+if __name__ == '__main__':  # pragma: no cover
+    main()
@@ -1,13 +1,19 @@
 from flask_sqlalchemy import SQLAlchemy
-from werkzeug.security import generate_password_hash, check_password_hash
+from sqlalchemy.orm import deferred
 from datetime import date
+try:
+    from . import images, image_catalog, passwords
+except ImportError:  # python app.py from backend folder
+    import images
+    import image_catalog
+    import passwords
 
 db = SQLAlchemy()
 
 class User(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(80), unique=True, nullable=False)
-    password_hash = db.Column(db.String(128), nullable=False)
+    password_hash = db.Column(db.String(255), nullable=False)
     role = db.Column(db.String(20), nullable=False, default='customer')
     # Extended profile fields (for doctors/staff)
     full_name = db.Column(db.String(120), nullable=True)
@@ -18,10 +24,13 @@ class User(db.Model):
     membership_points = db.Column(db.Integer, nullable=False, default=0)
 
     def set_password(self, password: str):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = passwords.hash_password(password)
 
     def check_password(self, password: str) -> bool:
-        return check_password_hash(self.password_hash, password)
+        return passwords.verify_password(self.password_hash, password)
+
+    def password_needs_rehash(self) -> bool:
+        return passwords.needs_rehash(self.password_hash)
 
     def to_dict(self):
         return {
@@ -45,6 +54,7 @@ class Animal(db.Model):
     photo_url = db.Column(db.String(255), nullable=True)
 
     def to_dict(self):
+        image_url, image_fallback = image_catalog.resolve('animal', self.name, self.photo_url)
         return {
             'id': self.id,
             'name': self.name,
@@ -53,10 +63,16 @@ class Animal(db.Model):
             'habitat_id': self.habitat_id,
             'assigned_veterinarian_id': self.assigned_veterinarian_id,
             'description': self.description,
-            'photo_url': self.photo_url
+            'photo_url': self.photo_url,
+            'image_url': image_url,
+            'image_fallback': image_fallback,
+            'photo_srcset': images.srcset_for(image_url)
         }
 
 class HealthRecord(db.Model):
+    __table_args__ = (
+        db.Index('ix_health_record_animal_date', 'animal_id', 'date'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     animal_id = db.Column(db.Integer, db.ForeignKey('animal.id'), nullable=False)
     veterinarian_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True)
@@ -88,6 +104,9 @@ class HealthRecord(db.Model):
 
 
 class Booking(db.Model):
+    __table_args__ = (
+        db.Index('ix_booking_user_id', 'user_id'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True)
     date = db.Column(db.Date, nullable=False)
@@ -97,9 +116,16 @@ class Booking(db.Model):
     price_cents = db.Column(db.Integer, nullable=False, default=0)
     currency = db.Column(db.String(3), nullable=False, default='INR')
     paid = db.Column(db.Boolean, default=False)
-    qr_code_b64 = db.Column(db.Text, nullable=True)
+    # legacy base64 PNG (pre qr_png rows); deferred so list queries never load it
+    qr_code_b64 = deferred(db.Column(db.Text, nullable=True))
+    # raw PNG bytes served by /api/bookings/<id>/qr.png
+    qr_png = deferred(db.Column(db.LargeBinary, nullable=True))
     created_at = db.Column(db.DateTime, nullable=False, default=db.func.now())
 
+    @property
+    def qr_url(self):
+        return f"/api/bookings/{self.id}/qr.png" if self.id else None
+
     def to_dict(self):
         return {
             'id': self.id,
@@ -110,7 +136,7 @@ class Booking(db.Model):
             'num_children': self.num_children,
             'price_cents': self.price_cents,
             'paid': self.paid,
-            'qr_code_b64': self.qr_code_b64,
+            'qr_url': self.qr_url,
             'created_at': self.created_at.isoformat() if self.created_at else None
         }
 
@@ -198,7 +224,58 @@ class TicketSale(db.Model):
         }
 
 
+class TicketSaleDaily(db.Model):
+    """Ticket sales per sale day, channel and ticket type (kept current by rollups.py)."""
+    __tablename__ = 'ticket_sale_daily'
+    day = db.Column(db.Date, primary_key=True)
+    channel = db.Column(db.String(20), primary_key=True)
+    ticket_type_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    sales = db.Column(db.Integer, nullable=False, default=0)
+    adults = db.Column(db.Integer, nullable=False, default=0)
+    children = db.Column(db.Integer, nullable=False, default=0)
+    revenue_cents = db.Column(db.Integer, nullable=False, default=0)
+
+    def to_dict(self):
+        return {
+            'day': self.day.isoformat(),
+            'channel': self.channel,
+            'ticket_type_id': self.ticket_type_id,
+            'sales': self.sales,
+            'adults': self.adults,
+            'children': self.children,
+            'revenue_cents': self.revenue_cents,
+        }
+
+
+class BookingDaily(db.Model):
+    """Bookings per visit date and time slot (kept current by rollups.py)."""
+    __tablename__ = 'booking_daily'
+    day = db.Column(db.Date, primary_key=True)
+    time_slot = db.Column(db.String(50), primary_key=True)
+    bookings = db.Column(db.Integer, nullable=False, default=0)
+    adults = db.Column(db.Integer, nullable=False, default=0)
+    children = db.Column(db.Integer, nullable=False, default=0)
+    revenue_cents = db.Column(db.Integer, nullable=False, default=0)
+    paid_bookings = db.Column(db.Integer, nullable=False, default=0)
+    paid_revenue_cents = db.Column(db.Integer, nullable=False, default=0)
+
+    def to_dict(self):
+        return {
+            'day': self.day.isoformat(),
+            'time_slot': self.time_slot,
+            'bookings': self.bookings,
+            'adults': self.adults,
+            'children': self.children,
+            'revenue_cents': self.revenue_cents,
+            'paid_bookings': self.paid_bookings,
+            'paid_revenue_cents': self.paid_revenue_cents,
+        }
+
+
 class Event(db.Model):
+    __table_args__ = (
+        db.Index('ix_event_active_start_date', 'active', 'start_date'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(150), nullable=False)
     description = db.Column(db.Text, nullable=True)
@@ -210,6 +287,7 @@ class Event(db.Model):
     created_at = db.Column(db.DateTime, nullable=False, default=db.func.now())
 
     def to_dict(self):
+        image_url, image_fallback = image_catalog.resolve('event', self.title)
         return {
             'id': self.id,
             'title': self.title,
@@ -219,11 +297,16 @@ class Event(db.Model):
             'start_time': self.start_time,
             'end_time': self.end_time,
             'active': self.active,
-            'created_at': self.created_at.isoformat() if self.created_at else None
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'image_url': image_url,
+            'image_fallback': image_fallback
         }
 
 
 class NewsItem(db.Model):
+    __table_args__ = (
+        db.Index('ix_news_item_published_date', 'published', 'publish_date', 'created_at'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(150), nullable=False)
     summary = db.Column(db.String(255), nullable=True)
@@ -233,6 +316,7 @@ class NewsItem(db.Model):
     created_at = db.Column(db.DateTime, nullable=False, default=db.func.now())
 
     def to_dict(self):
+        image_url, image_fallback = image_catalog.resolve('news', self.title)
         return {
             'id': self.id,
             'title': self.title,
@@ -240,7 +324,9 @@ class NewsItem(db.Model):
             'body': self.body,
             'published': self.published,
             'publish_date': self.publish_date.isoformat() if self.publish_date else None,
-            'created_at': self.created_at.isoformat() if self.created_at else None
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'image_url': image_url,
+            'image_fallback': image_fallback
         }
 
 
@@ -262,6 +348,9 @@ class PageContent(db.Model):
 
 
 class Feedback(db.Model):
+    __table_args__ = (
+        db.Index('ix_feedback_created_at', 'created_at'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True)
     message = db.Column(db.Text, nullable=False)
@@ -287,6 +376,14 @@ class Feedback(db.Model):
 
 
 class AuditLog(db.Model):
+    __table_args__ = (
+        # filters of /api/audit; the trailing id serves its id DESC keyset order
+        db.Index('ix_audit_log_created_at', 'created_at', 'id'),
+        db.Index('ix_audit_log_user_id', 'user_id', 'id'),
+        db.Index('ix_audit_log_action', 'action', 'id'),
+        db.Index('ix_audit_log_entity', 'entity', 'entity_id', 'id'),
+        db.Index('ix_audit_log_entity_id', 'entity_id', 'id'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True)
     action = db.Column(db.String(80), nullable=False)
@@ -327,6 +424,9 @@ class AnimalAssignment(db.Model):
 
 
 class FavoriteAnimal(db.Model):
+    __table_args__ = (
+        db.Index('ix_favorite_animal_user_animal', 'user_id', 'animal_id'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     animal_id = db.Column(db.Integer, db.ForeignKey('animal.id'), nullable=False)
@@ -342,6 +442,9 @@ class FavoriteAnimal(db.Model):
 
 
 class FavoriteEvent(db.Model):
+    __table_args__ = (
+        db.Index('ix_favorite_event_user_event', 'user_id', 'event_id'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     event_id = db.Column(db.Integer, db.ForeignKey('event.id'), nullable=False)
@@ -358,6 +461,10 @@ class FavoriteEvent(db.Model):
 
 # Appointment scheduling for animals (vet checkups)
 class Appointment(db.Model):
+    __table_args__ = (
+        db.Index('ix_appointment_animal_date', 'animal_id', 'date'),
+        db.Index('ix_appointment_date', 'date'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     animal_id = db.Column(db.Integer, db.ForeignKey('animal.id'), nullable=False)
     veterinarian_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True)
@@ -381,6 +488,10 @@ class Appointment(db.Model):
 
 
 class TreatmentPlan(db.Model):
+    __table_args__ = (
+        db.Index('ix_treatment_plan_animal_created', 'animal_id', 'created_at'),
+        db.Index('ix_treatment_plan_created_at', 'created_at'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     animal_id = db.Column(db.Integer, db.ForeignKey('animal.id'), nullable=False)
     veterinarian_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True)
@@ -404,6 +515,9 @@ class TreatmentPlan(db.Model):
 
 
 class MedicineRequest(db.Model):
+    __table_args__ = (
+        db.Index('ix_medicine_request_created_at', 'created_at'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     animal_id = db.Column(db.Integer, db.ForeignKey('animal.id'), nullable=True)
     veterinarian_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True)
@@ -429,6 +543,9 @@ class MedicineRequest(db.Model):
 
 
 class Alert(db.Model):
+    __table_args__ = (
+        db.Index('ix_alert_created_at', 'created_at'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     animal_id = db.Column(db.Integer, db.ForeignKey('animal.id'), nullable=False)
     veterinarian_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True)
@@ -449,3 +566,49 @@ class Alert(db.Model):
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'resolved_at': self.resolved_at.isoformat() if self.resolved_at else None
         }
+
+
+class AppState(db.Model):
+    """Small key/value store for maintenance bookkeeping (e.g. the last photo relink fingerprint)."""
+    __tablename__ = 'app_state'
+    name = db.Column(db.String(80), primary_key=True)
+    value = db.Column(db.Text, nullable=True)
+    updated_at = db.Column(db.DateTime, nullable=False, default=db.func.now(), onupdate=db.func.now())
+
+
+class TableVersion(db.Model):
+    """Write counter per table (and per ``table@user_id``), kept in the writing transaction by changes.py."""
+    __tablename__ = 'table_versions'
+    name = db.Column(db.String(120), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, nullable=True)
+
+
+class SchemaMigration(db.Model):
+    """Applied schema migrations (see migrations.py)."""
+    __tablename__ = 'schema_migrations'
+    version = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    name = db.Column(db.String(120), nullable=False)
+    applied_at = db.Column(db.DateTime, nullable=False, default=db.func.now())
+    seconds = db.Column(db.Float, nullable=True)
+
+
+def ensure_indexes(bind):
+    """Create any declared secondary index missing from an existing database.
+
+    ``create_all`` only builds indexes together with new tables, so databases
+    created before an index was declared never get it. ``checkfirst`` makes
+    this a no-op once every index exists. Returns the names created.
+    """
+    from sqlalchemy import inspect
+    inspector = inspect(bind)
+    created = []
+    for table in db.metadata.sorted_tables:
+        if not table.indexes or not inspector.has_table(table.name):
+            continue
+        existing = {ix['name'] for ix in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing:
+                index.create(bind, checkfirst=True)
+                created.append(index.name)
+    return created
@@ -0,0 +1,78 @@
+"""Shared pagination for list endpoints.
+
+Two modes share the ``{data, meta}`` response shape:
+
+* page mode (default): ``page`` / ``per_page`` with ``offset``; what the
+  frontend's ``normalizeList`` has always consumed.
+* cursor mode: ``after=<next_cursor>`` continues an ``id DESC`` walk with a
+  ``WHERE id < :last_id`` seek, so deep pages cost the same as the first one.
+
+Both modes add ``next_cursor`` to ``meta`` and honour ``include_total=false``,
+which skips the ``COUNT(*)``: ``total`` is then ``null`` and ``pages`` is
+omitted, in either mode.
+"""
+from __future__ import annotations
+import base64
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(last_id) -> str:
+    return base64.urlsafe_b64encode(f"id:{int(last_id)}".encode('ascii')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token: str) -> int:
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode('ascii')).decode('ascii')
+        prefix, _, value = raw.partition(':')
+        if prefix != 'id':
+            raise ValueError(raw)
+        return int(value)
+    except Exception:
+        raise InvalidCursor(token)
+
+
+def _to_int(val, default):
+    try:
+        return int(val)
+    except Exception:
+        return default
+
+
+def _flag(val, default=True):
+    if val is None:
+        return default
+    return str(val).strip().lower() not in ('0', 'false', 'no', 'off')
+
+
+def paginate(query, id_column, args, default_per_page=20, max_per_page=100):
+    """Apply page or cursor pagination to ``query`` ordered by ``id_column`` DESC.
+
+    ``args`` is a mapping such as ``request.args``. Returns ``(items, meta)``;
+    raises InvalidCursor for a malformed ``after`` token.
+    """
+    per_page = _to_int(args.get('per_page', default_per_page), default_per_page)
+    per_page = min(max(per_page, 1), max_per_page)
+    include_total = _flag(args.get('include_total'))
+    after = args.get('after')
+
+    total = query.count() if include_total else None
+    ordered = query.order_by(id_column.desc())
+    meta = {'per_page': per_page}
+    if after:
+        last_id = decode_cursor(after)
+        rows = ordered.filter(id_column < last_id).limit(per_page + 1).all()
+        meta['after'] = after
+    else:
+        page = max(_to_int(args.get('page', 1), 1), 1)
+        rows = ordered.offset((page - 1) * per_page).limit(per_page + 1).all()
+        meta['page'] = page
+    items = rows[:per_page]
+    meta['total'] = total
+    if total is not None:
+        meta['pages'] = (total + per_page - 1) // per_page
+    meta['next_cursor'] = encode_cursor(items[-1].id) if len(rows) > per_page else None
+    return items, meta
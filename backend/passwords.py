@@ -0,0 +1,159 @@
+"""Bounded password hashing.
+
+werkzeug's password hashes are deliberately slow. Login, registration and
+the admin user endpoints hash inside the request, and the request thread
+waits for the result, so a burst of logins (a school group at the gate)
+used to hold every server thread. ``PasswordHasher`` runs hashing in a
+small thread pool (hashlib's scrypt/pbkdf2 release the GIL, so the workers
+run in parallel) and admits at most ``PASSWORD_HASH_QUEUE`` hashes queued
+or running. That limit is kept below ``SERVER_THREADS``, so at least one
+server thread is always free for requests that do not hash. A request that
+cannot get a slot within ``PASSWORD_HASH_MAX_WAIT`` seconds fails fast with
+``HashingBusy`` (503 + Retry-After) instead of parking its thread.
+
+The method and cost come from ``PASSWORD_HASH_METHOD``. Stored hashes made
+with a different method or cost still verify; ``needs_rehash`` tells login to
+store a fresh hash with the current setting.
+
+Environment:
+  PASSWORD_HASH_METHOD    werkzeug method (default scrypt:32768:8:1; e.g. pbkdf2:sha256:600000)
+  PASSWORD_HASH_WORKERS   hashing threads (default min(4, cpu count)); 0 hashes inline
+  PASSWORD_HASH_QUEUE     hashes admitted at once, queued or running (default half of
+                          SERVER_THREADS; capped at SERVER_THREADS - 1)
+  PASSWORD_HASH_MAX_WAIT  seconds to wait for a slot before HashingBusy (default 0.25)
+  SERVER_THREADS          request threads of the server (default 4, waitress's default;
+                          keep it equal to waitress-serve --threads)
+
+Login throughput per setting:  python -m backend.bench login
+"""
+from __future__ import annotations
+import atexit
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.security import DEFAULT_PBKDF2_ITERATIONS, check_password_hash, generate_password_hash
+
+
+DEFAULT_METHOD = 'scrypt:32768:8:1'
+DEFAULT_SERVER_THREADS = 4  # waitress default
+DEFAULT_MAX_WAIT = 0.25
+
+
+class HashingBusy(RuntimeError):
+    """No hashing slot became free within the configured wait."""
+
+
+def normalize_method(method):
+    """Spell out werkzeug's defaults: 'scrypt' -> 'scrypt:32768:8:1', 'pbkdf2' -> 'pbkdf2:sha256:<iterations>'."""
+    name, *params = (method or DEFAULT_METHOD).split(':')
+    if name == 'scrypt':
+        defaults = ['32768', '8', '1']
+    elif name == 'pbkdf2':
+        defaults = ['sha256', str(DEFAULT_PBKDF2_ITERATIONS)]
+    else:
+        raise ValueError(f"unsupported password hash method: {method}")
+    return ':'.join([name] + params + defaults[len(params):])
+
+
+def _env_int(name, default):
+    try:
+        return int(os.environ.get(name, default))
+    except Exception:
+        return default
+
+
+class PasswordHasher:
+
+    def __init__(self, method=None, workers=None, queue=None, max_wait=None, server_threads=None):
+        self.method = normalize_method(method or os.environ.get('PASSWORD_HASH_METHOD') or DEFAULT_METHOD)
+        if workers is None:
+            workers = _env_int('PASSWORD_HASH_WORKERS', min(4, os.cpu_count() or 1))
+        self.workers = max(workers, 0)
+        if server_threads is None:
+            server_threads = _env_int('SERVER_THREADS', DEFAULT_SERVER_THREADS)
+        self.server_threads = max(server_threads, 2)
+        if queue is None:
+            queue = _env_int('PASSWORD_HASH_QUEUE', self.server_threads // 2)
+        # every admitted hash holds a request thread until it finishes
+        self.queue = min(max(queue, 1), self.server_threads - 1)
+        if max_wait is None:
+            try:
+                max_wait = float(os.environ.get('PASSWORD_HASH_MAX_WAIT', DEFAULT_MAX_WAIT))
+            except Exception:
+                max_wait = DEFAULT_MAX_WAIT
+        self.max_wait = max_wait
+        self._slots = threading.BoundedSemaphore(self.queue)
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.rejected = 0
+        self.rehashed = 0
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='pwhash') if self.workers else None
+        if self._pool:
+            atexit.register(self.shutdown)
+
+    def _run(self, fn, *args):
+        if self._pool is None:
+            return fn(*args)
+        if not self._slots.acquire(timeout=self.max_wait):
+            with self._lock:
+                self.rejected += 1
+            raise HashingBusy('password hashing queue is full')
+        with self._lock:
+            self.in_flight += 1
+        try:
+            return self._pool.submit(fn, *args).result()
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+            self._slots.release()
+
+    def hash(self, password):
+        return self._run(generate_password_hash, password, self.method)
+
+    def verify(self, pwhash, password):
+        if not pwhash:
+            return False
+        return self._run(check_password_hash, pwhash, password)
+
+    def needs_rehash(self, pwhash):
+        """True when ``pwhash`` was made with another method or cost than the configured one."""
+        return bool(pwhash) and pwhash.split('$', 1)[0] != self.method
+
+    def stats(self):
+        return {'method': self.method, 'workers': self.workers, 'queue': self.queue,
+                'server_threads': self.server_threads,
+                'in_flight': self.in_flight, 'rejected': self.rejected, 'rehashed': self.rehashed}
+
+    def shutdown(self, wait=True):
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait)
+
+
+# process-wide hasher used by User.set_password / check_password (set by create_app)
+_hasher = None
+
+
+def install(hasher):
+    global _hasher
+    _hasher = hasher
+
+
+def _current():
+    global _hasher
+    if _hasher is None:
+        # scripts that never call create_app hash inline with the configured method
+        _hasher = PasswordHasher(workers=0)
+    return _hasher
+
+
+def hash_password(password):
+    return _current().hash(password)
+
+
+def verify_password(pwhash, password):
+    return _current().verify(pwhash, password)
+
+
+def needs_rehash(pwhash):
+    return _current().needs_rehash(pwhash)
@@ -0,0 +1,348 @@
+"""Compiled pricing rule index used by compute_price_for.
+
+PricingRule rows are stored with a CSV ``days`` column and ``HH:MM`` strings
+for the time window. Evaluating them row by row means re-parsing those fields
+for every rule on every price lookup. ``PricingIndex`` compiles the rule table
+once into plain tuples (weekday bitmask, minute-of-day window, date range) and
+buckets the rules by date segment so a lookup only visits rules whose date
+range covers the requested date.
+
+The index is rebuilt lazily when the ``pricing_rule`` version in
+``table_versions`` moves: at once after a write committed by this process,
+and within ``PRICING_RECHECK`` seconds after one committed by another worker.
+Each build produces an immutable ``PricingSnapshot`` that replaces the
+previous one in a single assignment.
+
+Environment:
+  PRICING_RECHECK  seconds between table_versions checks (default 5)
+"""
+from __future__ import annotations
+from bisect import bisect_right
+from datetime import datetime, timedelta
+import os
+import threading
+import time
+
+try:
+    from . import changes
+except ImportError:  # python app.py from backend folder
+    import changes
+
+
+ALL_DAYS = 0x7F  # Mon=bit0 .. Sun=bit6
+
+DEFAULT_ADULT_CENTS = 20000  # INR paise (200.00 INR)
+DEFAULT_CHILD_CENTS = 10000  # 100.00 INR
+
+# Visiting slots offered on the booking page; used when a quote omits ``slots``.
+DEFAULT_SLOTS = ('09:00-11:00', '11:00-13:00', '13:00-15:00', '15:00-17:00', '17:00-19:00', '19:00-21:00')
+
+SOURCE_TABLE = 'pricing_rule'
+
+
+def parse_hhmm(value):
+    """Return minutes since midnight for an ``HH:MM`` string (strptime rules)."""
+    t = datetime.strptime(value, '%H:%M').time()
+    return t.hour * 60 + t.minute
+
+
+def slot_start_minute(time_slot):
+    """Minute-of-day of a ``HH:MM-HH:MM`` slot start, or None if unparsable."""
+    try:
+        return parse_hhmm(time_slot.split('-')[0].strip())
+    except Exception:
+        return None
+
+
+def rule_matches_linear(r, date_obj, time_slot):
+    """Reference (uncompiled) evaluation of a single rule.
+
+    This is the original compute_price_for loop body, kept so the compiled
+    index can be verified and benchmarked against it.
+    """
+    ok = True
+    if r.start_date and date_obj < r.start_date:
+        ok = False
+    if r.end_date and date_obj > r.end_date:
+        ok = False
+    # days: CSV of 0-6 where Monday=0
+    if r.days:
+        days = [int(x) for x in r.days.split(',') if x.strip().isdigit()]
+        if date_obj.weekday() not in days:
+            ok = False
+    # time window check
+    if r.start_time or r.end_time:
+        try:
+            ts_parts = time_slot.split('-')
+            start_ts = datetime.strptime(ts_parts[0].strip(), '%H:%M').time()
+            if r.start_time:
+                rule_start = datetime.strptime(r.start_time, '%H:%M').time()
+                if start_ts < rule_start:
+                    ok = False
+            if r.end_time:
+                rule_end = datetime.strptime(r.end_time, '%H:%M').time()
+                if start_ts > rule_end:
+                    ok = False
+        except Exception:
+            pass
+    return ok
+
+
+def select_rule_linear(rules, date_obj, time_slot):
+    """Return the first rule (in the given priority order) that applies."""
+    for r in rules:
+        if rule_matches_linear(r, date_obj, time_slot):
+            return r
+    return None
+
+
+class CompiledRule:
+    """Pre-parsed view of a PricingRule row."""
+
+    __slots__ = ('id', 'order', 'start_date', 'end_date', 'day_mask',
+                 'start_min', 'end_min', 'has_window',
+                 'adult_cents', 'child_cents', 'currency')
+
+    def __init__(self, r, order):
+        self.id = r.id
+        self.order = order
+        self.start_date = r.start_date
+        self.end_date = r.end_date
+        mask = ALL_DAYS
+        if r.days:
+            mask = 0
+            for d in (int(x) for x in r.days.split(',') if x.strip().isdigit()):
+                if 0 <= d <= 6:
+                    mask |= 1 << d
+        self.day_mask = mask
+        # The window is only consulted when the slot start parses. A rule time
+        # that fails to parse stops further window checks, mirroring the
+        # try/except in the linear evaluation.
+        self.has_window = bool(r.start_time or r.end_time)
+        self.start_min = None
+        self.end_min = None
+        start_ok = True
+        if r.start_time:
+            try:
+                self.start_min = parse_hhmm(r.start_time)
+            except Exception:
+                start_ok = False
+        if r.end_time and start_ok:
+            try:
+                self.end_min = parse_hhmm(r.end_time)
+            except Exception:
+                pass
+        self.adult_cents = r.adult_cents
+        self.child_cents = r.child_cents
+        self.currency = r.currency
+
+    def matches_time(self, minute):
+        if minute is None or not self.has_window:
+            return True
+        if self.start_min is not None and minute < self.start_min:
+            return False
+        if self.end_min is not None and minute > self.end_min:
+            return False
+        return True
+
+
+class PricingSnapshot:
+    """Immutable compiled rule set: one ``PricingIndex.build`` result.
+
+    Rule date bounds split the calendar into segments; every segment holds the
+    rules active on all of its dates, already in priority order. A lookup is a
+    bisect to the segment followed by a short scan that stops at the first rule
+    whose weekday bit and time window match.
+
+    A request should take one snapshot (``PricingIndex.ensure()``) and read
+    everything from it, so a concurrent rebuild can never mix two rule sets.
+    """
+
+    __slots__ = ('rules', 'stored', '_bounds', '_segments')
+
+    def __init__(self, rules=(), bounds=(), segments=((),), stored=None):
+        self.rules = rules
+        self.stored = stored  # changes.stored tokens the rules were loaded at
+        self._bounds = bounds
+        self._segments = segments
+
+    @classmethod
+    def compile(cls, rules, stored=None):
+        """Compile ``rules`` (already ordered by priority, highest first)."""
+        compiled = tuple(CompiledRule(r, i) for i, r in enumerate(rules))
+        points = set()
+        for c in compiled:
+            if c.start_date:
+                points.add(c.start_date)
+            if c.end_date:
+                points.add(c.end_date + timedelta(days=1))
+        bounds = tuple(sorted(points))
+        # segment k covers [bounds[k-1], bounds[k]); segment 0 is open-ended below
+        segments = []
+        for k in range(len(bounds) + 1):
+            probe = bounds[k - 1] if k > 0 else None
+            members = []
+            for c in compiled:
+                if probe is None:
+                    if c.start_date:
+                        continue
+                else:
+                    if c.start_date and probe < c.start_date:
+                        continue
+                    if c.end_date and probe > c.end_date:
+                        continue
+                members.append(c)
+            segments.append(tuple(members))
+        return cls(compiled, bounds, tuple(segments), stored)
+
+    def candidates(self, date_obj):
+        return self._segments[bisect_right(self._bounds, date_obj)]
+
+    def select(self, date_obj, time_slot):
+        """Return the CompiledRule applying to a date/slot, or None."""
+        bit = 1 << date_obj.weekday()
+        minute = None
+        parsed = False
+        for c in self.candidates(date_obj):
+            if not c.day_mask & bit:
+                continue
+            if c.has_window:
+                if not parsed:
+                    minute = slot_start_minute(time_slot)
+                    parsed = True
+                if not c.matches_time(minute):
+                    continue
+            return c
+        return None
+
+    def quote_matrix(self, start_date, num_days, slots):
+        """Resolve the applicable rule for every (slot, date) cell at once.
+
+        Each rule's dates are expressed as an integer bitset over the
+        ``num_days`` offsets from ``start_date`` (date range clipped to the
+        window, intersected with precomputed weekday bitsets). Rules are then
+        applied per slot in priority order against the bitset of still
+        unpriced cells, so the work is O(rules x slots) big-int operations
+        rather than one rule scan per cell.
+
+        Returns ``matrix[slot_index][day_offset] -> CompiledRule | None``.
+        """
+        full = (1 << num_days) - 1
+        weekday_bits = [0] * 7
+        first_wd = start_date.weekday()
+        for off in range(num_days):
+            weekday_bits[(first_wd + off) % 7] |= 1 << off
+        end_date = start_date + timedelta(days=num_days - 1)
+        date_masks = {}
+
+        def date_mask(c):
+            # computed on first use: most calendars are fully priced by the
+            # first few rules, so lower-priority rules are never expanded
+            mask = date_masks.get(c.order)
+            if mask is not None:
+                return mask
+            lo = 0
+            hi = num_days - 1
+            if c.start_date and c.start_date > start_date:
+                lo = (c.start_date - start_date).days
+            if c.end_date and c.end_date < end_date:
+                hi = (c.end_date - start_date).days
+            mask = 0
+            if lo <= hi:
+                span = ((1 << (hi - lo + 1)) - 1) << lo
+                if c.day_mask == ALL_DAYS:
+                    mask = span
+                else:
+                    for wd in range(7):
+                        if c.day_mask & (1 << wd):
+                            mask |= weekday_bits[wd]
+                    mask &= span
+            date_masks[c.order] = mask
+            return mask
+
+        matrix = []
+        for slot in slots:
+            minute = slot_start_minute(slot)
+            row = [None] * num_days
+            open_cells = full
+            for c in self.rules:
+                if not c.matches_time(minute):
+                    continue
+                hit = date_mask(c) & open_cells
+                if not hit:
+                    continue
+                open_cells &= ~hit
+                while hit:
+                    low = hit & -hit
+                    row[low.bit_length() - 1] = c
+                    hit ^= low
+                if not open_cells:
+                    break
+            matrix.append(row)
+        return matrix
+
+    def price(self, date_obj, time_slot, num_adults, num_children):
+        c = self.select(date_obj, time_slot)
+        if c is not None:
+            return num_adults * c.adult_cents + num_children * c.child_cents, c.currency
+        return num_adults * DEFAULT_ADULT_CENTS + num_children * DEFAULT_CHILD_CENTS, 'INR'
+
+
+class PricingIndex:
+    """Holds the current ``PricingSnapshot`` and rebuilds it when stale.
+
+    Snapshots are keyed on ``changes.stored('pricing_rule')``. ``ensure()``
+    reads it again when this process has committed a pricing write since the
+    last check (``changes.version``), and otherwise at most every ``recheck``
+    seconds, so rule edits made through other workers are picked up too.
+    ``(snapshot, local, checked)`` is published with a single assignment, so
+    readers never see a half-built index. The stored version is read before
+    the rules are loaded: a write that commits during a build leaves the
+    result stale and the next check rebuilds again.
+    """
+
+    def __init__(self, loader=None, recheck=None):
+        self._loader = loader
+        self._lock = threading.Lock()
+        if recheck is None:
+            try:
+                recheck = float(os.environ.get('PRICING_RECHECK', 5))
+            except Exception:
+                recheck = 5.0
+        self.recheck = recheck
+        self._state = (PricingSnapshot(), None, float('-inf'))
+        self.builds = 0
+
+    def _fresh(self, state, local, now):
+        return state[1] == local and now < state[2] + self.recheck
+
+    def ensure(self):
+        """Return a current snapshot, rebuilding it first if the stored rule version moved."""
+        local = changes.version(SOURCE_TABLE)
+        now = time.monotonic()
+        state = self._state
+        if self._fresh(state, local, now):
+            return state[0]
+        with self._lock:
+            state = self._state
+            local = changes.version(SOURCE_TABLE)
+            if self._fresh(state, local, now):
+                return state[0]
+            stored, _ = changes.stored(SOURCE_TABLE)
+            snapshot = state[0]
+            if stored != snapshot.stored:
+                snapshot = PricingSnapshot.compile(self._loader(), stored)
+                self.builds += 1
+            self._state = (snapshot, local, now)
+        return snapshot
+
+    def build(self, rules):
+        """Compile ``rules`` into a new snapshot, publish it and return it.
+
+        The snapshot is not tied to a stored version, so the next ``ensure()``
+        reloads the rules from the database.
+        """
+        snapshot = PricingSnapshot.compile(rules)
+        self._state = (snapshot, None, float('-inf'))
+        self.builds += 1
+        return snapshot
@@ -0,0 +1,100 @@
+"""Booking QR rendering off the request thread.
+
+qrcode + Pillow PNG encoding is CPU bound and used to run inside
+create_booking between two commits. ``QRRenderer`` hands the work to a small
+thread pool: the booking is committed once, the id is queued, and a worker
+renders the PNG and stores the raw bytes in ``Booking.qr_png`` with its own
+short UPDATE. ``png_for`` serves /api/bookings/<id>/qr.png and renders on
+demand, without storing, when the background job has not landed yet.
+
+Environment:
+  QR_WORKERS  number of worker threads (default 2). 0 renders inline, which
+              is handy for scripts and deterministic tests.
+"""
+from __future__ import annotations
+import atexit
+import base64
+import io
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import qrcode
+
+try:
+    from .models import db, Booking
+except ImportError:  # python app.py from backend folder
+    from models import db, Booking
+
+
+def booking_qr_text(booking_id) -> str:
+    return f"booking:{booking_id}"
+
+
+def render_qr_png(text: str) -> bytes:
+    img = qrcode.make(text)
+    buf = io.BytesIO()
+    # PIL accepts a positional format argument; use positional to avoid static analyzer issues
+    img.save(buf, 'PNG')
+    return buf.getvalue()
+
+
+def qr_etag(booking_id) -> str:
+    # the image is a pure function of the booking id, so the id versions it
+    return f"qr-{booking_id}-v1"
+
+
+class QRRenderer:
+    """Renders booking QR codes in a background pool and stores them."""
+
+    def __init__(self, app, workers=None):
+        self.app = app
+        if workers is None:
+            try:
+                workers = int(os.environ.get('QR_WORKERS', 2))
+            except Exception:
+                workers = 2
+        self.workers = max(workers, 0)
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='qr') if self.workers else None
+        if self._pool:
+            atexit.register(self.shutdown)
+
+    def submit(self, booking_id):
+        """Queue a booking for rendering; returns a Future (None when inline)."""
+        if self._pool is None:
+            self.render_and_store(booking_id)
+            return None
+        return self._pool.submit(self._run, booking_id)
+
+    def _run(self, booking_id):
+        with self.app.app_context():
+            try:
+                self.render_and_store(booking_id)
+            except Exception as e:
+                db.session.rollback()
+                print(f"[qr_warning] render failed for booking {booking_id}: {e}", flush=True)
+
+    def render_and_store(self, booking_id):
+        png = render_qr_png(booking_qr_text(booking_id))
+        # only fill rows still missing a QR so an on-demand render is never overwritten
+        (Booking.query
+            .filter(Booking.id == booking_id, Booking.qr_png.is_(None))
+            .update({Booking.qr_png: png}, synchronize_session=False))
+        db.session.commit()
+        return png
+
+    def png_for(self, booking_id, png, legacy_b64):
+        """Return PNG bytes for a booking from its stored QR columns.
+
+        Rows written before qr_png existed are decoded from their legacy
+        base64 value; rows whose background job has not run yet are rendered
+        now but not stored, so a GET never writes (the queued job does).
+        """
+        if png:
+            return png
+        if legacy_b64:
+            return base64.b64decode(legacy_b64)
+        return render_qr_png(booking_qr_text(booking_id))
+
+    def shutdown(self, wait=True):
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait)
@@ -0,0 +1,129 @@
+"""Link Animal.photo_url to image files that actually exist.
+
+One service used at startup and by ``POST /api/admin/animals/relink``. File
+lookups go through the cached ``ImageCatalog`` (slug match, case-insensitive,
+the served frontend's ``images/animals`` then ``uploads/animals``), so
+relinking never touches the disk per animal. Rows are read ``(id, name, photo_url)`` only, in
+primary-key batches of ``PHOTO_RELINK_BATCH``, and each batch commits its own
+updates.
+
+After a run the service stores a fingerprint of the animal image folders
+(their mtimes) and of the animal table (row count, max id, name/photo_url
+lengths) in ``app_state``; the startup run is skipped when neither changed.
+
+Environment:
+  PHOTO_RELINK        background (default) | sync | off - how the startup run happens
+  PHOTO_RELINK_BATCH  rows per batch (default 500)
+"""
+from __future__ import annotations
+import hashlib
+import os
+import threading
+import time
+
+from sqlalchemy import text
+
+try:
+    from .bootstrap import read_state, write_state
+    from . import changes
+except ImportError:  # python app.py from backend folder
+    from bootstrap import read_state, write_state
+    import changes
+
+
+STATE_KEY = 'photo_relink'
+DEFAULT_BATCH = 500
+MODES = ('background', 'sync', 'off')
+
+
+class PhotoRelinker:
+
+    def __init__(self, app, db, catalog, batch_size=None, on_change=None):
+        self.app = app
+        self.db = db
+        self.catalog = catalog
+        if batch_size is None:
+            try:
+                batch_size = int(os.environ.get('PHOTO_RELINK_BATCH', DEFAULT_BATCH))
+            except Exception:
+                batch_size = DEFAULT_BATCH
+        self.batch_size = max(batch_size, 1)
+        self.on_change = on_change
+        self._lock = threading.Lock()
+        self.thread = None
+        self.last = None
+
+    # -- fingerprint -------------------------------------------------------
+    def fingerprint(self):
+        row = self.db.session.execute(text(
+            "SELECT COUNT(*), COALESCE(MAX(id), 0), "
+            "COALESCE(SUM(LENGTH(name) + COALESCE(LENGTH(photo_url), 0)), 0) FROM animal"
+        )).fetchone()
+        parts = [str(v) for v in row] + [str(s) for s in self.catalog.stamps('animal')]
+        return hashlib.sha1('|'.join(parts).encode('utf-8')).hexdigest()[:20]
+
+    # -- relinking ---------------------------------------------------------
+    def run(self, force=False):
+        """Relink every animal whose photo_url does not point at a known file.
+
+        Returns {'scanned', 'updated', 'skipped', 'seconds'}; with ``force=False``
+        the run is skipped when the stored fingerprint still matches.
+        """
+        t0 = time.perf_counter()
+        with self._lock:
+            self.catalog.ensure()
+            if not force and read_state(self.db.session, (STATE_KEY,)).get(STATE_KEY) == self.fingerprint():
+                self.last = {'scanned': 0, 'updated': 0, 'skipped': True, 'seconds': round(time.perf_counter() - t0, 4)}
+                return self.last
+            scanned = updated = 0
+            last_id = 0
+            while True:
+                rows = self.db.session.execute(text(
+                    "SELECT id, name, photo_url FROM animal WHERE id > :last ORDER BY id LIMIT :n"
+                ), {'last': last_id, 'n': self.batch_size}).fetchall()
+                if not rows:
+                    break
+                last_id = rows[-1][0]
+                scanned += len(rows)
+                batch = []
+                for animal_id, name, photo_url in rows:
+                    if photo_url and self.catalog.contains('animal', photo_url):
+                        continue
+                    url = self.catalog.lookup('animal', name)
+                    if url and url != photo_url:
+                        batch.append({'id': animal_id, 'url': url})
+                if batch:
+                    self.db.session.execute(text("UPDATE animal SET photo_url = :url WHERE id = :id"), batch)
+                    # raw UPDATEs bypass the ORM hooks: record the write in the same transaction
+                    changes.mark(self.db.session, 'animal')
+                    self.db.session.commit()
+                    updated += len(batch)
+                else:
+                    self.db.session.rollback()
+            if updated and self.on_change:
+                self.on_change()
+            write_state(self.db.session, {STATE_KEY: self.fingerprint()})
+            self.last = {'scanned': scanned, 'updated': updated, 'skipped': False,
+                         'seconds': round(time.perf_counter() - t0, 4)}
+            return self.last
+
+    def _run_in_context(self):
+        with self.app.app_context():
+            try:
+                result = self.run()
+                if result['updated']:
+                    print(f"[startup] Linked/updated photo_url for {result['updated']} animals", flush=True)
+            except Exception as e:
+                self.db.session.rollback()
+                print(f"[startup_warning] failed photo relink: {e}", flush=True)
+
+    def start(self, mode='background'):
+        """Startup hook: run inline, in a daemon thread, or not at all."""
+        if mode == 'off':
+            return None
+        if mode == 'sync':
+            self._run_in_context()
+            return None
+        self.thread = threading.Thread(target=self._run_in_context, name='photo-relink', daemon=True)
+        self.thread.start()
+        return self.thread
@@ -0,0 +1,115 @@
+"""In-process cache for public read endpoints.
+
+Serialized responses of the home-page endpoints (events, news, pages,
+animals) are kept in a bounded LRU keyed by path + query string. Each entry
+remembers the ``changes.version`` tuple of the tables it was built from, so
+any committed create/update/delete on those tables invalidates exactly the
+entries that depend on them; a TTL bounds staleness for date-relative
+queries ("upcoming events") and writes made by other processes.
+
+Environment:
+  RESPONSE_CACHE_SIZE  max entries (default 512, 0 disables the cache)
+  RESPONSE_CACHE_TTL   seconds (default 60)
+"""
+from __future__ import annotations
+from collections import OrderedDict
+from functools import wraps
+import os
+import threading
+import time
+
+from flask import request
+
+try:
+    from . import changes
+except ImportError:  # python app.py from backend folder
+    import changes
+
+
+class ResponseCache:
+    """LRU + TTL store of (status, mimetype, body) per request key."""
+
+    def __init__(self, app, max_entries=None, ttl=None):
+        self.app = app
+        if max_entries is None:
+            try:
+                max_entries = int(os.environ.get('RESPONSE_CACHE_SIZE', 512))
+            except Exception:
+                max_entries = 512
+        if ttl is None:
+            try:
+                ttl = float(os.environ.get('RESPONSE_CACHE_TTL', 60))
+            except Exception:
+                ttl = 60.0
+        self.max_entries = max(max_entries, 0)
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def request_key():
+        args = sorted(request.args.items(multi=True))
+        return request.path + ('?' + '&'.join(f"{k}={v}" for k, v in args) if args else '')
+
+    def get(self, key, versions):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != versions or entry[1] < now:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+
+    def put(self, key, versions, payload):
+        with self._lock:
+            self._entries[key] = (versions, time.monotonic() + self.ttl, payload)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / total, 3) if total else None,
+            }
+
+    def cached(self, *tables, anonymous_only=False):
+        """Cache a GET view's 200 responses, invalidated by writes to ``tables``."""
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                if not self.max_entries or (anonymous_only and request.headers.get('Authorization')):
+                    return view(*args, **kwargs)
+                key = self.request_key()
+                # read the versions before running the view so a concurrent write
+                # leaves the stored entry stale rather than wrongly fresh
+                versions = changes.version(*tables)
+                payload = self.get(key, versions)
+                if payload is not None:
+                    status, mimetype, body = payload
+                    resp = self.app.response_class(body, status=status, mimetype=mimetype)
+                    resp.headers['X-Cache'] = 'HIT'
+                    return resp
+                resp = self.app.make_response(view(*args, **kwargs))
+                if resp.status_code == 200 and not resp.direct_passthrough:
+                    self.put(key, versions, (resp.status_code, resp.mimetype, resp.get_data()))
+                    resp.headers['X-Cache'] = 'MISS'
+                return resp
+            return wrapper
+        return decorator
@@ -0,0 +1,345 @@
+"""Daily revenue and attendance rollups.
+
+``analytics_overview`` and ``ticket_sales_summary`` used to ``SUM``/``COUNT``
+every ``TicketSale`` and ``Booking`` on each dashboard load. Two rollup
+tables hold those totals per day instead:
+
+* ``ticket_sale_daily``: sales, adults, children and revenue per sale day
+  (``created_at``), channel and ticket type;
+* ``booking_daily``: bookings, adults, children, revenue and the paid part of
+  them per visit date and time slot.
+
+``install(db.session)`` hooks ``before_flush``: every new, changed or deleted
+``TicketSale``/``Booking`` in the flush turns into deltas (new values minus
+old ones) that are added to the rollup rows on the same connection, so the
+rollups commit or roll back together with the sale, booking or payment.
+Writes that bypass the ORM unit of work (Core inserts, SQL run by hand) are
+not seen; ``rebuild`` recomputes both tables from history:
+
+  python -m backend.rollups rebuild
+
+``DATABASE_URL`` selects the database (default backend/instance/zoo.db).
+Migration 5 runs the same backfill when it creates the tables.
+
+``timeseries`` serves ``/api/analytics/timeseries``: one grouped query per
+rollup table over a ``day`` range (the leading primary-key column), bucketed
+by day, ISO week (Monday) or month in SQL and zero-filled in Python.
+"""
+from __future__ import annotations
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+import os
+
+from sqlalchemy import Date, cast, event, func, inspect, select
+
+try:
+    from .models import db, Booking, BookingDaily, TicketSale, TicketSaleDaily
+    from . import changes
+except ImportError:  # python app.py from backend folder
+    from models import db, Booking, BookingDaily, TicketSale, TicketSaleDaily
+    import changes
+
+
+SALE_ROLLUP = TicketSaleDaily.__table__
+BOOKING_ROLLUP = BookingDaily.__table__
+_installed = set()
+
+
+# -- per-row contributions ---------------------------------------------------
+def _int(value):
+    # attribute values are not coerced before the flush ("2500", 25.0); the rollups hold whole cents
+    return int(value or 0)
+
+
+def _sale_row(get):
+    created = get('created_at')
+    key = (created.date() if isinstance(created, datetime) else created, get('channel') or 'online', get('ticket_type_id'))
+    return key, {'sales': 1, 'adults': _int(get('quantity_adults')), 'children': _int(get('quantity_children')),
+                 'revenue_cents': _int(get('total_cents'))}
+
+
+def _booking_row(get):
+    price = _int(get('price_cents'))
+    paid = bool(get('paid'))
+    return (get('date'), get('time_slot')), {
+        'bookings': 1, 'adults': _int(get('num_adults')), 'children': _int(get('num_children')),
+        'revenue_cents': price, 'paid_bookings': int(paid), 'paid_revenue_cents': price if paid else 0}
+
+
+_SOURCES = {TicketSale: (SALE_ROLLUP, _sale_row), Booking: (BOOKING_ROLLUP, _booking_row)}
+_FIELDS = {
+    TicketSale: ('created_at', 'channel', 'ticket_type_id', 'quantity_adults', 'quantity_children', 'total_cents'),
+    Booking: ('date', 'time_slot', 'num_adults', 'num_children', 'price_cents', 'paid'),
+}
+
+
+def _current(obj):
+    return lambda name: getattr(obj, name)
+
+
+def _previous(obj):
+    state = inspect(obj)
+
+    def get(name):
+        hist = state.attrs[name].history
+        if hist.deleted:
+            return hist.deleted[0]
+        if hist.unchanged:
+            return hist.unchanged[0]
+        return getattr(obj, name)
+    return get
+
+
+def _add(deltas, table, row, sign):
+    key, values = row
+    counter = deltas[table][key]
+    for name, value in values.items():
+        counter[name] += sign * value
+
+
+def collect(session):
+    """Rollup deltas of the pending flush: {table: {key: Counter}}."""
+    deltas = defaultdict(lambda: defaultdict(Counter))
+    for obj in session.new:
+        source = _SOURCES.get(type(obj))
+        if source is None:
+            continue
+        if isinstance(obj, TicketSale) and obj.created_at is None:
+            # the column default is SQL-side; stamp it so the sale day is known now
+            obj.created_at = datetime.utcnow()
+        table, row = source
+        _add(deltas, table, row(_current(obj)), 1)
+    for obj in session.dirty:
+        source = _SOURCES.get(type(obj))
+        if source is None or not session.is_modified(obj, include_collections=False):
+            continue
+        table, row = source
+        _add(deltas, table, row(_previous(obj)), -1)
+        _add(deltas, table, row(_current(obj)), 1)
+    for obj in session.deleted:
+        source = _SOURCES.get(type(obj))
+        if source is None:
+            continue
+        table, row = source
+        _add(deltas, table, row(_previous(obj)), -1)
+    return deltas
+
+
+def apply(conn, deltas):
+    """Add deltas to the rollup rows (UPDATE, or INSERT for a new key)."""
+    touched = set()
+    for table, by_key in deltas.items():
+        keys = [c for c in table.primary_key.columns]
+        for key, counter in by_key.items():
+            values = {name: value for name, value in counter.items() if value}
+            if not values:
+                continue
+            where = [col == value for col, value in zip(keys, key)]
+            updated = conn.execute(table.update().where(*where).values(
+                {name: table.c[name] + value for name, value in values.items()})).rowcount
+            if not updated:
+                row = {col.name: value for col, value in zip(keys, key)}
+                row.update({c.name: 0 for c in table.columns if c.name not in row})
+                row.update(values)
+                conn.execute(table.insert().values(row))
+            touched.add(table.name)
+    return touched
+
+
+def _before_flush(session, flush_context, instances):
+    deltas = collect(session)
+    if deltas:
+        touched = apply(session.connection(), deltas)
+        if touched:
+            changes.mark(session, *touched)
+
+
+def install(session_target):
+    """Attach the before_flush listener to a (scoped) session once."""
+    key = id(session_target)
+    if key in _installed:
+        return
+    event.listen(session_target, 'before_flush', _before_flush)
+    if not _installed:
+        # load the old value when an expired attribute is assigned, so its delta can be taken
+        for model, names in _FIELDS.items():
+            for name in names:
+                event.listen(getattr(model, name), 'set', lambda target, value, old, initiator: value,
+                             active_history=True, retval=True)
+    _installed.add(key)
+
+
+# -- rebuild -------------------------------------------------------------------
+def _has_columns(conn, table, names):
+    insp = inspect(conn)
+    if not insp.has_table(table):
+        return False
+    return set(names) <= {c['name'] for c in insp.get_columns(table)}
+
+
+def rebuild(conn):
+    """Recompute both rollup tables from ``ticket_sale`` and ``booking``; returns row counts.
+
+    Run it in one transaction (``engine.begin()``) so readers never see a
+    half-built table.
+    """
+    counts = {}
+    conn.execute(SALE_ROLLUP.delete())
+    sale = TicketSale.__table__
+    if _has_columns(conn, 'ticket_sale', [c.name for c in sale.columns]):
+        day = func.date(sale.c.created_at)
+        conn.execute(SALE_ROLLUP.insert().from_select(
+            ['day', 'channel', 'ticket_type_id', 'sales', 'adults', 'children', 'revenue_cents'],
+            select(day, sale.c.channel, sale.c.ticket_type_id, func.count(),
+                   func.coalesce(func.sum(sale.c.quantity_adults), 0),
+                   func.coalesce(func.sum(sale.c.quantity_children), 0),
+                   func.coalesce(func.sum(sale.c.total_cents), 0))
+            .group_by(day, sale.c.channel, sale.c.ticket_type_id)))
+    counts[SALE_ROLLUP.name] = conn.execute(select(func.count()).select_from(SALE_ROLLUP)).scalar()
+
+    conn.execute(BOOKING_ROLLUP.delete())
+    booking = Booking.__table__
+    if _has_columns(conn, 'booking', ['date', 'time_slot', 'num_adults', 'num_children', 'price_cents', 'paid']):
+        paid = db.case((booking.c.paid == True, 1), else_=0)  # noqa: E712
+        conn.execute(BOOKING_ROLLUP.insert().from_select(
+            ['day', 'time_slot', 'bookings', 'adults', 'children', 'revenue_cents', 'paid_bookings', 'paid_revenue_cents'],
+            select(booking.c.date, booking.c.time_slot, func.count(),
+                   func.coalesce(func.sum(booking.c.num_adults), 0),
+                   func.coalesce(func.sum(booking.c.num_children), 0),
+                   func.coalesce(func.sum(booking.c.price_cents), 0),
+                   func.coalesce(func.sum(paid), 0),
+                   func.coalesce(func.sum(paid * booking.c.price_cents), 0))
+            .group_by(booking.c.date, booking.c.time_slot)))
+    counts[BOOKING_ROLLUP.name] = conn.execute(select(func.count()).select_from(BOOKING_ROLLUP)).scalar()
+    return counts
+
+
+# -- readers -------------------------------------------------------------------
+def sales_totals(session):
+    """All-time ``(revenue_cents, sales_count)`` of ticket sales."""
+    revenue, count = session.execute(select(
+        func.coalesce(func.sum(SALE_ROLLUP.c.revenue_cents), 0),
+        func.coalesce(func.sum(SALE_ROLLUP.c.sales), 0))).one()
+    return int(revenue), int(count)
+
+
+def paid_booking_revenue(session):
+    return int(session.execute(select(func.coalesce(func.sum(BOOKING_ROLLUP.c.paid_revenue_cents), 0))).scalar())
+
+
+# -- time series ---------------------------------------------------------------
+METRICS = ('revenue', 'bookings', 'visitors', 'ticket_sales')
+GRANULARITIES = ('day', 'week', 'month')
+MAX_BUCKETS = 1000
+
+
+def bucket_start(day, granularity):
+    if granularity == 'week':
+        return day - timedelta(days=day.weekday())
+    if granularity == 'month':
+        return day.replace(day=1)
+    return day
+
+
+def buckets(start, end, granularity):
+    """Start dates of every bucket overlapping ``start``..``end`` (inclusive)."""
+    out = []
+    current = bucket_start(start, granularity)
+    while current <= end:
+        out.append(current)
+        if granularity == 'day':
+            current += timedelta(days=1)
+        elif granularity == 'week':
+            current += timedelta(days=7)
+        else:
+            current = (current.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return out
+
+
+def _bucket_sql(col, granularity, dialect):
+    if granularity == 'day':
+        return col
+    if dialect == 'postgresql':
+        return cast(func.date_trunc(granularity, col), Date)
+    if dialect == 'mysql':
+        return func.subdate(col, func.weekday(col)) if granularity == 'week' else func.date_format(col, '%Y-%m-01')
+    # sqlite: dates are stored as YYYY-MM-DD text; %w is 0 on Sunday
+    if granularity == 'week':
+        return func.date(col, func.printf('-%d days', (func.strftime('%w', col) + 6) % 7))
+    return func.strftime('%Y-%m-01', col)
+
+
+def _grouped(session, table, granularity, start, end, sums, by=None):
+    bucket = _bucket_sql(table.c.day, granularity, session.get_bind().dialect.name)
+    keys = [bucket] + ([table.c[by]] if by else [])
+    query = (select(*keys, *[func.coalesce(func.sum(table.c[name]), 0) for name in sums])
+             .where(table.c.day >= start, table.c.day <= end)
+             .group_by(*keys))
+    return session.execute(query).all()
+
+
+def timeseries(session, metric, start, end, granularity='day'):
+    """``{metric, granularity, from, to, unit, buckets, series}`` with one value per bucket in each series."""
+    labels = [b.isoformat() for b in buckets(start, end, granularity)]
+    index = {label: i for i, label in enumerate(labels)}
+    series = {}
+
+    def put(name, label, value):
+        values = series.setdefault(name, [0] * len(labels))
+        i = index.get(str(label)[:10])
+        if i is not None:
+            values[i] += int(value or 0)
+
+    if metric == 'ticket_sales':
+        for label, channel, sales in _grouped(session, SALE_ROLLUP, granularity, start, end, ['sales'], by='channel'):
+            put(channel, label, sales)
+    elif metric == 'bookings':
+        series = {'bookings': [0] * len(labels), 'paid': [0] * len(labels)}
+        for label, count, paid in _grouped(session, BOOKING_ROLLUP, granularity, start, end, ['bookings', 'paid_bookings']):
+            put('bookings', label, count)
+            put('paid', label, paid)
+    else:
+        if metric == 'revenue':
+            # bookings count once paid, on their visit date
+            sale_sums, booking_sums, names = ['revenue_cents'], ['paid_revenue_cents'], ['ticket_sales', 'bookings', 'total']
+        else:
+            sale_sums = booking_sums = ['adults', 'children']
+            names = ['adults', 'children', 'total']
+        series = {name: [0] * len(labels) for name in names}
+        for source, table, sums in (('ticket_sales', SALE_ROLLUP, sale_sums), ('bookings', BOOKING_ROLLUP, booking_sums)):
+            for label, *values in _grouped(session, table, granularity, start, end, sums):
+                if metric == 'revenue':
+                    put(source, label, values[0])
+                else:
+                    put('adults', label, values[0])
+                    put('children', label, values[1])
+                put('total', label, sum(int(v or 0) for v in values))
+    return {
+        'metric': metric,
+        'granularity': granularity,
+        'from': start.isoformat(),
+        'to': end.isoformat(),
+        'unit': 'cents' if metric == 'revenue' else 'count',
+        'buckets': labels,
+        'series': series,
+    }
+
+
+def main(argv=None):  # pragma: no cover
+    import argparse
+    from sqlalchemy import create_engine
+    parser = argparse.ArgumentParser(description='Zooverse revenue/attendance rollups')
+    parser.add_argument('command', choices=('rebuild',))
+    parser.add_argument('--url', default=os.environ.get('DATABASE_URL'))
+    args = parser.parse_args(argv)
+    url = args.url or 'sqlite:///' + os.path.abspath(os.path.join(os.path.dirname(__file__), 'instance', 'zoo.db'))
+    engine = create_engine(url)
+    SALE_ROLLUP.create(engine, checkfirst=True)
+    BOOKING_ROLLUP.create(engine, checkfirst=True)
+    with engine.begin() as conn:
+        counts = rebuild(conn)
+    print('Rebuilt ' + ', '.join(f"{name}: {n} rows" for name, n in counts.items()))
+
+
+if __name__ == '__main__':  # pragma: no cover
+    main()
@@ -0,0 +1,180 @@
+"""SQLite FTS5 full-text index behind /api/search and /api/animals?q=.
+
+A single contentful FTS5 table ``search_fts`` holds one row per searchable
+record. Its rowid is ``ref_id * 8 + kind code`` so triggers on the source
+tables can replace or drop a document with a rowid lookup; every insert,
+update and delete of an Animal, Event, NewsItem or PageContent row keeps the
+index current inside the same transaction, whatever code path wrote it.
+
+Columns (bm25 weight): title (10), subtitle (4), body (1).
+
+  animal  name / species / description
+  event   title / location / description
+  news    title / summary / body
+  page    title / page_key / body
+
+On databases without FTS5 (or non-SQLite ``DATABASE_URL``s) ``available`` is
+False and callers keep their LIKE queries.
+
+Rebuild from the source tables with:  python -m backend.search --rebuild
+"""
+from __future__ import annotations
+import re
+
+from sqlalchemy import text
+
+
+KINDS = {'animal': 1, 'event': 2, 'news': 3, 'page': 4}
+KIND_NAMES = {v: k for k, v in KINDS.items()}
+
+# (kind, table, title expr, subtitle expr, body expr)
+SOURCES = (
+    ('animal', 'animal', 'name', 'species', 'description'),
+    ('event', 'event', 'title', 'location', 'description'),
+    ('news', 'news_item', 'title', 'summary', 'body'),
+    ('page', 'page_content', 'title', 'page_key', 'body'),
+)
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def _doc_values(prefix, title, subtitle, body):
+    return (f"coalesce({prefix}.{title}, ''), coalesce({prefix}.{subtitle}, ''), "
+            f"coalesce({prefix}.{body}, '')")
+
+
+def match_expression(q):
+    """Turn free text into an FTS5 query: every word must match as a prefix.
+
+    Words are reduced to letters/digits and quoted, so user input can never
+    inject FTS5 operators. Returns None when nothing searchable remains.
+    """
+    tokens = _TOKEN_RE.findall(q or '')
+    if not tokens:
+        return None
+    return ' '.join(f'"{t}"*' for t in tokens[:8])
+
+
+class SearchIndex:
+    """Owns the FTS5 table, its triggers and ranked queries."""
+
+    table = 'search_fts'
+
+    def __init__(self):
+        self.available = False
+
+    def install(self, session):
+        """Create the FTS table and sync triggers if missing (idempotent).
+
+        Populates the index from the source tables the first time it is
+        created. Leaves ``available`` False when FTS5 cannot be used.
+        """
+        bind = session.get_bind()
+        if bind.dialect.name != 'sqlite':
+            self.available = False
+            return False
+        existed = session.execute(text(
+            "SELECT 1 FROM sqlite_master WHERE type='table' AND name=:n"), {'n': self.table}).first() is not None
+        try:
+            session.execute(text(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {self.table} USING fts5("
+                "title, subtitle, body, tokenize='unicode61 remove_diacritics 2', prefix='2 3')"))
+            for stmt in self._trigger_sql():
+                session.execute(text(stmt))
+            if not existed:
+                self._populate(session)
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            print(f"[startup_warning] full-text index unavailable: {e}", flush=True)
+            self.available = False
+            return False
+        self.available = True
+        return True
+
+    def _trigger_sql(self):
+        stmts = []
+        for kind, table, title, subtitle, body in SOURCES:
+            code = KINDS[kind]
+            ins = (f"INSERT INTO {self.table}(rowid, title, subtitle, body) "
+                   f"VALUES (new.id * 8 + {code}, {_doc_values('new', title, subtitle, body)});")
+            dele = f"DELETE FROM {self.table} WHERE rowid = old.id * 8 + {code};"
+            stmts.append(f"CREATE TRIGGER IF NOT EXISTS {self.table}_{table}_ai AFTER INSERT ON {table} BEGIN {ins} END")
+            stmts.append(f"CREATE TRIGGER IF NOT EXISTS {self.table}_{table}_ad AFTER DELETE ON {table} BEGIN {dele} END")
+            stmts.append(f"CREATE TRIGGER IF NOT EXISTS {self.table}_{table}_au AFTER UPDATE ON {table} BEGIN {dele} {ins} END")
+        return stmts
+
+    def _populate(self, session):
+        for kind, table, title, subtitle, body in SOURCES:
+            session.execute(text(
+                f"INSERT INTO {self.table}(rowid, title, subtitle, body) "
+                f"SELECT t.id * 8 + {KINDS[kind]}, {_doc_values('t', title, subtitle, body)} FROM {table} t"))
+
+    def rebuild(self, session):
+        """Drop and repopulate every document; returns the document count."""
+        session.execute(text(f"DELETE FROM {self.table}"))
+        self._populate(session)
+        session.execute(text(f"INSERT INTO {self.table}({self.table}) VALUES ('optimize')"))
+        session.commit()
+        return session.execute(text(f"SELECT count(*) FROM {self.table}")).scalar()
+
+    def search(self, session, q, kinds=None, limit=100):
+        """Ranked matches as dicts: kind, id, rank, snippet (hits wrapped in [ ])."""
+        expr = match_expression(q)
+        if not expr:
+            return []
+        where = ''
+        if kinds:
+            codes = ','.join(str(KINDS[k]) for k in kinds)
+            where = f" AND (rowid % 8) IN ({codes})"
+        rows = session.execute(text(
+            f"SELECT rowid, bm25({self.table}, 10.0, 4.0, 1.0) AS score, "
+            f"snippet({self.table}, -1, '[', ']', '…', 12) "
+            f"FROM {self.table} WHERE {self.table} MATCH :q{where} ORDER BY score LIMIT :limit"),
+            {'q': expr, 'limit': limit}).fetchall()
+        return [{'kind': KIND_NAMES.get(rowid % 8), 'id': rowid // 8, 'rank': score, 'snippet': snip}
+                for rowid, score, snip in rows]
+
+    def search_by_kind(self, session, q, kinds=None, limit=10):
+        """Top ``limit`` matches of each kind: ``{kind: [hit, ...]}``, each list in rank order.
+
+        One ranked query per kind, so a kind with many strong matches cannot
+        push the others out of a shared LIMIT.
+        """
+        return {kind: self.search(session, q, kinds=[kind], limit=limit) for kind in (kinds or KINDS)}
+
+    def animal_id_filter(self, q):
+        """SQL clause restricting an Animal query to full-text matches, or None."""
+        expr = match_expression(q)
+        if not expr:
+            return None
+        return text(
+            f"animal.id IN (SELECT rowid / 8 FROM {self.table} "
+            f"WHERE {self.table} MATCH :fts_q AND rowid % 8 = {KINDS['animal']})").bindparams(fts_q=expr)
+
+
+def main(argv=None):  # pragma: no cover
+    import argparse
+    parser = argparse.ArgumentParser(description='Zooverse full-text search index')
+    parser.add_argument('--rebuild', action='store_true', help='repopulate search_fts from the source tables')
+    args = parser.parse_args(argv)
+    try:
+        from .app import create_app
+        from .models import db
+    except ImportError:
+        from app import create_app
+        from models import db
+    app = create_app()
+    with app.app_context():
+        index = app.extensions['search_index']
+        if not index.available:
+            print('Full-text search is not available on this database.')
+            return
+        if args.rebuild:
+            print(f"Rebuilt search index: {index.rebuild(db.session)} documents")
+        else:
+            parser.print_help()
+
+
+if __name__ == '__main__':  # pragma: no cover
+    main()
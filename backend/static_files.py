@@ -0,0 +1,228 @@
+"""Production delivery of the Vite bundle in ``frontend/dist``.
+
+``StaticManifest`` walks ``dist`` once at startup and keeps, per file, its
+size, mtime, content type, ETag and the compressed variants it can serve, so
+requests never stat the filesystem:
+
+* ``<file>.br`` / ``<file>.gz`` siblings written at build time are served
+  when the client's ``Accept-Encoding`` allows them (``br`` first);
+* compressible text assets without a ``.gz`` sibling are gzipped in memory
+  once, so the large JS bundle never goes out uncompressed;
+* content-hashed files (``assets/index-cddf6089.js``) are sent with
+  ``Cache-Control: public, max-age=31536000, immutable``; ``index.html`` with
+  ``no-cache`` and everything else with a short max-age;
+* SPA fallbacks are answered from an in-memory copy of ``index.html``;
+* identity-encoded files honour ``Range`` / ``If-Range`` (206), so media such
+  as ``Videos/Background1.mp4`` streams instead of downloading up front.
+
+Write .br/.gz siblings after ``npm run build`` with:
+    python -m backend.static_files --compress
+(``.br`` needs the optional ``brotli`` package.)
+"""
+from __future__ import annotations
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+
+from flask import request, send_file
+
+try:
+    import brotli  # optional
+except ImportError:  # pragma: no cover - depends on environment
+    brotli = None
+
+
+HASHED_RE = re.compile(r'[-.][0-9a-fA-F]{8,}\.[A-Za-z0-9]+$')
+COMPRESSIBLE = {'.js', '.mjs', '.css', '.html', '.svg', '.json', '.txt', '.map', '.xml', '.webmanifest'}
+MIN_COMPRESS_BYTES = 1024
+
+IMMUTABLE = 'public, max-age=31536000, immutable'
+SHORT = 'public, max-age=3600'
+
+FRONTEND_DIST = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'frontend', 'dist'))
+FRONTEND_PUBLIC = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'frontend', 'public'))
+
+
+def site_root(dist=None):
+    """Directory behind the site's ``/images/...`` URLs.
+
+    That is the build this module serves. Without a build, the Vite dev
+    server answers those URLs from ``frontend/public``.
+    """
+    dist = dist or FRONTEND_DIST
+    return dist if os.path.isdir(dist) else FRONTEND_PUBLIC
+
+
+class StaticEntry:
+    __slots__ = ('rel', 'path', 'size', 'mtime', 'mimetype', 'etag', 'cache_control', 'variants', 'memory')
+
+    def __init__(self, rel, path, size, mtime, mimetype, etag, cache_control):
+        self.rel = rel
+        self.path = path
+        self.size = size
+        self.mtime = mtime
+        self.mimetype = mimetype
+        self.etag = etag
+        self.cache_control = cache_control
+        self.variants = {}   # encoding -> sibling path on disk
+        self.memory = {}     # encoding -> bytes compressed at startup
+
+
+def accepted_encodings(header):
+    """Encodings the client accepts with q > 0, from an Accept-Encoding value."""
+    out = set()
+    for part in (header or '').split(','):
+        name, _, params = part.strip().partition(';')
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if q > 0:
+            out.add(name)
+    return out
+
+
+class StaticManifest:
+    """In-memory index of a built frontend directory."""
+
+    def __init__(self, root, compress_in_memory=True):
+        self.root = root
+        self.compress_in_memory = compress_in_memory
+        self.entries = {}
+        self.index_html = None
+        self.index_etag = None
+
+    def build(self):
+        entries = {}
+        if os.path.isdir(self.root):
+            for dirpath, _, filenames in os.walk(self.root):
+                names = set(filenames)
+                for name in filenames:
+                    if name.endswith(('.br', '.gz')) and name[:-3] in names:
+                        continue
+                    path = os.path.join(dirpath, name)
+                    rel = os.path.relpath(path, self.root).replace(os.sep, '/')
+                    entry = self._entry(rel, path)
+                    for enc, suffix in (('br', '.br'), ('gzip', '.gz')):
+                        if name + suffix in names:
+                            entry.variants[enc] = path + suffix
+                    entries[rel] = entry
+        self.entries = entries
+        index = entries.get('index.html')
+        if index is not None:
+            with open(index.path, 'rb') as fh:
+                self.index_html = fh.read()
+            self.index_etag = index.etag
+        else:
+            self.index_html = None
+            self.index_etag = None
+        return self
+
+    def _entry(self, rel, path):
+        st = os.stat(path)
+        mimetype = mimetypes.guess_type(rel)[0] or 'application/octet-stream'
+        etag = hashlib.sha1(f"{rel}:{st.st_size}:{st.st_mtime_ns}".encode('utf-8')).hexdigest()[:20]
+        if rel == 'index.html':
+            cache_control = 'no-cache'
+        elif HASHED_RE.search(rel):
+            cache_control = IMMUTABLE
+        else:
+            cache_control = SHORT
+        entry = StaticEntry(rel, path, st.st_size, st.st_mtime, mimetype, etag, cache_control)
+        ext = os.path.splitext(rel)[1].lower()
+        if self.compress_in_memory and ext in COMPRESSIBLE and st.st_size >= MIN_COMPRESS_BYTES \
+                and not os.path.exists(path + '.gz'):
+            with open(path, 'rb') as fh:
+                entry.memory['gzip'] = gzip.compress(fh.read(), compresslevel=9, mtime=0)
+        return entry
+
+    def get(self, rel):
+        return self.entries.get(rel)
+
+    def response(self, app, entry):
+        """Serve ``entry`` with the best encoding the client accepts."""
+        accepted = accepted_encodings(request.headers.get('Accept-Encoding'))
+        encoding = None
+        body = None
+        path = entry.path
+        for enc in ('br', 'gzip'):
+            if enc not in accepted:
+                continue
+            if enc in entry.variants:
+                encoding, path = enc, entry.variants[enc]
+                break
+            if enc in entry.memory:
+                encoding, body = enc, entry.memory[enc]
+                break
+        etag = entry.etag + (f'-{encoding}' if encoding else '')
+        if body is not None:
+            resp = app.response_class(body, mimetype=entry.mimetype)
+        else:
+            resp = send_file(path, mimetype=entry.mimetype, etag=False, conditional=False,
+                             last_modified=entry.mtime, max_age=None)
+        resp.set_etag(etag)
+        resp.last_modified = entry.mtime
+        if encoding:
+            resp.headers['Content-Encoding'] = encoding
+        if entry.variants or entry.memory:
+            resp.vary.add('Accept-Encoding')
+        resp.headers['Cache-Control'] = entry.cache_control
+        if encoding:
+            return resp.make_conditional(request)
+        return resp.make_conditional(request, accept_ranges=True, complete_length=entry.size)
+
+    def index_response(self, app):
+        entry = self.entries.get('index.html')
+        resp = app.response_class(self.index_html, mimetype='text/html')
+        resp.set_etag(self.index_etag)
+        if entry is not None:
+            resp.last_modified = entry.mtime
+        resp.headers['Cache-Control'] = 'no-cache'
+        return resp.make_conditional(request)
+
+
+def precompress(root, levels=(9, 11)):
+    """Write .gz (and .br when brotli is installed) next to compressible files."""
+    written = 0
+    for dirpath, _, filenames in os.walk(root):
+        for name in filenames:
+            if name.endswith(('.br', '.gz')):
+                continue
+            path = os.path.join(dirpath, name)
+            if os.path.splitext(name)[1].lower() not in COMPRESSIBLE or os.path.getsize(path) < MIN_COMPRESS_BYTES:
+                continue
+            with open(path, 'rb') as fh:
+                data = fh.read()
+            with open(path + '.gz', 'wb') as out:
+                out.write(gzip.compress(data, compresslevel=levels[0], mtime=0))
+            written += 1
+            if brotli is not None:
+                with open(path + '.br', 'wb') as out:
+                    out.write(brotli.compress(data, quality=levels[1]))
+                written += 1
+    return written
+
+
+def main(argv=None):  # pragma: no cover
+    import argparse
+    parser = argparse.ArgumentParser(description='Zooverse static bundle helpers')
+    parser.add_argument('--compress', action='store_true', help='write .gz/.br siblings for compressible files')
+    parser.add_argument('--root', default=FRONTEND_DIST)
+    args = parser.parse_args(argv)
+    if args.compress:
+        print(f"Wrote {precompress(args.root)} compressed files under {args.root}"
+              + ('' if brotli else ' (install brotli for .br)'))
+    else:
+        parser.print_help()
+
+
+if __name__ == '__main__':  # pragma: no cover
+    main()
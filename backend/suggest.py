@@ -0,0 +1,191 @@
+"""In-process typeahead index for /api/search/suggest.
+
+Built from animal names, scientific species names, event titles, news titles
+and vet names. Lookups never touch the database:
+
+* prefix matches come from a sorted array of normalized keys (the full label
+  and every word start inside it, so "lion" finds "Asiatic Lion") searched
+  with bisect;
+* when prefixes do not fill the result, a trigram index supplies
+  typo-tolerant candidates ranked by trigram overlap ("tigre" -> "Tiger").
+
+The index rebuilds lazily when ``changes.version`` reports a write to one of
+its source tables in this process. Writes from other processes are picked up
+from the ``table_versions`` rows (``changes.stored``), read at most once per
+``SUGGEST_RECHECK`` seconds.
+
+Environment:
+  SUGGEST_RECHECK  seconds between table_versions checks (default 5)
+"""
+from __future__ import annotations
+from bisect import bisect_left
+from collections import defaultdict
+import os
+import re
+import threading
+import time
+from typing import NamedTuple
+import unicodedata
+
+try:
+    from . import changes
+    from .models import Animal, Event, NewsItem, User
+except ImportError:  # python app.py from backend folder
+    import changes
+    from models import Animal, Event, NewsItem, User
+
+
+SOURCE_TABLES = ('animal', 'event', 'news_item', 'user')
+
+_WORD_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def normalize(s):
+    s = unicodedata.normalize('NFKD', s or '')
+    s = ''.join(ch for ch in s if not unicodedata.combining(ch))
+    return ' '.join(_WORD_RE.findall(s.lower()))
+
+
+def trigrams(s):
+    """Word-padded trigrams, so word starts inside a label weigh like label starts."""
+    out = set()
+    for w in s.split(' '):
+        padded = f"  {w} "
+        out.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return out
+
+
+class _Snapshot(NamedTuple):
+    entries: tuple
+    keys: tuple
+    key_entry: tuple
+    grams: dict
+    stored: tuple     # changes.stored tokens the entries were loaded at
+    local: tuple      # changes.version at the last check
+    checked: float    # monotonic time of the last table_versions read
+
+
+_EMPTY = _Snapshot((), (), (), {}, None, None, float('-inf'))
+
+
+class SuggestIndex:
+    """Sorted-prefix + trigram index over short display labels.
+
+    Everything a lookup reads lives in one ``_Snapshot`` that ``build``
+    replaces with a single assignment, so ``suggest`` never mixes two builds.
+    """
+
+    def __init__(self, loader=None, recheck=None):
+        self._loader = loader
+        self._lock = threading.Lock()
+        if recheck is None:
+            try:
+                recheck = float(os.environ.get('SUGGEST_RECHECK', 5))
+            except Exception:
+                recheck = 5.0
+        self.recheck = recheck
+        self._data = _EMPTY
+
+    @property
+    def entries(self):
+        return self._data.entries
+
+    def _fresh(self, data, local, now):
+        return data.local == local and now < data.checked + self.recheck
+
+    def ensure(self):
+        """Rebuild if this process wrote a source table, or (every ``recheck`` s) another one did."""
+        local = changes.version(*SOURCE_TABLES)
+        now = time.monotonic()
+        if self._fresh(self._data, local, now):
+            return self
+        with self._lock:
+            data = self._data
+            local = changes.version(*SOURCE_TABLES)
+            if self._fresh(data, local, now):
+                return self
+            stored, _ = changes.stored(*SOURCE_TABLES)
+            if stored == data.stored:
+                self._data = data._replace(local=local, checked=now)
+            else:
+                self.build(self._loader(), stored=stored, local=local, checked=now)
+        return self
+
+    def build(self, entries, stored=None, local=None, checked=None):
+        """``entries``: iterable of dicts with at least ``label``, ``kind`` and ``id``."""
+        entries = tuple(e for e in entries if e.get('label'))
+        pairs = []
+        grams = defaultdict(list)
+        for idx, e in enumerate(entries):
+            norm = normalize(e['label'])
+            e['_norm'] = norm
+            words = norm.split(' ')
+            for w in range(len(words)):
+                pairs.append((' '.join(words[w:]), idx))
+            for g in trigrams(norm):
+                grams[g].append(idx)
+        pairs.sort()
+        self._data = _Snapshot(entries, tuple(k for k, _ in pairs), tuple(i for _, i in pairs),
+                               {g: tuple(ids) for g, ids in grams.items()}, stored, local,
+                               time.monotonic() if checked is None else checked)
+        return self
+
+    @staticmethod
+    def _public(data, idx, match):
+        e = data.entries[idx]
+        out = {k: v for k, v in e.items() if not k.startswith('_')}
+        out['match'] = match
+        return out
+
+    def suggest(self, q, limit=8):
+        norm = normalize(q)
+        if not norm:
+            return []
+        data = self._data
+        seen = []
+        seen_set = set()
+        start = bisect_left(data.keys, norm)
+        for pos in range(start, min(start + 200, len(data.keys))):
+            if not data.keys[pos].startswith(norm):
+                break
+            idx = data.key_entry[pos]
+            if idx not in seen_set:
+                seen_set.add(idx)
+                seen.append(idx)
+        # full-label prefix hits first, then shorter labels
+        seen.sort(key=lambda i: (not data.entries[i]['_norm'].startswith(norm), len(data.entries[i]['_norm'])))
+        out = [self._public(data, i, 'prefix') for i in seen[:limit]]
+        if len(out) >= limit or len(norm) < 3:
+            return out
+        qgrams = trigrams(norm)
+        scores = defaultdict(int)
+        for g in qgrams:
+            for idx in data.grams.get(g, ()):
+                scores[idx] += 1
+        fuzzy = []
+        for idx, shared in scores.items():
+            if idx in seen_set:
+                continue
+            # share of the query's trigrams found in the label
+            score = shared / float(len(qgrams))
+            if score >= 0.4:
+                fuzzy.append((-score, len(data.entries[idx]['_norm']), idx))
+        fuzzy.sort()
+        out.extend(self._public(data, idx, 'fuzzy') for _, _, idx in fuzzy[:limit - len(out)])
+        return out
+
+
+def load_entries():
+    """Query the suggestion sources (runs only on rebuild)."""
+    out = []
+    for a_id, name, species in Animal.query.with_entities(Animal.id, Animal.name, Animal.species):
+        out.append({'label': name, 'kind': 'animal', 'id': a_id})
+        if species:
+            out.append({'label': species, 'kind': 'species', 'id': a_id, 'animal': name})
+    for e_id, title in Event.query.filter(Event.active == True).with_entities(Event.id, Event.title):
+        out.append({'label': title, 'kind': 'event', 'id': e_id})
+    for n_id, title in NewsItem.query.filter(NewsItem.published == True).with_entities(NewsItem.id, NewsItem.title):
+        out.append({'label': title, 'kind': 'news', 'id': n_id})
+    for u_id, username, full_name in User.query.filter(User.role == 'vet').with_entities(User.id, User.username, User.full_name):
+        out.append({'label': full_name or username, 'kind': 'doctor', 'id': u_id, 'username': username})
+    return out
@@ -3,7 +3,7 @@ import { Autocomplete, TextField, InputAdornment, Box, CircularProgress } from '
 import SearchIcon from '@mui/icons-material/Search'
 import axios from 'axios'
 
-// Global search hitting backend /api/search combining animals, doctors, events, news
+// Global typeahead backed by /api/search/suggest (in-memory index: animals, species, doctors, events, news)
 let globalSearchCounter = 0
 export default function GlobalSearchBar({ width = 320, onSelect, inputId }){
   const [query, setQuery] = useState('')
@@ -20,17 +20,20 @@ export default function GlobalSearchBar({ width = 320, onSelect, inputId }){
 
   const buildOptions = (data) => {
     const out = []
-    data.animals?.forEach(a=> out.push({ type:'animal', id:a.id, label:a.name }))
-    data.doctors?.forEach(d=> out.push({ type:'doctor', id:d.id, label:`Dr. ${d.username}` }))
-    data.events?.forEach(ev=> out.push({ type:'event', id:ev.id, label:`Event: ${ev.title}` }))
-    data.news?.forEach(n=> out.push({ type:'news', id:n.id, label:`News: ${n.title}` }))
+    data.suggestions?.forEach(s=> {
+      if(s.kind === 'animal') out.push({ type:'animal', id:s.id, label:s.label })
+      else if(s.kind === 'species') out.push({ type:'animal', id:s.id, label:`${s.animal} (${s.label})` })
+      else if(s.kind === 'doctor') out.push({ type:'doctor', id:s.id, label:`Dr. ${s.label}` })
+      else if(s.kind === 'event') out.push({ type:'event', id:s.id, label:`Event: ${s.label}` })
+      else if(s.kind === 'news') out.push({ type:'news', id:s.id, label:`News: ${s.label}` })
+    })
     return out
   }
 
   const runSearch = (q) => {
     if(!q){ setOptions([]); return }
     setLoading(true)
-    axios.get('/api/search', { params:{ q } }).then(r=>{
+    axios.get('/api/search/suggest', { params:{ q } }).then(r=>{
       setOptions(buildOptions(r.data || {}))
     }).catch(()=> setOptions([])).finally(()=> setLoading(false))
   }
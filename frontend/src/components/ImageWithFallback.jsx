@@ -2,7 +2,8 @@ import React, { useState, useMemo } from 'react'
 
 // fit: 'cover' | 'contain'
 // Sequentially attempts srcList items. Automatically appends placeholder SVG if not already included.
-export default function ImageWithFallback({ srcList = [], alt = '', placeholder = 'Image not available', style, fit='contain', aspectRatio='16/10', addPlaceholder=true, noTint=false, ...rest }){
+// srcSet/sizes (resized derivatives of srcList[0]) only apply to the first candidate.
+export default function ImageWithFallback({ srcList = [], alt = '', placeholder = 'Image not available', style, fit='contain', aspectRatio='16/10', addPlaceholder=true, noTint=false, srcSet, sizes, ...rest }){
   const finalList = useMemo(()=>{
     const list = Array.isArray(srcList) ? srcList.filter(Boolean) : []
     if(addPlaceholder){
@@ -40,6 +41,8 @@ export default function ImageWithFallback({ srcList = [], alt = '', placeholder
       {src ? (
         <img
           src={src}
+          srcSet={idx === 0 && srcSet ? srcSet : undefined}
+          sizes={idx === 0 && srcSet ? sizes : undefined}
           alt={alt}
           onError={onError}
           style={{ position: paddingTop !== null ? 'absolute' : 'relative', top:0, left:0, width:'100%', height: paddingTop !== null ? '100%' : 'auto', objectFit:fit, objectPosition:'center', display:'block', transition:'transform .45s ease, filter .45s ease', filter:baseFilter , ...(style||{}) }}
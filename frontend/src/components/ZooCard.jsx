@@ -8,17 +8,19 @@ import ImageWithFallback from './ImageWithFallback'
  *  - subtitle (string) optional (species)
  *  - description (string) short text (will be clamped)
  *  - srcList (string[]) ordered image candidate URLs
+ *  - srcSet (string) optional resized variants of srcList[0]
+ *  - sizes (string) optional sizes hint for srcSet
  *  - onClick (function) optional – invoked when card activated
  *  - adminOverlay (ReactNode) optional – rendered top-right (e.g., Edit button)
  */
-export default function ZooCard({ title, subtitle, description, srcList=[], onClick, adminOverlay }) {
+export default function ZooCard({ title, subtitle, description, srcList=[], srcSet, sizes, onClick, adminOverlay }) {
   return (
     <div className="zoo-card" role={onClick? 'button': undefined} tabIndex={0}
          onClick={onClick}
          onKeyDown={e=>{ if(onClick && (e.key==='Enter' || e.key===' ')){ e.preventDefault(); onClick(); }}}
          aria-label={subtitle? `${title} – ${subtitle}` : title}>
       <div className="zoo-card__media">
-        <ImageWithFallback srcList={srcList} alt={title} aspectRatio='4/5' fit='cover' addPlaceholder={false} />
+        <ImageWithFallback srcList={srcList} srcSet={srcSet} sizes={sizes} alt={title} aspectRatio='4/5' fit='cover' addPlaceholder={false} />
       </div>
       <div className="zoo-card__overlay" aria-hidden="true" />
       <div className="zoo-card__content">
@@ -1,7 +1,7 @@
 import React, { useRef, useEffect, useState } from 'react'
 import { Box, Typography, Card, CardContent, CardMedia } from '@mui/material'
 import ImageWithFallback from '../../components/ImageWithFallback'
-import { titleImageCandidates } from '../../utils/titleImageCandidates'
+import { useResolvedImages, resolvedSrcList } from '../../utils/resolvedImages'
 
 // Placeholder events - to be made dynamic later
 const events = [
@@ -11,7 +11,10 @@ const events = [
   { id:4, title:'Kids Conservation Quiz', date:'2025-02-22', time:'10:00', desc:'Fun learning challenge with prizes.' }
 ]
 
+const eventTitles = events.map(e => e.title)
+
 export default function EventsSection({ autoLoop=true, speed=25, flush=false, forceLoop=false, hoverSlowFactor=0.25 }){ // speed = px/sec
+  const eventImages = useResolvedImages('event', eventTitles)
   const trackRef = useRef(null)
   const containerRef = useRef(null)
   const [isPaused, setPaused] = useState(false)
@@ -87,14 +90,14 @@ export default function EventsSection({ autoLoop=true, speed=25, flush=false, fo
       >
         <Box ref={trackRef} sx={{ display:'flex', gap:2, willChange: loopEnabled ? 'transform' : 'auto', px: flush ? 0 : undefined }}>
           {renderItems.map((ev,i)=>{
-            const imgCandidates = titleImageCandidates(ev.title, 'events', { includeWebp:false })
+            const imgCandidates = resolvedSrcList(eventImages[ev.title])
             return (
               <Card key={i+'-'+ev.id+'-'+ev._dup} role='listitem' tabIndex={0} data-item
                 aria-label={`${ev.title} on ${ev.date} at ${ev.time}`}
                 sx={{minWidth:260, flex:'0 0 auto', display:'flex', flexDirection:'column', outline:'none', '&:focus':{boxShadow:6}}}
               >
                 <CardMedia>
-                  <ImageWithFallback srcList={imgCandidates} alt={ev.title} aspectRatio='16/9' fit='cover' />
+                  <ImageWithFallback srcList={imgCandidates} addPlaceholder={imgCandidates.length > 0} alt={ev.title} aspectRatio='16/9' fit='cover' />
                 </CardMedia>
                 <CardContent sx={{flexGrow:1}}>
                   <Typography variant='caption' color='text.secondary'>{ev.date} • {ev.time}</Typography>
@@ -1,7 +1,7 @@
 import React, { useRef, useEffect, useState } from 'react'
 import { Box, Typography, Card, CardContent, Stack, CardMedia } from '@mui/material'
 import ImageWithFallback from '../../components/ImageWithFallback'
-import { titleImageCandidates } from '../../utils/titleImageCandidates'
+import { useResolvedImages, resolvedSrcList } from '../../utils/resolvedImages'
 
 // Placeholder data - later to be fetched from backend (admin-manageable)
 const newsItems = [
@@ -10,7 +10,10 @@ const newsItems = [
   { id:3, title:'Tiger Health Milestone', date:'2025-01-18', summary:'Routine check shows excellent recovery after enrichment changes.' }
 ]
 
+const newsTitles = newsItems.map(n => n.title)
+
 export default function NewsSection({ autoLoop=true, speed=30, flush=false, forceLoop=false, hoverSlowFactor=0.25 }){ // speed = px/sec
+  const newsImages = useResolvedImages('news', newsTitles)
   const trackRef = useRef(null)
   const containerRef = useRef(null)
   const [isPaused, setPaused] = useState(false)
@@ -88,7 +91,7 @@ export default function NewsSection({ autoLoop=true, speed=30, flush=false, forc
       >
         <Stack ref={trackRef} direction='row' spacing={2} sx={{ willChange: loopEnabled ? 'transform' : 'auto', px: flush ? 0 : 2 }}>
           {renderItems.map((n,i)=>{
-            const imgCandidates = titleImageCandidates(n.title, 'news', { includeWebp:false })
+            const imgCandidates = resolvedSrcList(newsImages[n.title])
             return (
               <Card key={i+'-'+n.id+'-'+n._dup} role='listitem' data-item
                 tabIndex={0}
@@ -96,7 +99,7 @@ export default function NewsSection({ autoLoop=true, speed=30, flush=false, forc
                 sx={{width:280, flex:'0 0 auto', display:'flex', flexDirection:'column', outline:'none', '&:focus':{boxShadow:6}}}
               >
                 <CardMedia>
-                  <ImageWithFallback srcList={imgCandidates} alt={n.title} aspectRatio='16/9' fit='cover' />
+                  <ImageWithFallback srcList={imgCandidates} addPlaceholder={imgCandidates.length > 0} alt={n.title} aspectRatio='16/9' fit='cover' />
                 </CardMedia>
                 <CardContent sx={{flexGrow:1}}>
                   <Typography variant='caption' color='text.secondary'>{n.date}</Typography>
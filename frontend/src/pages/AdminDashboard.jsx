@@ -1,26 +1,62 @@
-import React from 'react'
-import { Box, Typography, Grid, Paper, List, ListItem, ListItemText, Button, Stack } from '@mui/material'
+import React, { useEffect, useState } from 'react'
+import { Box, Typography, Grid, Paper, List, ListItem, ListItemText, Button, Stack, TextField, MenuItem } from '@mui/material'
 import AdminLayout from '../components/admin/AdminLayout'
 import StatCard from '../components/admin/StatCard'
 import AdminSearchBar from '../components/admin/AdminSearchBar'
 import { useNavigate } from 'react-router-dom'
-import { LineChart, Line, XAxis, YAxis, CartesianGrid, Tooltip, ResponsiveContainer } from 'recharts'
+import { LineChart, Line, XAxis, YAxis, CartesianGrid, Tooltip, Legend, ResponsiveContainer } from 'recharts'
+import axios from 'axios'
 
-// Weekly ticket sales supplied by user. Assumption: values map Mon->Sun; when fewer values provided, repeating last known value for remaining days.
-const salesData = [
-  { name: 'Mon', sales: 0 },
-  { name: 'Tue', sales: 150 },
-  { name: 'Wed', sales: 300 },
-  { name: 'Thu', sales: 450 },
-  { name: 'Fri', sales: 600 },
-  { name: 'Sat', sales: 600 },
-  { name: 'Sun', sales: 600 }
+const inrFmt = new Intl.NumberFormat('en-IN', { style: 'currency', currency: 'INR', maximumFractionDigits: 0 })
+
+const METRICS = [
+  { value:'revenue', label:'Revenue' },
+  { value:'ticket_sales', label:'Ticket sales by channel' },
+  { value:'bookings', label:'Bookings' },
+  { value:'visitors', label:'Visitors' }
 ]
+// days covered by each range choice and the bucket size that keeps the chart readable
+const RANGES = [
+  { value:7, label:'Last 7 days', granularity:'day' },
+  { value:30, label:'Last 30 days', granularity:'day' },
+  { value:90, label:'Last 90 days', granularity:'week' },
+  { value:365, label:'Last 12 months', granularity:'day' },
+  { value:730, label:'Last 2 years', granularity:'month' }
+]
+const LINE_COLORS = ['#2e7d32', '#1976d2', '#ef6c00', '#8e24aa']
 
-const inrFmt = new Intl.NumberFormat('en-IN', { style: 'currency', currency: 'INR', maximumFractionDigits: 0 })
+// {buckets, series:{name:[...]}} -> recharts rows [{name: bucket, <series>: value}]; revenue is shown in rupees
+function toRows(ts){
+  if(!ts) return []
+  const scale = ts.unit === 'cents' ? 100 : 1
+  return ts.buckets.map((b, i) => {
+    const row = { name: b }
+    Object.entries(ts.series).forEach(([k, values]) => { row[k] = values[i] / scale })
+    return row
+  })
+}
 
 export default function AdminDashboard(){
   const nav = useNavigate()
+  const [metric, setMetric] = useState('revenue')
+  const [range, setRange] = useState(30)
+  const [granularity, setGranularity] = useState('day')
+  const [series, setSeries] = useState(null)
+
+  useEffect(()=>{
+    const to = new Date()
+    const from = new Date(to.getTime() - (range - 1) * 86400000)
+    const params = { metric, granularity, from: from.toISOString().slice(0,10), to: to.toISOString().slice(0,10) }
+    axios.get('/api/analytics/timeseries', { params, headers:{ Authorization:`Bearer ${localStorage.getItem('token')}` }})
+      .then(r => setSeries(r.data)).catch(()=> setSeries(null))
+  }, [metric, range, granularity])
+
+  const chartRows = toRows(series)
+  const seriesNames = series ? Object.keys(series.series) : []
+  const chooseRange = (value)=>{
+    setRange(value)
+    setGranularity(RANGES.find(r => r.value === value).granularity)
+  }
   const stats = [
     { key:'animals', label:'Animals', icon:'🦁', value:128 },
     { key:'tickets', label:'Tickets Sold (Week)', icon:'🎟️', value:3140 },
@@ -47,14 +83,28 @@ export default function AdminDashboard(){
       <Grid container spacing={2} sx={{mt:1}}>
         <Grid item xs={12} md={8}>
           <Paper sx={{p:2}} className="fadeIn">
-            <Typography variant="h6">Ticket Sales (This week)</Typography>
+            <Stack direction="row" spacing={1} alignItems="center" sx={{mb:1, flexWrap:'wrap'}}>
+              <Typography variant="h6" sx={{flexGrow:1}}>{METRICS.find(m => m.value === metric).label}</Typography>
+              <TextField select size="small" value={metric} onChange={e=>setMetric(e.target.value)}>
+                {METRICS.map(m => <MenuItem key={m.value} value={m.value}>{m.label}</MenuItem>)}
+              </TextField>
+              <TextField select size="small" value={range} onChange={e=>chooseRange(Number(e.target.value))}>
+                {RANGES.map(r => <MenuItem key={r.value} value={r.value}>{r.label}</MenuItem>)}
+              </TextField>
+              <TextField select size="small" value={granularity} onChange={e=>setGranularity(e.target.value)}>
+                {['day','week','month'].map(g => <MenuItem key={g} value={g}>{g}</MenuItem>)}
+              </TextField>
+            </Stack>
             <ResponsiveContainer width="100%" height={250}>
-              <LineChart data={salesData}>
+              <LineChart data={chartRows}>
                 <CartesianGrid strokeDasharray="3 3" />
-                <XAxis dataKey="name" />
+                <XAxis dataKey="name" minTickGap={24} />
                 <YAxis />
                 <Tooltip contentStyle={{background:'rgba(0,0,0,.85)', border:'none', borderRadius:6, color:'#fff'}} />
-                <Line type="monotone" dataKey="sales" stroke="#2e7d32" strokeWidth={3} />
+                <Legend />
+                {seriesNames.map((k, i) => (
+                  <Line key={k} type="monotone" dataKey={k} stroke={LINE_COLORS[i % LINE_COLORS.length]} strokeWidth={k === 'total' ? 3 : 2} dot={chartRows.length <= 31} />
+                ))}
               </LineChart>
             </ResponsiveContainer>
           </Paper>
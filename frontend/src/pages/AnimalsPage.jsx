@@ -1,9 +1,13 @@
 import React, {useEffect, useState} from 'react'
 import { Box, Typography, Grid, Button, TextField, Stack, CircularProgress, Alert } from '@mui/material'
 // ZooCard removed from gallery for reliability; using plain img tiles
-// imageCandidatesForAnimal removed: we now rely solely on the stored photo_url
+// card images come from the server-resolved image_url (see backend/image_catalog.py)
 import axios from 'axios'
 
+// rendered widths of the grid tiles (xs=6 sm=4 md=3 lg=2) and record cards (xs=12 sm=6 md=4 lg=3)
+const GALLERY_SIZES = '(max-width:600px) 50vw, (max-width:900px) 33vw, (max-width:1200px) 25vw, 17vw'
+const CARD_SIZES = '(max-width:600px) 100vw, (max-width:900px) 50vw, (max-width:1200px) 33vw, 25vw'
+
 export default function AnimalsPage(){
   const [animals, setAnimals] = useState([])
   const [gallery, setGallery] = useState([])
@@ -100,7 +104,7 @@ export default function AnimalsPage(){
             <Grid item key={'gallery-'+g.file} xs={6} sm={4} md={3} lg={2}>
               <Box sx={{position:'relative', border:'1px solid var(--color-border)', borderRadius:2, overflow:'hidden', background:'#142b18', cursor:'pointer', '&:hover .hover-name, &:focus-visible .hover-name':{opacity:1, transform:'translateY(0)'}}}>
                 <Box sx={{position:'relative', pt:'125%', overflow:'hidden'}}>
-                  <img src={g.url} alt={shortTitle} style={{position:'absolute', inset:0, width:'100%', height:'100%', objectFit:'cover'}} onError={(e)=>{ e.currentTarget.src='/images/placeholder-banner.svg' }} />
+                  <img src={g.url} srcSet={g.srcset?.webp} sizes={GALLERY_SIZES} loading='lazy' alt={shortTitle} style={{position:'absolute', inset:0, width:'100%', height:'100%', objectFit:'cover'}} onError={(e)=>{ e.currentTarget.removeAttribute('srcset'); e.currentTarget.src='/images/placeholder-banner.svg' }} />
                   <Box className='hover-name' sx={{position:'absolute', left:0, right:0, bottom:0, p:0.75, background:'linear-gradient(180deg,rgba(0,0,0,0) 0%,rgba(0,0,0,.65) 85%)', color:'#e9f5ef', fontSize:12, fontWeight:600, letterSpacing:.4, textShadow:'0 1px 3px rgba(0,0,0,.7)', opacity:0, transform:'translateY(8%)', transition:'opacity .35s ease, transform .35s ease'}}>
                     {shortTitle}
                   </Box>
@@ -118,11 +122,8 @@ export default function AnimalsPage(){
           const priority = name=> (name.toLowerCase()==='tiger'||name.toLowerCase()==='crocodile') ? 0 : 1
           return priority(a.name)-priority(b.name)
         }).map(a=> {
-          // Only use the explicit photo_url (seeded or edited) plus a deterministic placeholder.
-          const imgList = [
-            ...(a.photo_url ? [a.photo_url] : []),
-            `/api/placeholder/animal/${encodeURIComponent(a.name)}.svg`
-          ]
+          // Server-resolved, verified image (or its declared placeholder): one request per card.
+          const imgList = a.image_url && a.image_url !== a.image_fallback ? [a.image_url, a.image_fallback] : [a.image_fallback || `/api/placeholder/animal/${encodeURIComponent(a.name)}.svg`]
           const adminOverlay = (role==='admin' && editingId !== a.id) ? (
             <Button size="small" variant="contained" onClick={()=>{ setEditingId(a.id); setEditDesc(a.description||'') }} sx={{fontSize:'.65rem', lineHeight:1, py:0.5, px:1}}>Edit</Button>
           ) : null
@@ -151,6 +152,8 @@ export default function AnimalsPage(){
                   subtitle={a.species}
                   description={a.description || 'No description yet.'}
                   srcList={imgList}
+                  srcSet={a.photo_srcset?.webp}
+                  sizes={CARD_SIZES}
                   onClick={()=>{ /* future navigation to detail: currently card is static; could nav(`/animals/${a.id}`) */ }}
                   adminOverlay={adminOverlay}
                 />
@@ -1,13 +1,13 @@
-import React from 'react'
+import React, { useEffect, useState } from 'react'
+import axios from 'axios'
 import { Box, Typography, Button, Grid, Card, CardContent, CardMedia, Paper, Stack, Divider } from '@mui/material'
 import Reveal from '../components/Reveal'
 import ImageWithFallback from '../components/ImageWithFallback'
-import { imageCandidatesForAnimal } from '../utils/imageCandidates'
 import { useNavigate } from 'react-router-dom'
 import NewsSection from '../components/home/NewsSection'
 import EventsSection from '../components/home/EventsSection'
 import LiveGlimpsesStrip from '../components/home/LiveGlimpsesStrip'
-import { titleImageCandidates } from '../utils/titleImageCandidates'
+import { useResolvedImages, resolvedSrcList } from '../utils/resolvedImages'
 
 // Temporary featured sample; real list could come from /api/animals?per_page=3
 const demoAnimals = [
@@ -16,15 +16,48 @@ const demoAnimals = [
   { id: 3, name: 'Tiger' }
 ]
 
+const campaigns = [
+  {title:'Monsoon Wetland Walk', desc:'Guided exploration of migratory bird habitats.'},
+  {title:'Big Cat Awareness Week', desc:'Talks on predator ecology & enrichment.'},
+  {title:'Sustainable Safari Initiative', desc:'Promoting low-impact visitor practices.'}
+]
+
+const HERO_VIDEO = 'Background1.mp4'
+
+// Lighter hero rendition on small screens / slow or data-saver connections
+function pickHeroVariant(video){
+  const conn = typeof navigator !== 'undefined' ? navigator.connection : null
+  const slow = conn && (conn.saveData || /(^|-)(2g|3g)$/.test(conn.effectiveType || ''))
+  const width = typeof window !== 'undefined' ? window.innerWidth * (window.devicePixelRatio || 1) : 1280
+  const maxHeight = slow ? 360 : width <= 900 ? 480 : width <= 1600 ? 720 : Infinity
+  const renditions = video.renditions || [] // heaviest first
+  const chosen = maxHeight === Infinity ? null : (renditions.find(r => r.height <= maxHeight) || renditions[renditions.length - 1])
+  return { src: chosen ? chosen.src : video.src, poster: video.poster }
+}
+
 export default function HomePage(){
   const nav = useNavigate()
+  const animalImages = useResolvedImages('animal', demoAnimals.map(a => a.name))
+  const campaignImages = useResolvedImages('campaign', campaigns.map(c => c.title))
+  // src stays unset until the variant is chosen so the full-size file is never fetched first
+  const [hero, setHero] = useState({ src: undefined, poster: null })
+  useEffect(()=>{
+    let alive = true
+    const original = { src: `/Videos/${HERO_VIDEO}`, poster: null }
+    axios.get('/api/media/videos').then(r=>{
+      const video = (r.data?.videos || []).find(v => v.name === HERO_VIDEO)
+      if(alive) setHero(video ? pickHeroVariant(video) : original)
+    }).catch(()=>{ if(alive) setHero(original) })
+    return ()=>{ alive = false }
+  }, [])
   return (
     <Box sx={{py:4}} className="layout-shell">
       {/* Hero Section full-bleed with internal shell */}
   <Box className='full-bleed' sx={{mb:6}}>
     <Box sx={{position:'relative', height:{xs:340, sm:480}, borderRadius:0, overflow:'hidden'}}>
      <Box component='video' className='hero-video'
-       src={'/Videos/Background1.mp4'}
+       src={hero.src}
+       poster={hero.poster || undefined}
              autoPlay
              muted
              loop
@@ -124,7 +157,10 @@ export default function HomePage(){
                 <Card sx={{borderRadius:2, overflow:'hidden', position:'relative', cursor:'pointer', '&:hover .feat-overlay, &:focus-within .feat-overlay':{opacity:1}}}>
                   <CardMedia sx={{position:'relative'}}>
                     <ImageWithFallback
-                      srcList={[...imageCandidatesForAnimal(a.name)]}
+                      srcList={resolvedSrcList(animalImages[a.name])}
+                      srcSet={animalImages[a.name]?.srcset?.webp}
+                      sizes='(max-width:600px) 100vw, 33vw'
+                      addPlaceholder={false}
                       alt={a.name}
                       noTint
                       /* Switched from cover (which cropped) to contain so full image shows */
@@ -162,16 +198,14 @@ export default function HomePage(){
         <Typography variant='h5' gutterBottom>Events & Campaigns</Typography>
         <Typography color='text.secondary' sx={{mb:3}}>Seasonal programs, feeding shows, conservation drives and interactive learning coming soon.</Typography>
   <Grid container spacing={3} component={Reveal} cascade>
-          {[{title:'Monsoon Wetland Walk', desc:'Guided exploration of migratory bird habitats.'},
-            {title:'Big Cat Awareness Week', desc:'Talks on predator ecology & enrichment.'},
-            {title:'Sustainable Safari Initiative', desc:'Promoting low-impact visitor practices.'}].map((c,i)=> {
-              const imgCandidates = titleImageCandidates(c.title, 'campaigns', { includeWebp:false })
+          {campaigns.map((c,i)=> {
+              const imgCandidates = resolvedSrcList(campaignImages[c.title])
               return (
                 <Grid key={i} item xs={12} md={4}>
                   <Paper sx={{overflow:'hidden', height:'100%', display:'flex', flexDirection:'column', justifyContent:'space-between', transition:'0.3s', '&:hover':{boxShadow:5, transform:'translateY(-4px)'}}}>
                     <Box>
                       <Box sx={{position:'relative'}}>
-                        <ImageWithFallback srcList={imgCandidates} alt={c.title} aspectRatio='16/9' fit='cover' />
+                        <ImageWithFallback srcList={imgCandidates} addPlaceholder={imgCandidates.length > 0} alt={c.title} aspectRatio='16/9' fit='cover' />
                       </Box>
                       <Box sx={{p:3, pt:2}}>
                         <Typography variant='h6'>{c.title}</Typography>
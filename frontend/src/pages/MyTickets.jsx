@@ -2,26 +2,47 @@ import React, {useEffect, useState} from 'react'
 import { Box, Typography, Grid, Card, CardContent, Button } from '@mui/material'
 import axios from 'axios'
 import { useNavigate } from 'react-router-dom'
+import { normalizeList } from '../utils/normalize'
 
 export default function MyTickets(){
   const [tickets, setTickets] = useState([])
+  const [qrImages, setQrImages] = useState({})
   const navigate = useNavigate()
 
   useEffect(()=>{
     const token = localStorage.getItem('token')
     const headers = token ? { Authorization: `Bearer ${token}` } : {}
     axios.get('/api/bookings', { headers })
-      .then(r=>setTickets(r.data))
+      .then(r=>setTickets(normalizeList(r.data)))
       .catch(e=>{
         if (e?.response?.status === 401) navigate('/login')
         else console.error(e)
       })
   }, [])
 
+  // qr.png needs the JWT, which only axios sends: fetch each PNG as a blob and show it via an object URL
+  useEffect(()=>{
+    let cancelled = false
+    const urls = {}
+    tickets.filter(b=>b.qr_url).forEach(b=>{
+      axios.get(b.qr_url, { responseType: 'blob' })
+        .then(r=>{
+          if (cancelled) return
+          urls[b.id] = URL.createObjectURL(r.data)
+          setQrImages(prev=>({ ...prev, [b.id]: urls[b.id] }))
+        })
+        .catch(e=>console.error(e))
+    })
+    return ()=>{
+      cancelled = true
+      Object.values(urls).forEach(u=>URL.revokeObjectURL(u))
+    }
+  }, [tickets])
+
   const downloadQR = (b) => {
-    if(!b.qr_code_b64) return
+    if(!qrImages[b.id]) return
     const link = document.createElement('a')
-    link.href = `data:image/png;base64,${b.qr_code_b64}`
+    link.href = qrImages[b.id]
     link.download = `booking-${b.id}.png`
     document.body.appendChild(link)
     link.click()
@@ -39,9 +60,9 @@ export default function MyTickets(){
                 <Typography variant="h6">Booking #{b.id}</Typography>
                 <Typography color="text.secondary">Date: {b.date} • {b.time_slot}</Typography>
                 <Typography>Adults: {b.num_adults} • Children: {b.num_children}</Typography>
-                {b.qr_code_b64 && (
+                {qrImages[b.id] && (
                   <Box sx={{mt:2, textAlign:'center'}}>
-                    <img src={`data:image/png;base64,${b.qr_code_b64}`} alt="qr" style={{maxWidth:'100%'}} />
+                    <img src={qrImages[b.id]} alt="qr" loading="lazy" style={{maxWidth:'100%'}} />
                     <Button variant="outlined" sx={{mt:1}} onClick={()=>downloadQR(b)}>Download QR</Button>
                   </Box>
                 )}
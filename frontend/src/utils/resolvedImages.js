@@ -0,0 +1,25 @@
+import { useEffect, useState } from 'react'
+import axios from 'axios'
+
+// Server-resolved image per title (GET /api/images/resolve): one verified URL plus
+// a declared placeholder, so each card makes exactly one image request.
+// kind: 'animal' | 'event' | 'news' | 'campaign'
+export function useResolvedImages(kind, names){
+  const key = names.join('\u0000')
+  const [images, setImages] = useState({})
+  useEffect(()=>{
+    if(!names.length) return
+    let alive = true
+    axios.get('/api/images/resolve', { params:{ kind, name: names }, paramsSerializer:{ indexes: null } })
+      .then(r=>{ if(alive) setImages(r.data?.images || {}) })
+      .catch(()=>{})
+    return ()=>{ alive = false }
+  }, [kind, key]) // eslint-disable-line react-hooks/exhaustive-deps
+  return images
+}
+
+// srcList for ImageWithFallback: resolved URL then its fallback; empty until resolved
+export function resolvedSrcList(entry){
+  if(!entry) return []
+  return entry.url === entry.fallback ? [entry.url] : [entry.url, entry.fallback]
+}
@@ -0,0 +1,62 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import pytest
+from backend import static_files
+from backend.app import create_app
+
+
+@pytest.fixture
+def make_app(tmp_path, monkeypatch):
+    """Build apps on one SQLite file in ``tmp_path``; keyword arguments set extra environment variables.
+
+    Runs from ``tmp_path`` (uploads land there) with a fixed JWT secret and
+    the startup photo relink off.
+    """
+    monkeypatch.setenv('DATABASE_URL', f"sqlite:///{tmp_path / 'zoo.db'}")
+    monkeypatch.setenv('JWT_SECRET_KEY', 'test-secret')
+    monkeypatch.setenv('PHOTO_RELINK', 'off')
+    monkeypatch.chdir(tmp_path)
+
+    def make(**env):
+        for name, value in env.items():
+            monkeypatch.setenv(name, str(value))
+        return create_app()
+    return make
+
+
+@pytest.fixture
+def app(make_app):
+    return make_app()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def login():
+    """``login(client, username='Admin123', password='zoosys')`` -> Authorization headers."""
+    def login(client, username='Admin123', password='zoosys'):
+        rv = client.post('/api/login', json={'username': username, 'password': password})
+        return {'Authorization': f"Bearer {rv.get_json()['access_token']}"}
+    return login
+
+
+@pytest.fixture
+def admin_headers(client, login):
+    return login(client)
+
+
+@pytest.fixture
+def frontend_dist(tmp_path, monkeypatch):
+    """A small built frontend that create_app serves instead of frontend/dist."""
+    dist = tmp_path / 'dist'
+    (dist / 'assets').mkdir(parents=True)
+    (dist / 'Videos').mkdir()
+    (dist / 'index.html').write_text('<!doctype html><html><body><div id="root"></div></body></html>')
+    (dist / 'assets' / 'index-0123abcd.js').write_text('console.log("zooverse");\n' * 200)
+    (dist / 'Videos' / 'Intro.mp4').write_bytes(bytes(range(256)) * 16)
+    monkeypatch.setattr(static_files, 'FRONTEND_DIST', str(dist))
+    return dist
@@ -0,0 +1,118 @@
+import gzip
+import json
+import threading
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import event
+from backend.models import db, AuditLog
+
+
+def test_buffered_audit_batches_and_flushes(make_app, login):
+    app = make_app(AUDIT_FLUSH_INTERVAL='60')
+    writer = app.extensions['audit_writer']
+    c = app.test_client()
+    headers = login(c)
+    commits = []
+    with app.app_context():
+        event.listen(db.engine, 'commit', lambda conn: commits.append(1))
+    for i in range(5):
+        rv = c.post('/api/events', json={'title': f'Talk {i}', 'start_date': '2025-12-20'}, headers=headers)
+        assert rv.status_code == 201
+    # one commit per admin write; the audit rows are still queued
+    assert len(commits) == 5 and writer.pending() == 5
+    with app.app_context():
+        assert AuditLog.query.count() == 0
+    rv = c.get('/api/audit', headers=headers)
+    entries = rv.get_json()['data']
+    assert [(e['action'], e['entity']) for e in entries][:1] == [('create', 'Event')]
+    assert len(entries) == 5 and writer.flushes == 1 and len(commits) == 6
+    assert all(e['user_id'] == 1 and e['created_at'] for e in entries)
+    c.post('/api/events', json={'title': 'Late', 'start_date': '2025-12-21'}, headers=headers)
+    writer.shutdown()
+    with app.app_context():
+        assert AuditLog.query.count() == 6
+
+
+def test_size_threshold_and_sync_mode(make_app, login):
+    app = make_app(AUDIT_FLUSH_SIZE='3', AUDIT_FLUSH_INTERVAL='60')
+    writer = app.extensions['audit_writer']
+    c = app.test_client()
+    headers = login(c)
+    for i in range(3):
+        c.post('/api/events', json={'title': f'Talk {i}', 'start_date': '2025-12-20'}, headers=headers)
+    for _ in range(100):
+        if writer.written == 3:
+            break
+        time.sleep(0.05)
+    assert writer.written == 3 and writer.flushes == 1 and writer.pending() == 0
+
+    app = make_app(AUDIT_MODE='sync')
+    c = app.test_client()
+    headers = login(c)
+    c.post('/api/events', json={'title': 'Now', 'start_date': '2025-12-20'}, headers=headers)
+    with app.app_context():
+        assert AuditLog.query.count() == 4
+
+
+def test_audit_filters_cursor_and_archive(tmp_path, make_app, login):
+    app = make_app(AUDIT_ARCHIVE_DIR=str(tmp_path / 'archive'))
+    c = app.test_client()
+    headers = login(c)
+    old = datetime.utcnow() - timedelta(days=400)
+    with app.app_context():
+        db.session.add_all([AuditLog(user_id=1, action='delete', entity='Animal', entity_id=i,
+                                     created_at=old + timedelta(minutes=i)) for i in range(1, 8)])
+        db.session.add_all([AuditLog(user_id=2, action='update', entity='Event', entity_id=i) for i in range(1, 4)])
+        db.session.commit()
+    rv = c.get('/api/audit?entity=Animal&per_page=3', headers=headers)
+    body = rv.get_json()
+    assert [e['entity_id'] for e in body['data']] == [7, 6, 5] and body['meta']['total'] is None
+    rv = c.get(f"/api/audit?entity=Animal&per_page=3&after={body['meta']['next_cursor']}", headers=headers)
+    assert [e['entity_id'] for e in rv.get_json()['data']] == [4, 3, 2]
+    assert len(c.get('/api/audit?user_id=2&action=update', headers=headers).get_json()['data']) == 3
+    until = (old + timedelta(minutes=3)).isoformat()
+    assert len(c.get(f'/api/audit?until={until}', headers=headers).get_json()['data']) == 2
+    assert c.get('/api/audit?user_id=x', headers=headers).status_code == 400
+    assert c.get('/api/audit?after=!!', headers=headers).status_code == 400
+
+    assert c.post('/api/admin/audit/archive', json={'days': 0}, headers=headers).status_code == 400
+    with app.app_context():
+        from backend.audit import archive_before
+        result = archive_before(365, str(tmp_path / 'archive'), batch=4)
+    assert result['archived'] == 7 and len(result['files']) == 2
+    with gzip.open(tmp_path / 'archive' / result['files'][0], 'rt') as fh:
+        assert [json.loads(line)['entity_id'] for line in fh] == [1, 2, 3, 4]
+    rv = c.get('/api/audit?entity=Animal', headers=headers)
+    assert rv.get_json()['data'] == []
+    rv = c.post('/api/admin/audit/archive', json={}, headers=headers)
+    assert rv.status_code == 200 and rv.get_json()['archived'] == 0
+
+
+def test_bad_rows_are_dead_lettered_and_threads_end(tmp_path, make_app):
+
+    def writer_threads():
+        return [t for t in threading.enumerate() if t.name == 'audit-writer']
+
+    before = len(writer_threads())
+    for _ in range(3):
+        make_app(AUDIT_FLUSH_INTERVAL='0.01', AUDIT_DEAD_LETTER=str(tmp_path / 'dead.jsonl'))
+    # building apps starts no writer threads
+    assert len(writer_threads()) == before
+    app = make_app()
+    writer = app.extensions['audit_writer']
+    writer.log(1, 'create', 'Event', 1)
+    writer.log(1, None, 'Event', 2)  # action is NOT NULL: poisons every batch it is in
+    writer.log(1, 'delete', 'Event', 3)
+    for _ in range(200):
+        if writer.dead_lettered and len(writer_threads()) == before:
+            break
+        time.sleep(0.02)
+    assert writer.failures == writer.max_attempts and writer.dead_lettered == 1
+    assert writer.written == 2 and writer.pending() == 0
+    with open(tmp_path / 'dead.jsonl') as fh:
+        dead = [json.loads(line) for line in fh]
+    assert [d['entity_id'] for d in dead] == [2] and 'NOT NULL' in dead[0]['error']
+    with app.app_context():
+        assert sorted(e.entity_id for e in AuditLog.query.all()) == [1, 3]
+    # the thread ends once the queue is drained
+    assert len(writer_threads()) == before
@@ -0,0 +1,57 @@
+def test_qr_rendered_in_background(make_app, login):
+    app = make_app(QR_WORKERS='1')
+    c = app.test_client()
+    headers = login(c)
+
+    rv = c.post('/api/bookings', json={'date': '2025-09-10', 'time_slot': '09:00-11:00'}, headers=headers)
+    assert rv.status_code == 201
+    booking = rv.get_json()
+    assert 'qr_code_b64' not in booking and booking['qr_url'] == f"/api/bookings/{booking['id']}/qr.png"
+
+    app.extensions['qr_renderer'].shutdown(wait=True)
+    from backend.models import Booking
+    with app.app_context():
+        assert Booking.query.get(booking['id']).qr_png.startswith(b'\x89PNG')
+
+
+def test_qr_png_endpoint(app, login):
+    # simulate a background job that has not run yet
+    app.extensions['qr_renderer'].submit = lambda booking_id: None
+    c = app.test_client()
+    headers = login(c)
+    rv = c.post('/api/bookings', json={'date': '2025-09-10'}, headers=headers)
+    url = rv.get_json()['qr_url']
+
+    rv = c.get(url, headers=headers)
+    assert rv.status_code == 200 and rv.mimetype == 'image/png'
+    assert rv.data.startswith(b'\x89PNG')
+    assert 'immutable' in rv.headers['Cache-Control'] and 'private' in rv.headers['Cache-Control']
+    etag = rv.headers['ETag']
+    # serving the on-demand render does not write it; the background job does
+    from backend.models import Booking
+    with app.app_context():
+        assert Booking.query.get(int(url.split('/')[3])).qr_png is None
+
+    rv = c.get(url, headers={'If-None-Match': etag, **headers})
+    assert rv.status_code == 304 and not rv.data
+    assert c.get('/api/bookings/999999/qr.png', headers={'If-None-Match': etag, **headers}).status_code == 404
+
+    # a known ETag does not bypass the owner check
+    c.post('/api/register', json={'username': 'other', 'password': 'pw'})
+    token = c.post('/api/login', json={'username': 'other', 'password': 'pw'}).get_json()['access_token']
+    other = {'Authorization': f"Bearer {token}"}
+    assert c.get(url, headers={'If-None-Match': etag, **other}).status_code == 403
+    assert c.get(url, headers={'If-None-Match': etag}).status_code == 401
+
+
+def test_my_tickets_loads_qr_with_the_bearer_header(client, login):
+    # the page lists /api/bookings, then GETs each qr_url with the axios Authorization header
+    client.post('/api/register', json={'username': 'visitor', 'password': 'pw'})
+    headers = login(client, 'visitor', 'pw')
+    rv = client.post('/api/bookings', json={'date': '2025-09-10', 'time_slot': '09:00-11:00'}, headers=headers)
+    assert rv.status_code == 201
+    [ticket] = client.get('/api/bookings', headers=headers).get_json()['data']
+    rv = client.get(ticket['qr_url'], headers=headers)
+    assert rv.status_code == 200 and rv.mimetype == 'image/png' and rv.data.startswith(b'\x89PNG')
+    # what a bare <img src> or download link would send
+    assert client.get(ticket['qr_url']).status_code == 401
@@ -38,7 +38,7 @@ def test_staff_and_booking(tmp_path):
     rv = c.post('/api/bookings', json={'date': '2025-09-10', 'time_slot': '09:00-11:00', 'num_adults': 2, 'num_children': 1}, headers=h2)
     assert rv.status_code == 201
     booking = rv.get_json()
-    assert 'qr_code_b64' in booking
+    assert 'qr_url' in booking
 
     # admin list bookings (paginated)
     rv = c.get('/api/bookings?page=1&per_page=10', headers=headers)
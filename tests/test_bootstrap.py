@@ -0,0 +1,41 @@
+from sqlalchemy import event
+from backend import bootstrap
+from backend.models import db, Animal, User
+
+
+def _record_statements(app):
+    seen = []
+    with app.app_context():
+        event.listen(db.engine, 'before_cursor_execute', lambda *a: seen.append(a[2]))
+    return seen
+
+
+def test_warm_boot_reads_only_the_version_stamps(monkeypatch, make_app):
+    app = make_app()
+    assert app.extensions['boot'] == {'warm': False, 'seeded': 25}
+    assert [name for name, _ in app.extensions['startup_profile'].phases][:4] == ['config', 'images', 'engine', 'version check']
+    with app.app_context():
+        assert Animal.query.count() == 20 and User.query.count() == 2
+
+    statements = []
+    monkeypatch.setattr(bootstrap, 'ensure_schema', lambda *a: statements.append('ensure_schema'))
+    app = make_app()
+    assert app.extensions['boot'] == {'warm': True, 'seeded': 0}
+    assert statements == []
+    assert app.extensions['search_index'].available is True
+    assert 'seed' not in dict(app.extensions['startup_profile'].phases)
+    assert 'total' in app.extensions['startup_profile'].report()
+
+
+def test_seed_change_adds_only_missing_rows(monkeypatch, make_app):
+    make_app()
+    monkeypatch.setattr(bootstrap, 'EXTENDED_ANIMALS', bootstrap.EXTENDED_ANIMALS + (
+        ('Red Panda', 'Ailurus fulgens', 'Tree-dwelling mammal of the eastern Himalayas.', 'Red Panda.jpeg'),))
+    app = make_app()
+    assert app.extensions['boot'] == {'warm': False, 'seeded': 1}
+    seen = _record_statements(app)
+    with app.app_context():
+        assert bootstrap.seed() == 0
+    # one lookup each: seed users, any ticket type, any animal, extended animals by name
+    assert len([q for q in seen if q.lstrip().upper().startswith('SELECT')]) == 4
+    assert make_app(FAST_BOOT='0').extensions['boot'] == {'warm': False, 'seeded': 0}
@@ -0,0 +1,62 @@
+def test_public_etag_and_last_modified(app, login):
+    c = app.test_client()
+    admin = login(c)
+
+    rv = c.get('/api/news')
+    etag = rv.headers['ETag']
+    assert rv.status_code == 200 and rv.headers['Last-Modified']
+    hit = c.get('/api/news', headers={'If-None-Match': etag})
+    assert hit.status_code == 304 and hit.data == b'' and hit.headers['ETag'] == etag
+    assert c.get('/api/news', headers={'If-Modified-Since': rv.headers['Last-Modified']}).status_code == 304
+    # different query string, different validator
+    assert c.get('/api/animals?per_page=3').headers['ETag'] != c.get('/api/animals?per_page=4').headers['ETag']
+
+    c.post('/api/news', json={'title': 'Hatchling', 'published': True}, headers=admin)
+    rv = c.get('/api/news', headers={'If-None-Match': etag})
+    assert rv.status_code == 200 and rv.headers['ETag'] != etag
+    assert 'Last-Modified' not in c.get('/api/events').headers
+
+
+def test_per_user_etags(app, login):
+    c = app.test_client()
+    for name in ('alice', 'bob'):
+        c.post('/api/register', json={'username': name, 'password': 'pw12345', 'email': f'{name}@example.com'})
+    alice = login(c, 'alice', 'pw12345')
+    bob = login(c, 'bob', 'pw12345')
+
+    a = c.get('/api/favorites/animals', headers=alice)
+    b = c.get('/api/favorites/animals', headers=bob)
+    assert a.headers['ETag'] != b.headers['ETag']
+    assert a.headers['Cache-Control'] == 'private, no-cache'
+    # bob's validator is unaffected by alice's write; alice's changes
+    c.post('/api/favorites/animals', json={'animal_id': 1}, headers=alice)
+    assert c.get('/api/favorites/animals', headers={**bob, 'If-None-Match': b.headers['ETag']}).status_code == 304
+    rv = c.get('/api/favorites/animals', headers={**alice, 'If-None-Match': a.headers['ETag']})
+    assert rv.status_code == 200 and len(rv.get_json()) == 1
+    # another user's ETag never matches
+    assert c.get('/api/favorites/animals', headers={**bob, 'If-None-Match': rv.headers['ETag']}).status_code == 200
+
+
+def test_validators_come_from_the_database(make_app):
+    from backend import changes
+    from backend.models import db, Animal
+    app = make_app()
+    c = app.test_client()
+    rv = c.get('/api/animals/1')
+    etag = rv.headers['ETag']
+    # a restarted (or different) worker has no process-local history but agrees on the validator
+    changes._versions.clear()
+    other = make_app().test_client()
+    assert other.get('/api/animals/1', headers={'If-None-Match': etag}).status_code == 304
+    # bulk Query.update bypasses the flush hooks but still changes the stored version
+    with app.app_context():
+        Animal.query.filter_by(id=1).update({'description': 'changed'})
+        db.session.commit()
+    assert other.get('/api/animals/1', headers={'If-None-Match': etag}).status_code == 200
+    # a rolled back write leaves it alone
+    etag = c.get('/api/animals/1').headers['ETag']
+    with app.app_context():
+        db.session.get(Animal, 1).description = 'not kept'
+        db.session.flush()
+        db.session.rollback()
+    assert c.get('/api/animals/1', headers={'If-None-Match': etag}).status_code == 304
@@ -0,0 +1,71 @@
+import threading
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.pool import QueuePool, StaticPool
+from backend.models import db
+from backend.engine_config import engine_options_from_env, install_sqlite_statement_timeout, pool_stats
+
+
+def test_options_from_env():
+    opts, timeout = engine_options_from_env('postgresql://db/zoo', {
+        'DB_POOL_SIZE': '4', 'DB_MAX_OVERFLOW': '2', 'DB_POOL_RECYCLE': '60',
+        'DB_POOL_PRE_PING': '0', 'DB_STATEMENT_TIMEOUT_MS': '1500'})
+    assert opts['poolclass'] is QueuePool
+    assert (opts['pool_size'], opts['max_overflow'], opts['pool_recycle']) == (4, 2, 60)
+    assert opts['pool_pre_ping'] is False and timeout == 1500
+    assert opts['connect_args'] == {'options': '-c statement_timeout=1500'}
+    static, _ = engine_options_from_env('sqlite:///x.db', {'DB_POOL_CLASS': 'static'})
+    assert static['poolclass'] is StaticPool and 'pool_size' not in static
+    memory, _ = engine_options_from_env('sqlite:///:memory:', {})
+    assert 'poolclass' not in memory
+
+
+def test_queue_pool_gauge(make_app, login):
+    app = make_app(DB_POOL_SIZE='3', DB_MAX_OVERFLOW='1')
+    with app.app_context():
+        assert isinstance(db.engine.pool, QueuePool)
+        held = [db.engine.connect() for _ in range(2)]
+        stats = pool_stats(db.engine, max_overflow=1)
+        assert stats['checked_out'] == 2 and stats['capacity'] == 4
+        for c in held:
+            c.close()
+        assert pool_stats(db.engine)['checked_out'] == 0 and 'capacity' not in pool_stats(db.engine)
+    c = app.test_client()
+    assert 'db_pool' not in c.get('/api/health').get_json()
+    assert 'db_pool' not in c.get('/api/health', headers={'Authorization': 'Bearer junk'}).get_json()
+    pool = c.get('/api/health', headers=login(c)).get_json()['db_pool']
+    assert pool['pool'] == 'QueuePool' and pool['capacity'] == 4
+
+
+def test_static_pool_shared_across_threads(make_app):
+    app = make_app(DB_POOL_CLASS='static')
+    errors = []
+
+    def worker():
+        try:
+            with app.app_context():
+                db.session.execute(text('SELECT count(*) FROM animal')).scalar()
+                db.session.remove()
+        except Exception as e:  # pragma: no cover - reported below
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert not errors
+    with app.app_context():
+        assert pool_stats(db.engine)['pool'] == 'StaticPool'
+
+
+def test_sqlite_statement_timeout():
+    engine = create_engine('sqlite://', poolclass=StaticPool)
+    assert install_sqlite_statement_timeout(engine, 50)
+    slow = ("WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n) "
+            "SELECT count(*) FROM n")
+    with engine.connect() as conn:
+        with pytest.raises(OperationalError):
+            conn.exec_driver_sql(slow).scalar()
+        assert conn.exec_driver_sql('SELECT 1').scalar() == 1
@@ -0,0 +1,63 @@
+import os
+from backend.image_catalog import ImageCatalog, slugify
+
+
+def test_slugify_matches_frontend_rule():
+    assert slugify('Vet Q&A Session') == 'vet-q-a-session'
+    assert slugify('  Éléphant  ') == 'elephant'
+
+
+def test_catalog_resolution(tmp_path):
+    animals, uploads, extra = tmp_path / 'animals', tmp_path / 'up', tmp_path / 'extra'
+    for d in (animals, uploads, extra):
+        d.mkdir()
+    for name in ('Tiger.jpg', 'Tiger.png', 'Gaur (Indian Bison).jpeg', 'notes.txt'):
+        (animals / name).write_bytes(b'x')
+    (uploads / 'otter.jpg').write_bytes(b'x')
+    (extra / 'Night Safari Pilot.jpeg').write_bytes(b'x')
+    bumps = []
+    catalog = ImageCatalog({
+        'animal': [(str(animals), '/images/animals'), (str(uploads), '/uploads/animals')],
+        'event': [(str(tmp_path / 'missing'), '/images/events'), (str(extra), '/extra images')],
+    }, on_change=lambda: bumps.append(1)).ensure()
+    assert catalog.resolve('animal', 'tiger') == ('/images/animals/Tiger.jpg', '/api/placeholder/animal/tiger.svg')
+    assert catalog.lookup('animal', 'Gaur') == '/images/animals/Gaur (Indian Bison).jpeg'
+    assert catalog.lookup('animal', 'Otter') == '/uploads/animals/otter.jpg'
+    assert catalog.lookup('event', 'Night Safari Pilot') == '/extra images/Night Safari Pilot.jpeg'
+    assert catalog.resolve('event', 'Unknown')[0] == '/images/placeholder-banner.svg'
+    # a stored photo_url is kept only if the file exists
+    assert catalog.resolve('animal', 'Tiger', '/images/animals/Tiger.png')[0] == '/images/animals/Tiger.png'
+    assert catalog.resolve('animal', 'Tiger', '/images/animals/gone.jpg')[0] == '/images/animals/Tiger.jpg'
+    assert bumps == [1]
+    (uploads / 'lynx.png').write_bytes(b'x')
+    os.utime(uploads, ns=(1, os.stat(uploads).st_mtime_ns + 1))
+    catalog.invalidate()
+    catalog.ensure()
+    assert catalog.lookup('animal', 'lynx') == '/uploads/animals/lynx.png' and bumps == [1, 1]
+
+
+def test_resolved_urls_in_api(app):
+    c = app.test_client()
+    animals = c.get('/api/animals?per_page=100').get_json()['data']
+    by_name = {a['name']: a for a in animals}
+    assert by_name['Tiger']['image_url'].startswith('/images/animals/Tiger')
+    for a in animals:
+        assert a['image_url'] and a['image_fallback'].startswith('/api/placeholder/animal/')
+    rv = c.get('/api/images/resolve', query_string=[('kind', 'event'), ('name', 'Night Safari Pilot'), ('name', 'Nope')])
+    images = rv.get_json()['images']
+    assert images['Night Safari Pilot']['url'] == '/extra images/Night Safari Pilot.jpeg'
+    assert images['Nope']['url'] == images['Nope']['fallback'] == '/images/placeholder-banner.svg'
+    assert c.get('/api/images/resolve?kind=bogus').status_code == 400
+
+
+def test_catalog_checks_the_directory_that_is_served(tmp_path):
+    from backend import static_files
+    from backend.image_catalog import default_folders
+    dist = tmp_path / 'dist'
+    (dist / 'images' / 'animals').mkdir(parents=True)
+    (dist / 'images' / 'animals' / 'Tiger.jpg').write_bytes(b'x')
+    assert static_files.site_root(str(dist)) == str(dist)
+    assert static_files.site_root(str(tmp_path / 'no-build')) == static_files.FRONTEND_PUBLIC
+    catalog = ImageCatalog(default_folders(str(tmp_path / 'uploads'), str(dist))).ensure()
+    assert catalog.lookup('animal', 'tiger') == '/images/animals/Tiger.jpg'
+    assert catalog.lookup('animal', 'leopard') is None
@@ -0,0 +1,115 @@
+import io
+import json
+import os
+from PIL import Image
+from backend.images import DerivativeIndex, GalleryManifest
+
+
+def _jpeg(path, size=(1200, 800)):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    Image.new('RGB', size, (120, 160, 90)).save(path, 'JPEG')
+
+
+def test_derivatives_and_srcset(tmp_path):
+    public, uploads = tmp_path / 'public', tmp_path / 'uploads'
+    _jpeg(public / 'animals' / 'Snow Leopard.jpg')
+    _jpeg(public / 'animals' / 'tiny.jpg', size=(200, 100))
+    index = DerivativeIndex(str(uploads), {'/images/': str(public)}, workers=0).scan()
+    assert index.srcset_for('/images/animals/Snow Leopard.jpg') is None
+    assert index.backfill() == 2
+    srcset = index.srcset_for('/images/animals/Snow Leopard.jpg')
+    assert srcset['webp'] == ('/uploads/derived/images/animals/Snow%20Leopard-320w.webp 320w, '
+                              '/uploads/derived/images/animals/Snow%20Leopard-640w.webp 640w, '
+                              '/uploads/derived/images/animals/Snow%20Leopard-1024w.webp 1024w')
+    assert '-320w.jpg 320w' in srcset['jpeg']
+    with Image.open(uploads / 'derived' / 'images' / 'animals' / 'Snow Leopard-640w.webp') as im:
+        assert im.size == (640, 427)
+    # never upscaled
+    assert index.srcset_for('/images/animals/tiny.jpg') is None
+    # a fresh index finds the outputs with one directory walk
+    again = DerivativeIndex(str(uploads), {'/images/': str(public)}, workers=0).scan()
+    assert again.srcset_for('/images/animals/Snow Leopard.jpg') == srcset
+    assert again.fingerprint() == index.fingerprint()
+
+
+def test_derivatives_written_by_another_process_are_picked_up(tmp_path):
+    public, uploads = tmp_path / 'public', tmp_path / 'uploads'
+    _jpeg(public / 'animals' / 'Okapi.jpg')
+    worker_a = DerivativeIndex(str(uploads), {'/images/': str(public)}, workers=0).scan()
+    worker_b = DerivativeIndex(str(uploads), {'/images/': str(public)}, workers=0).scan()
+    changed = []
+    worker_b.on_change = lambda: changed.append(1)
+    worker_a.submit('/images/animals/Okapi.jpg')
+    assert worker_a.srcset_for('/images/animals/Okapi.jpg')
+    # within the check interval b keeps its last walk; after it, b matches a
+    assert worker_b.ensure().srcset_for('/images/animals/Okapi.jpg') is None
+    worker_b.invalidate()
+    assert worker_b.ensure().srcset_for('/images/animals/Okapi.jpg') == worker_a.srcset_for('/images/animals/Okapi.jpg')
+    assert worker_b.fingerprint() == worker_a.fingerprint() and changed == [1]
+    # a walk that finds nothing new does not notify
+    worker_b.invalidate()
+    worker_b.ensure()
+    assert changed == [1]
+
+
+def test_process_pool_and_upload(tmp_path, monkeypatch, app, login):
+    index = app.extensions['image_index']
+    c = app.test_client()
+    headers = login(c)
+    buf = io.BytesIO()
+    Image.new('RGB', (900, 600), (10, 20, 30)).save(buf, 'JPEG')
+    buf.seek(0)
+    index.workers = 1
+    futures = []
+    orig_submit = index.submit
+    monkeypatch.setattr(index, 'submit', lambda url: futures.append(orig_submit(url)))
+    rv = c.post('/api/upload-image', data={'file': (buf, 'otter.jpg'), 'target': 'animals/otter.jpg'},
+                headers=headers, content_type='multipart/form-data')
+    assert rv.status_code == 200 and rv.get_json()['url'] == '/uploads/animals/otter.jpg'
+    futures[0].result(timeout=60)
+    index.shutdown()
+    assert [w for w in (320, 640) if f'-{w}w.webp' in index.srcset_for('/uploads/animals/otter.jpg')['webp']] == [320, 640]
+    assert os.path.isfile(tmp_path / 'uploads' / 'derived' / 'uploads' / 'animals' / 'otter-320w.jpg')
+
+
+def test_gallery_manifest_refreshes_on_directory_change(tmp_path):
+    gallery_dir = tmp_path / 'animals'
+    _jpeg(gallery_dir / 'b.jpg', size=(300, 200))
+    (gallery_dir / 'notes.txt').write_text('skip me')
+    manifest = GalleryManifest(str(gallery_dir), '/images/animals')
+    body, etag = manifest.ensure()
+    assert (body, etag) == (manifest.body, manifest.etag)
+    first = json.loads(body)
+    assert first['count'] == 1
+    assert first['images'][0] == {'file': 'b.jpg', 'url': '/images/animals/b.jpg', 'width': 300, 'height': 200,
+                                  'bytes': os.path.getsize(gallery_dir / 'b.jpg'), 'srcset': None}
+    manifest.ensure()
+    assert manifest.builds == 1
+    _jpeg(gallery_dir / 'A.jpg', size=(50, 40))
+    os.utime(gallery_dir, ns=(1, os.stat(gallery_dir).st_mtime_ns + 1))
+    manifest.ensure()
+    assert manifest.builds == 2 and manifest.etag != etag
+    assert [i['file'] for i in json.loads(manifest.body)['images']] == ['A.jpg', 'b.jpg']
+    # an invalidate() that lands while a build runs is not lost
+    build = manifest._build
+
+    def build_during_upload(stamp, generation):
+        manifest.invalidate()
+        return build(stamp, generation)
+
+    manifest._build = build_during_upload
+    manifest.invalidate()
+    manifest.ensure()
+    manifest._build = build
+    manifest.ensure()
+    assert manifest.builds == 4
+    manifest.ensure()
+    assert manifest.builds == 4
+
+
+def test_gallery_endpoint_etag(app):
+    c = app.test_client()
+    rv = c.get('/api/animals/gallery')
+    assert rv.status_code == 200 and rv.get_json()['count'] == len(rv.get_json()['images'])
+    assert c.get('/api/animals/gallery', headers={'If-None-Match': rv.headers['ETag']}).status_code == 304
+    assert app.extensions['gallery_manifest'].builds == 1
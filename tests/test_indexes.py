@@ -0,0 +1,46 @@
+from datetime import date
+from sqlalchemy import text
+from backend.models import (db, ensure_indexes, HealthRecord, Appointment, TreatmentPlan, Booking,
+                            FavoriteAnimal, FavoriteEvent, AuditLog, Alert, Event, NewsItem)
+
+
+def _plan(query):
+    compiled = query.statement.compile(dialect=db.engine.dialect)
+    params = tuple(compiled.params[name] for name in compiled.positiontup)
+    rows = db.session.connection().exec_driver_sql('EXPLAIN QUERY PLAN ' + str(compiled), params).fetchall()
+    return ' | '.join(r[-1] for r in rows)
+
+
+def test_hot_queries_use_indexes(app):
+    with app.app_context():
+        hot = {
+            'ix_health_record_animal_date': HealthRecord.query.filter_by(animal_id=1).order_by(HealthRecord.date.desc()),
+            'ix_appointment_animal_date': Appointment.query.filter_by(animal_id=1).order_by(Appointment.date.desc()).limit(200),
+            'ix_appointment_date': Appointment.query.order_by(Appointment.date.desc()).limit(200),
+            'ix_treatment_plan_animal_created': TreatmentPlan.query.filter_by(animal_id=1).order_by(TreatmentPlan.created_at.desc()).limit(200),
+            'ix_booking_user_id': Booking.query.filter_by(user_id=1).order_by(Booking.id.desc()).limit(20),
+            'ix_favorite_animal_user_animal': FavoriteAnimal.query.filter_by(user_id=1, animal_id=2),
+            'ix_favorite_event_user_event': FavoriteEvent.query.filter_by(user_id=1),
+            'ix_audit_log_created_at': AuditLog.query.order_by(AuditLog.created_at.desc()).limit(500),
+            'ix_audit_log_user_id': AuditLog.query.filter_by(user_id=1).order_by(AuditLog.id.desc()).limit(100),
+            'ix_audit_log_action': AuditLog.query.filter_by(action='delete').order_by(AuditLog.id.desc()).limit(100),
+            'ix_audit_log_entity': AuditLog.query.filter_by(entity='Animal', entity_id=3).order_by(AuditLog.id.desc()).limit(100),
+            'ix_audit_log_entity_id': AuditLog.query.filter_by(entity_id=3).order_by(AuditLog.id.desc()).limit(100),
+            'ix_alert_created_at': Alert.query.order_by(Alert.created_at.desc()).limit(200),
+            'ix_event_active_start_date': Event.query.filter(Event.active == True, Event.start_date >= date(2025, 1, 1)).order_by(Event.start_date.asc()).limit(50),
+            'ix_news_item_published_date': NewsItem.query.filter(NewsItem.published == True).order_by(NewsItem.publish_date.desc().nullslast(), NewsItem.created_at.desc()).limit(50),
+        }
+        for name, query in hot.items():
+            plan = _plan(query)
+            assert name in plan, f"{name} not used: {plan}"
+
+
+def test_index_migration_is_idempotent(app):
+    with app.app_context():
+        # simulate a zoo.db created before the indexes were declared
+        for name in ('ix_booking_user_id', 'ix_event_active_start_date', 'ix_audit_log_created_at'):
+            db.session.execute(text(f'DROP INDEX {name}'))
+        db.session.commit()
+        created = ensure_indexes(db.engine)
+        assert sorted(created) == ['ix_audit_log_created_at', 'ix_booking_user_id', 'ix_event_active_start_date']
+        assert ensure_indexes(db.engine) == []
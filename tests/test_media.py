@@ -0,0 +1,70 @@
+import os
+from backend.media import VideoRenditions, ffmpeg_commands, RENDITIONS
+
+
+def test_video_byte_ranges(frontend_dist, app):
+    manifest = app.extensions['static_manifest']
+    video = 'Videos/Intro.mp4'
+    size = manifest.get(video).size
+    c = app.test_client()
+    full = c.get(f'/{video}')
+    assert full.status_code == 200 and full.headers['Accept-Ranges'] == 'bytes'
+    part = c.get(f'/{video}', headers={'Range': 'bytes=0-1023'})
+    assert part.status_code == 206 and len(part.data) == 1024
+    assert part.headers['Content-Range'] == f'bytes 0-1023/{size}'
+    # If-Range with a stale validator falls back to the full body
+    stale = c.get(f'/{video}', headers={'Range': 'bytes=0-1023', 'If-Range': '"stale"'})
+    assert stale.status_code == 200
+    assert c.get(f'/{video}', headers={'If-None-Match': full.headers['ETag']}).status_code == 304
+    assert c.get('/Videos/missing.mp4').status_code == 404
+
+
+def test_rendition_admin_endpoints(app, login):
+    c = app.test_client()
+    headers = login(c)
+    renditions = app.extensions['video_renditions']
+    renditions.ffmpeg = None
+    assert c.post('/api/admin/media/renditions', json={}, headers=headers).status_code == 503
+    renditions.ffmpeg = 'ffmpeg'
+    assert c.post('/api/admin/media/renditions', json={'video': '../app.py'}, headers=headers).status_code == 404
+    videos = c.get('/api/media/videos').get_json()['videos']
+    assert all(v['src'] == f"/Videos/{v['name']}" for v in videos)
+
+
+def test_describe_lists_existing_outputs(tmp_path, monkeypatch):
+    src_dir, out_dir = tmp_path / 'Videos', tmp_path / 'out'
+    src_dir.mkdir()
+    out_dir.mkdir()
+    (src_dir / 'Hero.mp4').write_bytes(b'\0' * 64)
+    r = VideoRenditions(str(src_dir), str(out_dir), ffmpeg='ffmpeg')
+    cmds = ffmpeg_commands('ffmpeg', str(src_dir / 'Hero.mp4'), str(out_dir), 'Hero', 'abcd1234')
+    assert len(cmds) == len(RENDITIONS) + 1
+    (out_dir / os.path.basename(cmds[1][0])).write_bytes(b'x')
+    (out_dir / os.path.basename(cmds[-1][0])).write_bytes(b'x')
+    monkeypatch.setattr('backend.media.source_tag', lambda path: 'abcd1234')
+    info = r.describe('Hero.mp4', '/r')
+    assert [x['height'] for x in info['renditions']] == [RENDITIONS[1][0]]
+    assert info['poster'] == '/r/Hero-abcd1234-poster.jpg'
+
+
+def test_video_listing_is_cached_until_a_job_finishes(tmp_path, monkeypatch):
+    src_dir, out_dir = tmp_path / 'Videos', tmp_path / 'out'
+    src_dir.mkdir()
+    (src_dir / 'Hero.mp4').write_bytes(b'\0' * 64)
+    r = VideoRenditions(str(src_dir), str(out_dir), ffmpeg='ffmpeg')
+    first = r.listing('/r')
+    assert [v['src'] for v in first] == ['/Videos/Hero.mp4'] and first[0]['renditions'] == []
+    stats = []
+    monkeypatch.setattr('backend.media.os.stat', lambda *a, **kw: stats.append(a) or os.lstat(*a, **kw))
+    assert r.listing('/r') is first and stats == [] and r.listing_builds == 1
+
+    def fake_ffmpeg(argv, **kw):
+        with open(argv[-1], 'wb') as fh:
+            fh.write(b'x')
+
+    monkeypatch.setattr('backend.media.subprocess.run', fake_ffmpeg)
+    r.submit('Hero.mp4')
+    r.shutdown()
+    assert r.jobs['Hero.mp4']['status'] == 'done'
+    listed = r.listing('/r')
+    assert r.listing_builds == 2 and len(listed[0]['renditions']) == len(RENDITIONS) and listed[0]['poster']
@@ -0,0 +1,101 @@
+import sqlite3
+import pytest
+from sqlalchemy import create_engine, inspect, text
+from backend import migrations
+
+
+def _legacy_db(path, users=50):
+    con = sqlite3.connect(path)
+    con.executescript("""
+        CREATE TABLE user (id INTEGER PRIMARY KEY, username VARCHAR(80) NOT NULL UNIQUE,
+                           password_hash VARCHAR(128) NOT NULL, role VARCHAR(20) NOT NULL DEFAULT 'customer');
+        CREATE TABLE booking (id INTEGER PRIMARY KEY, user_id INTEGER, date DATE, time_slot VARCHAR(20),
+                              num_adults INTEGER, num_children INTEGER, price_cents INTEGER);
+    """)
+    con.executemany("INSERT INTO user (id, username, password_hash) VALUES (?, ?, 'x')",
+                    [(i, f'user{i}') for i in range(1, users + 1)])
+    con.commit()
+    con.close()
+
+
+def test_upgrade_legacy_database_in_chunks(tmp_path, monkeypatch):
+    path = tmp_path / 'legacy.db'
+    _legacy_db(path)
+    engine = create_engine(f"sqlite:///{path}")
+    assert [m.version for m in migrations.pending(engine)] == [1, 2, 3, 4, 5, 6]
+    writer = sqlite3.connect(path)
+    chunks = []
+
+    def progress(table, copied):
+        chunks.append(copied)
+        if len(chunks) == 1:
+            # another connection writes while the copy runs
+            writer.execute("INSERT INTO user (id, username, password_hash, email) VALUES (51, 'late', 'x', 'late@zoo.test')")
+            writer.execute("UPDATE user SET full_name = 'Changed' WHERE id = 40")
+            writer.execute("UPDATE user SET email = '' WHERE id = 2")
+            writer.execute("DELETE FROM user WHERE id = 3")
+            writer.commit()
+
+    rebuild = migrations.rebuild_table
+    monkeypatch.setattr(migrations, 'rebuild_table', lambda *a, **kw: rebuild(*a, progress=progress, **kw))
+    assert migrations.upgrade(engine, batch=20, log=lambda m: None) == [1, 2, 3, 4, 5, 6]
+    writer.close()
+    assert chunks[:3] == [20, 40, 51]
+    with engine.connect() as conn:
+        assert 'qr_png' in {c['name'] for c in inspect(conn).get_columns('booking')}
+        rows = dict(conn.execute(text("SELECT id, COALESCE(full_name, email, '') FROM user")).fetchall())
+        assert len(rows) == 50 and 3 not in rows
+        assert rows[40] == 'Changed' and rows[51] == 'late@zoo.test' and rows[2] == ''
+        assert conn.execute(text("SELECT email FROM user WHERE id = 2")).scalar() is None
+        with pytest.raises(Exception):
+            conn.execute(text("UPDATE user SET email = 'late@zoo.test' WHERE id = 1"))
+        names = {r[0] for r in conn.execute(text("SELECT name FROM sqlite_master WHERE name LIKE '_mig_%'"))}
+        assert names == set()
+    assert migrations.pending(engine) == [] and migrations.upgrade(engine, log=lambda m: None) == []
+
+
+def test_boot_does_not_migrate_when_disabled(tmp_path, make_app, capsys):
+    path = tmp_path / 'legacy_boot.db'
+    _legacy_db(path, users=3)
+    make_app(DATABASE_URL=f"sqlite:///{path}", AUTO_MIGRATE='0')
+    assert 'pending migration(s)' in capsys.readouterr().out
+    engine = create_engine(f"sqlite:///{path}")
+    assert len(migrations.pending(engine)) == 6
+    app = make_app(AUTO_MIGRATE='1')
+    assert migrations.pending(engine) == []
+    assert app.extensions['boot']['warm'] is False
+    assert make_app().extensions['boot']['warm'] is True
+
+
+def test_fresh_database_is_created_at_head(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'fresh.db'}")
+    assert migrations.upgrade(engine, log=lambda m: None) == []
+    assert migrations.applied_versions(engine) == {m.version for m in migrations.MIGRATIONS}
+
+
+def test_emails_equal_after_trim_abort_instead_of_dropping_users(tmp_path):
+    path = tmp_path / 'dupes.db'
+    _legacy_db(path, users=2)
+    engine = create_engine(f"sqlite:///{path}")
+    with engine.begin() as conn:
+        migrations.add_columns(conn, 'user', [('email', 'VARCHAR(160)')])
+        conn.execute(text("UPDATE user SET email = CASE id WHEN 1 THEN 'a@x.com' ELSE ' a@x.com' END"))
+    with pytest.raises(migrations.MigrationError, match='a@x.com'):
+        migrations.upgrade(engine, log=lambda m: None)
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM user")).scalar() == 2
+
+
+def test_audit_created_at_index_gains_id(tmp_path):
+    path = tmp_path / 'audit_ix.db'
+    engine = create_engine(f"sqlite:///{path}")
+    migrations.upgrade(engine, log=lambda m: None)
+    with engine.begin() as conn:
+        # a database from before the index covered id
+        conn.execute(text("DELETE FROM schema_migrations WHERE version = 6"))
+        conn.execute(text("DROP INDEX ix_audit_log_created_at"))
+        conn.execute(text("CREATE INDEX ix_audit_log_created_at ON audit_log (created_at)"))
+    assert migrations.upgrade(engine, log=lambda m: None) == [6]
+    with engine.connect() as conn:
+        ix = {i['name']: i['column_names'] for i in inspect(conn).get_indexes('audit_log')}
+    assert ix['ix_audit_log_created_at'] == ['created_at', 'id'] and ix['ix_audit_log_entity_id'] == ['entity_id', 'id']
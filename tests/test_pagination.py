@@ -0,0 +1,20 @@
+def test_cursor_pagination_walks_all_animals(app):
+    c = app.test_client()
+
+    rv = c.get('/api/animals?page=1&per_page=5')
+    meta = rv.get_json()['meta']
+    assert meta['page'] == 1 and meta['per_page'] == 5 and meta['total'] >= 20
+    total = meta['total']
+
+    seen = []
+    url = '/api/animals?per_page=7&include_total=false'
+    while url:
+        payload = c.get(url).get_json()
+        # page 1 and cursor pages alike: no count, so no page count either
+        assert 'total' in payload['meta'] and payload['meta']['total'] is None and 'pages' not in payload['meta']
+        seen.extend(a['id'] for a in payload['data'])
+        cursor = payload['meta']['next_cursor']
+        url = f'/api/animals?per_page=7&include_total=false&after={cursor}' if cursor else None
+    assert len(seen) == total and seen == sorted(seen, reverse=True)
+
+    assert c.get('/api/animals?after=not-a-cursor').status_code == 400
@@ -0,0 +1,59 @@
+from backend.models import User
+from backend.passwords import HashingBusy, PasswordHasher, normalize_method
+
+
+def test_method_normalization_and_rehash_check():
+    assert normalize_method('scrypt') == 'scrypt:32768:8:1'
+    assert normalize_method('scrypt:16384') == 'scrypt:16384:8:1'
+    assert normalize_method('pbkdf2:sha512:1000') == 'pbkdf2:sha512:1000'
+    hasher = PasswordHasher('pbkdf2:sha256:1000', workers=2)
+    h = hasher.hash('pw')
+    assert h.startswith('pbkdf2:sha256:1000$') and hasher.verify(h, 'pw') and not hasher.verify(h, 'nope')
+    assert not hasher.needs_rehash(h)
+    assert PasswordHasher('pbkdf2:sha256:2000', workers=0).needs_rehash(h)
+    hasher.shutdown()
+    # admitted hashes each hold a request thread: the limit stays below the server's threads
+    assert PasswordHasher(workers=0, server_threads=8).queue == 4
+    assert PasswordHasher(workers=0, queue=50, server_threads=4).queue == 3
+
+
+def test_login_upgrades_hash_and_sheds_load(make_app):
+    make_app(PASSWORD_HASH_METHOD='pbkdf2:sha256:1000')
+    app = make_app(PASSWORD_HASH_METHOD='pbkdf2:sha256:2000')
+    c = app.test_client()
+    with app.app_context():
+        assert User.query.filter_by(username='Admin123').first().password_hash.startswith('pbkdf2:sha256:1000$')
+    assert c.post('/api/login', json={'username': 'Admin123', 'password': 'wrong'}).status_code == 401
+    assert c.post('/api/login', json={'username': 'Admin123', 'password': 'zoosys'}).status_code == 200
+    with app.app_context():
+        assert User.query.filter_by(username='Admin123').first().password_hash.startswith('pbkdf2:sha256:2000$')
+    assert app.extensions['password_hasher'].rehashed == 1
+    assert c.post('/api/login', json={'username': 'Admin123', 'password': 'zoosys'}).status_code == 200
+    assert app.extensions['password_hasher'].rehashed == 1
+    # every slot taken: new hashing requests are shed instead of queueing
+    hasher = app.extensions['password_hasher']
+    hasher.max_wait = 0
+    for _ in range(hasher.queue):
+        hasher._slots.acquire()
+    rv = c.post('/api/register', json={'username': 'school1', 'password': 'pw'})
+    assert rv.status_code == 503 and rv.headers['Retry-After'] == '1'
+    assert hasher.stats()['rejected'] == 1
+    for _ in range(hasher.queue):
+        hasher._slots.release()
+    assert c.post('/api/register', json={'username': 'school1', 'password': 'pw'}).status_code == 201
+
+
+def test_login_succeeds_when_rehash_fails(make_app, monkeypatch):
+    make_app(PASSWORD_HASH_METHOD='pbkdf2:sha256:1000')
+    app = make_app(PASSWORD_HASH_METHOD='pbkdf2:sha256:2000')
+    hasher = app.extensions['password_hasher']
+
+    def busy(password):
+        raise HashingBusy('password hashing queue is full')
+
+    monkeypatch.setattr(hasher, 'hash', busy)
+    rv = app.test_client().post('/api/login', json={'username': 'Admin123', 'password': 'zoosys'})
+    assert rv.status_code == 200 and rv.get_json()['access_token']
+    assert hasher.rehashed == 0
+    with app.app_context():
+        assert User.query.filter_by(username='Admin123').first().password_hash.startswith('pbkdf2:sha256:1000$')
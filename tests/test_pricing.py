@@ -0,0 +1,122 @@
+import random
+from datetime import date, timedelta
+from backend.models import PricingRule
+from backend.pricing import PricingIndex, select_rule_linear
+from backend.bench import random_pricing_rules, SLOTS
+
+
+def test_compiled_index_matches_linear_scan():
+    rules = random_pricing_rules(300, seed=3)
+    # odd rows the linear loop tolerates: bad times, junk days, empty strings
+    rules.append(PricingRule(id=9001, days='x,9,2', start_time='bad', end_time='10:00', adult_cents=1, child_cents=1, currency='INR', priority=-1))
+    rules.append(PricingRule(id=9002, days='', start_time='', end_time='12:30', adult_cents=2, child_cents=2, currency='INR', priority=-2))
+    index = PricingIndex().build(rules)
+    rnd = random.Random(5)
+    for _ in range(3000):
+        d = date(2024, 12, 1) + timedelta(days=rnd.randrange(0, 420))
+        slot = rnd.choice(SLOTS + ['garbage', '12:30-14:00', '07:15-08:00'])
+        expected = select_rule_linear(rules, d, slot)
+        got = index.select(d, slot)
+        assert (expected.id if expected else None) == (got.id if got else None), (d, slot)
+
+
+def test_pricing_crud_invalidates_index(app, login):
+    c = app.test_client()
+    headers = login(c)
+
+    rv = c.post('/api/bookings', json={'date': '2025-09-10', 'time_slot': '09:00-11:00', 'num_adults': 1}, headers=headers)
+    assert rv.get_json()['price_cents'] == 20000
+
+    rv = c.post('/api/pricing', json={'name': 'weekday', 'days': '2', 'adult_cents': 15000, 'priority': 5}, headers=headers)
+    assert rv.status_code == 201
+    rid = rv.get_json()['id']
+    rv = c.post('/api/bookings', json={'date': '2025-09-10', 'time_slot': '09:00-11:00', 'num_adults': 1}, headers=headers)
+    assert rv.get_json()['price_cents'] == 15000
+
+    c.delete(f'/api/pricing/{rid}', headers=headers)
+    rv = c.post('/api/bookings', json={'date': '2025-09-10', 'time_slot': '09:00-11:00', 'num_adults': 1}, headers=headers)
+    assert rv.get_json()['price_cents'] == 20000
+
+
+def test_quote_matrix_matches_per_cell_lookup():
+    rules = random_pricing_rules(200, seed=9)
+    index = PricingIndex().build(rules)
+    start = date(2025, 2, 20)
+    slots = SLOTS + ['garbage']
+    matrix = index.quote_matrix(start, 90, slots)
+    for si, slot in enumerate(slots):
+        for off in range(90):
+            expected = index.select(start + timedelta(days=off), slot)
+            got = matrix[si][off]
+            assert (expected.id if expected else None) == (got.id if got else None)
+
+
+def test_quote_endpoint(app, login):
+    c = app.test_client()
+    headers = login(c)
+    c.post('/api/pricing', json={'name': 'sunday', 'days': '6', 'adult_cents': 30000, 'child_cents': 15000, 'priority': 1}, headers=headers)
+
+    rv = c.get('/api/pricing/quote?start_date=2025-09-01&end_date=2025-09-07&slots=09:00-11:00,13:00-15:00&adults=2&children=1')
+    assert rv.status_code == 200, rv.data
+    payload = rv.get_json()
+    assert len(payload['dates']) == 7 and payload['slots'] == ['09:00-11:00', '13:00-15:00']
+    monday, sunday = payload['dates'][0], payload['dates'][6]
+    assert monday['prices'][0] == {'price_cents': 50000, 'currency': 'INR', 'rule_id': None}
+    assert sunday['date'] == '2025-09-07' and sunday['prices'][1]['price_cents'] == 75000
+
+    rv = c.get('/api/pricing/quote?start_date=2025-09-10&end_date=2025-09-01')
+    assert rv.status_code == 400
+
+
+def test_snapshot_follows_the_stored_rule_version(app):
+    from sqlalchemy import text
+    from backend import changes
+    from backend.models import db
+    index = app.extensions['pricing_index']
+    load = index._loader
+
+    def loader():
+        rules = load()
+        if index.builds == 0:
+            # a pricing write commits after this build read the stored version
+            db.session.add(PricingRule(name='late', adult_cents=100, priority=1))
+            db.session.commit()
+        return rules
+
+    index._loader = loader
+    with app.app_context():
+        first = index.ensure()
+        assert index.builds == 1 and first.rules == ()
+        second = index.ensure()
+        assert index.builds == 2 and [c.id for c in second.rules] == [1]
+        assert index.ensure() is second and index.builds == 2
+        assert first.stored != second.stored
+
+        # another worker edits a rule: seen once the recheck interval has passed
+        index.recheck = 3600
+        with db.engine.begin() as conn:
+            conn.execute(text("UPDATE pricing_rule SET adult_cents = 200 WHERE id = 1"))
+            changes._persist(conn, {'pricing_rule'})
+        assert index.ensure() is second
+        index.recheck = 0
+        assert index.ensure().rules[0].adult_cents == 200 and index.builds == 3
+
+
+def test_quote_reads_one_snapshot(monkeypatch, app, login):
+    c = app.test_client()
+    headers = login(c)
+    c.post('/api/pricing', json={'name': 'all', 'adult_cents': 12300, 'priority': 1}, headers=headers)
+
+    index = app.extensions['pricing_index']
+    ensure = index.ensure
+
+    def ensure_then_rebuild():
+        snapshot = ensure()
+        # another thread publishes a different rule set right after this request took its snapshot
+        index.build([])
+        return snapshot
+
+    monkeypatch.setattr(index, 'ensure', ensure_then_rebuild)
+    rv = c.get('/api/pricing/quote?start_date=2025-09-01&end_date=2025-09-01&slots=09:00-11:00')
+    assert rv.status_code == 200
+    assert rv.get_json()['dates'][0]['prices'][0]['price_cents'] == 12300
@@ -0,0 +1,36 @@
+from backend.models import db, Animal
+
+
+def test_relink_batches_and_skips_unchanged(make_app, login):
+    app = make_app(PHOTO_RELINK='sync', PHOTO_RELINK_BATCH='4')
+    relinker = app.extensions['photo_relinker']
+    assert relinker.last['skipped'] is False and relinker.last['scanned'] >= 20
+    with app.app_context():
+        tiger = Animal.query.filter_by(name='Tiger').first()
+        assert tiger.photo_url.startswith('/images/animals/Tiger.')
+    # nothing changed: the next boot does not scan
+    app = make_app()
+    relinker = app.extensions['photo_relinker']
+    assert relinker.last['skipped'] is True
+    with app.app_context():
+        tiger = Animal.query.filter_by(name='Tiger').first()
+        tiger.photo_url = '/images/animals/missing.jpg'
+        db.session.add(Animal(name='No Picture', species='Unknown'))
+        db.session.commit()
+    c = app.test_client()
+    assert c.post('/api/admin/animals/relink').status_code == 401
+    headers = login(c)
+    rv = c.post('/api/admin/animals/relink', headers=headers)
+    assert rv.status_code == 200
+    body = rv.get_json()
+    assert body['updated'] == 1 and body['skipped'] is False
+    with app.app_context():
+        assert Animal.query.filter_by(name='Tiger').first().photo_url.startswith('/images/animals/Tiger.')
+        assert Animal.query.filter_by(name='No Picture').first().photo_url is None
+
+
+def test_background_relink(make_app):
+    app = make_app(PHOTO_RELINK='background')
+    relinker = app.extensions['photo_relinker']
+    relinker.thread.join(timeout=30)
+    assert relinker.last['skipped'] is False
@@ -0,0 +1,40 @@
+def test_public_reads_cached_until_write(app, login):
+    cache = app.extensions['response_cache']
+    c = app.test_client()
+    headers = login(c)
+
+    first = c.get('/api/events')
+    assert first.headers['X-Cache'] == 'MISS'
+    second = c.get('/api/events')
+    assert second.headers['X-Cache'] == 'HIT' and second.get_json() == first.get_json()
+    # query args are part of the key
+    assert c.get('/api/animals?per_page=5').headers['X-Cache'] == 'MISS'
+    assert c.get('/api/animals?per_page=5').headers['X-Cache'] == 'HIT'
+    assert c.get('/api/animals?per_page=6').headers['X-Cache'] == 'MISS'
+    # authenticated list_animals bypasses the cache
+    assert 'X-Cache' not in c.get('/api/animals?per_page=5', headers=headers).headers
+
+    c.post('/api/events', json={'title': 'Keeper Talk', 'start_date': '2099-01-01'}, headers=headers)
+    fresh = c.get('/api/events')
+    assert fresh.headers['X-Cache'] == 'MISS'
+    assert 'Keeper Talk' in [e['title'] for e in fresh.get_json()]
+    # an event write leaves other tables' entries alone
+    assert c.get('/api/animals?per_page=5').headers['X-Cache'] == 'HIT'
+
+    c.put('/api/pages/about', json={'title': 'About', 'body': 'v1'}, headers=headers)
+    assert c.get('/api/pages/about').get_json()['body'] == 'v1'
+    c.put('/api/pages/about', json={'body': 'v2'}, headers=headers)
+    assert c.get('/api/pages/about').get_json()['body'] == 'v2'
+
+    stats = c.get('/api/health').get_json()['response_cache']
+    assert stats['hits'] == cache.hits >= 3 and stats['misses'] >= 4
+
+
+def test_lru_bound(make_app):
+    app = make_app(RESPONSE_CACHE_SIZE='2')
+    c = app.test_client()
+    for page in ('a', 'b', 'c'):
+        c.get(f'/api/pages/{page}')
+    assert app.extensions['response_cache'].stats()['entries'] == 2
+    assert c.get('/api/pages/a').headers['X-Cache'] == 'MISS'
+    assert c.get('/api/pages/c').headers['X-Cache'] == 'HIT'
@@ -0,0 +1,119 @@
+from datetime import date, datetime
+from backend.models import db, Booking, BookingDaily, TicketSale, TicketSaleDaily, TicketType
+from backend import rollups
+
+
+def _snapshot():
+    return (sorted(tuple(r.to_dict().items()) for r in TicketSaleDaily.query.all()),
+            sorted(tuple(r.to_dict().items()) for r in BookingDaily.query.all()))
+
+
+def test_rollups_follow_sales_bookings_and_payments(app, client, admin_headers):
+    with app.app_context():
+        tt = TicketType.query.first()
+        tid, adult, child = tt.id, tt.adult_price_cents, tt.child_price_cents
+    for channel, qa, qc in (('offline', 2, 1), ('offline', 1, 0), ('online', 3, 2)):
+        rv = client.post('/api/ticket-sales', json={'ticket_type_id': tid, 'channel': channel,
+                                                'quantity_adults': qa, 'quantity_children': qc}, headers=admin_headers)
+        assert rv.status_code == 201
+    bookings = [client.post('/api/bookings', json={'date': '2026-05-01', 'time_slot': '09:00-11:00', 'num_adults': n,
+                                              'price_cents': 1000 * n}, headers=admin_headers).get_json()['id']
+                for n in (1, 2, 3)]
+    assert client.post(f'/api/bookings/{bookings[1]}/pay', headers=admin_headers).status_code == 200
+
+    with app.app_context():
+        offline = TicketSaleDaily.query.filter_by(channel='offline').one()
+        assert (offline.sales, offline.adults, offline.children) == (2, 3, 1)
+        assert offline.revenue_cents == 3 * adult + child
+        slot = BookingDaily.query.filter_by(day=date(2026, 5, 1)).one()
+        assert (slot.bookings, slot.adults, slot.revenue_cents) == (3, 6, 6000)
+        assert (slot.paid_bookings, slot.paid_revenue_cents) == (1, 2000)
+
+        # a rolled-back change leaves the rollups untouched; a committed one moves the row
+        before = _snapshot()
+        b = db.session.get(Booking, bookings[0])
+        b.paid = True
+        db.session.flush()
+        db.session.rollback()
+        assert _snapshot() == before
+        b = db.session.get(Booking, bookings[2])
+        b.date = date(2026, 5, 2)
+        db.session.commit()
+        db.session.delete(TicketSale.query.filter_by(channel='online').one())
+        db.session.commit()
+        assert BookingDaily.query.filter_by(day=date(2026, 5, 2)).one().adults == 3
+
+        incremental = _snapshot()
+        with db.engine.begin() as conn:
+            rollups.rebuild(conn)
+        # zero rows left behind by moves/deletes are the only difference to a rebuild
+        nonzero = tuple(sorted(r for r in rows if dict(r).get('sales', dict(r).get('bookings')))
+                        for rows in incremental)
+        assert _snapshot() == nonzero
+
+    summary = client.get('/api/ticket-sales/summary', headers=admin_headers).get_json()
+    assert summary == {'total_revenue_cents': 3 * adult + child, 'sales_count': 2}
+    overview = client.get('/api/analytics/overview', headers=admin_headers).get_json()
+    assert overview['revenue_cents'] == 3 * adult + child + 2000
+
+
+def test_timeseries_buckets_and_cache(app, client, admin_headers):
+    with app.app_context():
+        tid = TicketType.query.first().id
+        # 2026-03-01 is a Sunday, 03-02 a Monday
+        for day, channel, cents in (('2026-02-27', 'online', 100), ('2026-03-01', 'offline', 200),
+                                    ('2026-03-02', 'offline', 400), ('2026-03-02', 'online', 800)):
+            db.session.add(TicketSale(ticket_type_id=tid, channel=channel, quantity_adults=1, quantity_children=1,
+                                      total_cents=cents, created_at=datetime.fromisoformat(day + 'T10:00:00')))
+        db.session.add(Booking(date=date(2026, 3, 3), time_slot='09:00-11:00', num_adults=2, num_children=3,
+                               price_cents=5000, paid=True))
+        db.session.add(Booking(date=date(2026, 3, 3), time_slot='11:00-13:00', num_adults=1, price_cents=700))
+        db.session.commit()
+
+    def get(query):
+        rv = client.get('/api/analytics/timeseries?' + query, headers=admin_headers)
+        return rv, rv.get_json()
+
+    rv, body = get('metric=revenue&from=2026-02-27&to=2026-03-03')
+    assert body['buckets'] == ['2026-02-27', '2026-02-28', '2026-03-01', '2026-03-02', '2026-03-03']
+    assert body['series'] == {'ticket_sales': [100, 0, 200, 1200, 0], 'bookings': [0, 0, 0, 0, 5000],
+                              'total': [100, 0, 200, 1200, 5000]}
+    assert rv.headers['X-Cache'] == 'MISS'
+    rv, again = get('to=2026-03-03&from=2026-02-27&metric=revenue&granularity=day')
+    assert again == body and rv.headers['X-Cache'] == 'HIT'
+
+    _, body = get('metric=ticket_sales&from=2026-02-23&to=2026-03-08&granularity=week')
+    assert body['buckets'] == ['2026-02-23', '2026-03-02']
+    assert body['series'] == {'online': [1, 1], 'offline': [1, 1]}
+    _, body = get('metric=visitors&from=2026-02-01&to=2026-03-31&granularity=month')
+    assert body['series'] == {'adults': [1, 6], 'children': [1, 6], 'total': [2, 12]}
+    _, body = get('metric=bookings&from=2026-03-03&to=2026-03-03')
+    assert body['series'] == {'bookings': [2], 'paid': [1]}
+
+    # a new sale invalidates the cached series
+    client.post('/api/ticket-sales', json={'ticket_type_id': tid, 'quantity_adults': 1}, headers=admin_headers)
+    today = datetime.utcnow().date().isoformat()
+    rv, body = get(f'metric=ticket_sales&from={today}&to={today}')
+    assert body['series'] == {'offline': [1]}
+    assert get('metric=revenue&from=2026-02-27&to=2026-03-03')[0].headers['X-Cache'] == 'MISS'
+
+    assert get('metric=nope')[0].status_code == 400
+    assert get('granularity=hour')[0].status_code == 400
+    assert get('from=2026-03-05&to=2026-03-01')[0].status_code == 400
+    assert get('from=2020-01-01&to=2026-01-01')[0].status_code == 400
+    assert client.get('/api/analytics/timeseries').status_code == 401
+
+
+def test_string_and_float_prices_are_counted_as_whole_cents(app, client, admin_headers):
+    for price in ('2500', 1000.0):
+        rv = client.post('/api/bookings', json={'date': '2026-06-01', 'price_cents': price}, headers=admin_headers)
+        assert rv.status_code == 201 and rv.get_json()['price_cents'] == int(float(price))
+    rv = client.post('/api/bookings', json={'date': '2026-06-01', 'price_cents': 'free'}, headers=admin_headers)
+    assert rv.status_code == 400
+    with app.app_context():
+        # attribute values the API never coerces (e.g. scripts) still land as integers
+        db.session.add(Booking(date=date(2026, 6, 1), time_slot='09:00-11:00', price_cents='500', num_adults='2'))
+        db.session.commit()
+        slot = BookingDaily.query.filter_by(day=date(2026, 6, 1)).one()
+        assert (slot.bookings, slot.revenue_cents, slot.adults) == (3, 4000, 4)
+        assert isinstance(slot.revenue_cents, int)
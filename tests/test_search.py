@@ -0,0 +1,68 @@
+def test_fulltext_search_tracks_writes(app, login):
+    assert app.extensions['search_index'].available
+    c = app.test_client()
+    headers = login(c)
+
+    # seeded rows are indexed; prefix + species matching
+    payload = c.get('/api/search?q=leop').get_json()
+    assert [a['name'] for a in payload['animals']] == ['Leopard']
+    assert payload['results'][0]['kind'] == 'animal' and '[' in payload['results'][0]['snippet']
+    data = c.get('/api/animals?q=panthera').get_json()['data']
+    assert {'Tiger', 'Leopard', 'Asiatic Lion'} <= {a['name'] for a in data}
+
+    rv = c.post('/api/events', json={'title': 'Night Safari', 'description': 'Nocturnal walk with rangers', 'start_date': '2099-01-01'}, headers=headers)
+    eid = rv.get_json()['id']
+    assert c.get('/api/search?q=nocturnal').get_json()['events'][0]['id'] == eid
+
+    c.put(f'/api/events/{eid}', json={'description': 'Evening birding'}, headers=headers)
+    assert c.get('/api/search?q=nocturnal').get_json()['events'] == []
+    assert c.get('/api/search?q=birding').get_json()['events'][0]['id'] == eid
+
+    c.delete(f'/api/events/{eid}', headers=headers)
+    assert c.get('/api/search?q=birding').get_json()['events'] == []
+
+    # FTS operators in user input are treated as plain words
+    assert c.get('/api/search?q=tiger" OR *').status_code == 200
+
+    # many strong animal hits do not crowd out a weaker event match
+    from datetime import date
+    from backend.models import db, Animal, Event
+    with app.app_context():
+        db.session.add_all([Animal(name=f'Okapi {i}', species='Okapia johnstoni') for i in range(120)])
+        db.session.add(Event(title='Rainforest talk', description='meet the okapi keepers', start_date=date(2099, 1, 2)))
+        db.session.commit()
+    payload = c.get('/api/search?q=okapi').get_json()
+    assert len(payload['animals']) == 10 and [e['title'] for e in payload['events']] == ['Rainforest talk']
+    ranks = [h['rank'] for h in payload['results']]
+    assert len(ranks) == 11 and ranks == sorted(ranks)
+
+
+def test_suggest_prefix_fuzzy_and_refresh(app, login):
+    c = app.test_client()
+    headers = login(c)
+
+    labels = [s['label'] for s in c.get('/api/search/suggest?q=lion').get_json()['suggestions']]
+    assert 'Asiatic Lion' in labels
+    species = c.get('/api/search/suggest?q=panthera t').get_json()['suggestions']
+    assert species[0]['kind'] == 'species' and species[0]['animal'] == 'Tiger'
+    fuzzy = c.get('/api/search/suggest?q=leoprad').get_json()['suggestions']
+    assert fuzzy and fuzzy[0]['label'] == 'Leopard' and fuzzy[0]['match'] == 'fuzzy'
+
+    c.post('/api/animals', json={'name': 'Snow Leopard', 'species': 'Panthera uncia'}, headers=headers)
+    labels = [s['label'] for s in c.get('/api/search/suggest?q=snow').get_json()['suggestions']]
+    assert labels == ['Snow Leopard']
+
+    # a write committed by another process only shows up through table_versions
+    from sqlalchemy import text
+    from backend import changes
+    from backend.models import db
+    index = app.extensions['suggest_index']
+    index.recheck = 3600
+    with app.app_context():
+        with db.engine.begin() as conn:
+            conn.execute(text("INSERT INTO animal (name, species) VALUES ('Red Panda', 'Ailurus fulgens')"))
+            changes._persist(conn, {'animal'})
+    assert c.get('/api/search/suggest?q=red pa').get_json()['suggestions'] == []
+    index.recheck = 0
+    labels = [s['label'] for s in c.get('/api/search/suggest?q=red pa').get_json()['suggestions']]
+    assert labels == ['Red Panda']
@@ -0,0 +1,17 @@
+from backend.models import db
+from backend.sqlite_tuning import settings_from_env, effective_pragmas
+
+
+def test_settings_from_env_overrides():
+    assert settings_from_env({'SQLITE_PROFILE': 'off'}) == {}
+    s = settings_from_env({'SQLITE_BUSY_TIMEOUT_MS': '250', 'SQLITE_SYNCHRONOUS': 'FULL', 'SQLITE_MMAP_SIZE': 'junk'})
+    assert s['busy_timeout'] == 250 and s['synchronous'] == 'FULL' and s['mmap_size'] == 268435456
+
+
+def test_profile_applied_to_connections(make_app):
+    app = make_app(SQLITE_BUSY_TIMEOUT_MS='1234')
+    with app.app_context():
+        pragmas = effective_pragmas(db.engine)
+    assert pragmas['journal_mode'] == 'wal'
+    assert pragmas['synchronous'] == 'NORMAL' and pragmas['temp_store'] == 'MEMORY'
+    assert pragmas['busy_timeout'] == 1234
@@ -0,0 +1,45 @@
+import gzip
+from flask import Flask
+from backend.static_files import StaticManifest, accepted_encodings
+
+
+def test_accepted_encodings():
+    assert accepted_encodings('gzip, deflate, br;q=0') == {'gzip', 'deflate'}
+    assert accepted_encodings(None) == set()
+
+
+def test_manifest_prefers_precompressed_sibling(tmp_path):
+    (tmp_path / 'assets').mkdir()
+    js = b'console.log("zoo");' * 200
+    (tmp_path / 'assets' / 'app-0123abcd.js').write_bytes(js)
+    (tmp_path / 'assets' / 'app-0123abcd.js.br').write_bytes(b'brotli-bytes')
+    (tmp_path / 'index.html').write_text('<html></html>')
+    manifest = StaticManifest(str(tmp_path)).build()
+    assert set(manifest.entries) == {'assets/app-0123abcd.js', 'index.html'}
+    app = Flask(__name__)
+    entry = manifest.get('assets/app-0123abcd.js')
+    with app.test_request_context(headers={'Accept-Encoding': 'gzip, br'}):
+        resp = manifest.response(app, entry)
+        resp.direct_passthrough = False
+        assert resp.headers['Content-Encoding'] == 'br' and resp.get_data() == b'brotli-bytes'
+    with app.test_request_context(headers={'Accept-Encoding': 'gzip'}):
+        resp = manifest.response(app, entry)
+        assert gzip.decompress(resp.get_data()) == js
+    with app.test_request_context():
+        resp = manifest.response(app, entry)
+        resp.direct_passthrough = False
+        assert 'Content-Encoding' not in resp.headers and resp.get_data() == js
+
+
+def test_dist_served_from_manifest(frontend_dist, app):
+    c = app.test_client()
+    asset = 'assets/index-0123abcd.js'
+    assert asset in app.extensions['static_manifest'].entries
+    rv = c.get(f'/{asset}', headers={'Accept-Encoding': 'gzip'})
+    assert rv.status_code == 200 and rv.headers['Content-Encoding'] == 'gzip'
+    assert 'immutable' in rv.headers['Cache-Control'] and 'Accept-Encoding' in rv.headers['Vary']
+    assert c.get(f'/{asset}', headers={'Accept-Encoding': 'gzip', 'If-None-Match': rv.headers['ETag']}).status_code == 304
+
+    spa = c.get('/animals/some/deep/link')
+    assert spa.status_code == 200 and spa.mimetype == 'text/html' and spa.headers['Cache-Control'] == 'no-cache'
+    assert c.get('/assets/missing-00000000.js').status_code == 404